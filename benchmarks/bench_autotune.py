@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Adaptive batch sizing benchmark
+Moves a narrow (4 columns) and a wide (80 columns) SQLite table through two
+pipeline shapes, with the fixed defaults and with pipelines.autotune:
+
+  sql_to_warehouse  fetchmany(rows_chunk) -> executemany(batch_size)
+  sql_to_s3         fetchmany(rows_chunk) -> CSV -> multipart parts (part_size)
+
+Remote round trips are modelled as a fixed latency per request plus a
+bandwidth term, so the effect is the number of requests; fetching,
+serializing and inserting are real work. Tuned runs go twice: cold (default
+start, slow start) and warm (seeded from the values the cold run stored).
+
+Usage:
+    python benchmarks/bench_autotune.py --rows 1000000 --fetch-rtt-ms 5 --write-rtt-ms 20
+"""
+import argparse
+import csv
+import io
+import json
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from pipelines.autotune import BatchSizing, MB, TuningStore
+
+BANDWIDTH_BYTES_PER_S = 200 * MB
+TABLES = {"narrow": 4, "wide": 80}
+
+
+def build_table(conn, name: str, columns: int, rows: int) -> None:
+    cols = ", ".join(f"c{i} TEXT" for i in range(columns))
+    conn.execute(f"CREATE TABLE {name} (id INTEGER, {cols})")
+    values = [f"value_{i:03d}_abcdef" for i in range(columns)]
+    conn.executemany(
+        f"INSERT INTO {name} VALUES (?, {', '.join('?' * columns)})",
+        ([r] + values for r in range(rows)),
+    )
+    conn.commit()
+
+
+def _remote(rtt: float, nbytes: int) -> None:
+    time.sleep(rtt + nbytes / BANDWIDTH_BYTES_PER_S)
+
+
+def _row_bytes(row) -> int:
+    return sum(len(v) if isinstance(v, str) else 8 for v in row)
+
+
+def sql_to_warehouse(conn, table, sizing, opts) -> int:
+    target = sqlite3.connect(":memory:")
+    width = len(conn.execute(f"SELECT * FROM {table} LIMIT 1").fetchone())
+    target.execute(f"CREATE TABLE t ({', '.join(f'c{i}' for i in range(width))})")
+    insert = f"INSERT INTO t VALUES ({', '.join('?' * width)})"
+    cur = conn.execute(f"SELECT * FROM {table}")
+    pending, moved = [], 0
+    while True:
+        t = time.perf_counter()
+        rows = cur.fetchmany(sizing.get("rows_chunk"))
+        nbytes = _row_bytes(rows[0]) * len(rows) if rows else 0
+        _remote(opts.fetch_rtt, nbytes)
+        sizing.record("rows_chunk", len(rows), time.perf_counter() - t, nbytes)
+        pending.extend(rows)
+        while len(pending) >= sizing.get("batch_size") or (not rows and pending):
+            batch, pending = pending[:sizing.get("batch_size")], pending[sizing.get("batch_size"):]
+            t = time.perf_counter()
+            target.executemany(insert, batch)
+            nbytes = _row_bytes(batch[0]) * len(batch)
+            _remote(opts.write_rtt, nbytes)
+            sizing.record("batch_size", len(batch), time.perf_counter() - t, nbytes)
+            moved += len(batch)
+        if not rows:
+            break
+    target.close()
+    return moved
+
+
+def sql_to_s3(conn, table, sizing, opts) -> int:
+    cur = conn.execute(f"SELECT * FROM {table}")
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    moved = 0
+
+    def upload(body: bytes) -> None:
+        t = time.perf_counter()
+        _remote(opts.write_rtt, len(body))
+        sizing.record("part_size", len(body), time.perf_counter() - t, len(body))
+
+    while True:
+        t = time.perf_counter()
+        rows = cur.fetchmany(sizing.get("rows_chunk"))
+        nbytes = _row_bytes(rows[0]) * len(rows) if rows else 0
+        _remote(opts.fetch_rtt, nbytes)
+        sizing.record("rows_chunk", len(rows), time.perf_counter() - t, nbytes)
+        if not rows:
+            break
+        writer.writerows(rows)
+        moved += len(rows)
+        if buf.tell() >= sizing.get("part_size"):
+            upload(buf.getvalue().encode())
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        upload(buf.getvalue().encode())
+    return moved
+
+
+SHAPES = {"sql_to_warehouse": sql_to_warehouse, "sql_to_s3": sql_to_s3}
+
+
+def _asset(name: str, shape: str, auto: bool, memory_mb: int) -> dict:
+    target = {}
+    if shape == "sql_to_warehouse":
+        target["batch_size"] = "auto" if auto else 10000
+    else:
+        target["part_size"] = "auto" if auto else 8 * MB
+    return {
+        "name": name,
+        "source": {"configs": {"rows_chunk": "auto" if auto else 10000}},
+        "target": {"configs": target},
+        "autotune": {"memory_mb": memory_mb},
+    }
+
+
+def run_benchmark(rows, fetch_rtt_ms, write_rtt_ms, memory_mb):
+    opts = argparse.Namespace(fetch_rtt=fetch_rtt_ms / 1000, write_rtt=write_rtt_ms / 1000)
+    work = Path(tempfile.mkdtemp(prefix="bench_autotune_"))
+    report = {"rows": rows, "fetch_rtt_ms": fetch_rtt_ms, "write_rtt_ms": write_rtt_ms,
+              "memory_mb": memory_mb, "results": {}}
+    try:
+        conn = sqlite3.connect(str(work / "source.db"))
+        for table, columns in TABLES.items():
+            build_table(conn, table, columns, rows if table == "narrow" else rows // 8)
+        store = TuningStore(work / "autotune.json")
+        for shape, fn in SHAPES.items():
+            for table in TABLES:
+                name = f"{shape}_{table}"
+                runs = {}
+                for label, auto in (("fixed", False), ("tuned_cold", True), ("tuned_warm", True)):
+                    sizing = BatchSizing.from_asset(_asset(name, shape, auto, memory_mb), store)
+                    started = time.perf_counter()
+                    moved = fn(conn, table, sizing, opts)
+                    seconds = time.perf_counter() - started
+                    sizing.save()
+                    runs[label] = {
+                        "seconds": round(seconds, 3),
+                        "rows_per_second": round(moved / seconds),
+                        "settings": sizing.summary() or sizing.fixed,
+                    }
+                runs["speedup_warm_vs_fixed"] = round(runs["fixed"]["seconds"] / runs["tuned_warm"]["seconds"], 2)
+                report["results"][name] = runs
+        conn.close()
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="narrow table rows; the wide table gets rows/8")
+    parser.add_argument("--fetch-rtt-ms", type=float, default=5.0)
+    parser.add_argument("--write-rtt-ms", type=float, default=20.0)
+    parser.add_argument("--memory-mb", type=int, default=64)
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args.rows, args.fetch_rtt_ms, args.write_rtt_ms, args.memory_mb), indent=2))
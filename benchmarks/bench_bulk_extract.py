@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Bulk SQL extract benchmark
+Extracts --rows rows of a test_customers-shaped table to CSV through
+pipelines.bulk_extract and compares it with the current serial path
+(fetchmany, then encode and write, one after the other).
+
+The database is SQLite behind a DB-API proxy that models the SQL Server
+link: each fetchmany() costs one round trip (--rtt-ms), the batch bytes at
+--mbps, and a fixed per-packet overhead (--packet-us) for each TDS packet
+of --packet-size bytes. The sink models an S3 upload at --upload-mbps.
+Modelled waits sleep, so fetch/write overlap shows up as it would on the
+wire.
+
+  serial_4k       current path, default 4 KB packets
+  overlapped_4k   extract_to_csv (fetch thread + bounded queue), 4 KB
+  overlapped_32k  extract_to_csv with packet_size 32767
+
+The Arrow (arrow-odbc) reader needs an ODBC driver and a SQL Server; it is
+reported as unavailable when those are missing.
+
+Usage:
+    python benchmarks/bench_bulk_extract.py --rows 200000 --rows-chunk 10000
+"""
+import argparse
+import json
+import math
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from pipelines.bulk_extract import _arrow_available, _encode_rows, extract_to_csv
+
+ROW_BYTES = 48  # id, name, email, age on the wire
+
+
+class LinkModel:
+    def __init__(self, rtt_ms, mbps, packet_size, packet_us):
+        self.rtt = rtt_ms / 1000
+        self.bytes_per_s = mbps * 1e6 / 8
+        self.packet_size = packet_size
+        self.packet_s = packet_us / 1e6
+
+    def fetch_seconds(self, rows):
+        nbytes = rows * ROW_BYTES
+        return self.rtt + nbytes / self.bytes_per_s + math.ceil(nbytes / self.packet_size) * self.packet_s
+
+
+class _Cursor:
+    def __init__(self, cursor, link):
+        self._cursor, self._link = cursor, link
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def fetchmany(self, size):
+        rows = self._cursor.fetchmany(size)
+        time.sleep(self._link.fetch_seconds(len(rows)))
+        return rows
+
+
+class _Connection:
+    def __init__(self, conn, link):
+        self._conn, self._link = conn, link
+
+    def cursor(self):
+        return _Cursor(self._conn.cursor(), self._link)
+
+
+class UploadSink:
+    def __init__(self, mbps):
+        self.bytes_per_s = mbps * 1e6 / 8
+        self.bytes = 0
+
+    def write(self, chunk):
+        time.sleep(len(chunk) / self.bytes_per_s)
+        self.bytes += len(chunk)
+        return len(chunk)
+
+
+def make_db(path: Path, rows: int):
+    conn = sqlite3.connect(str(path))
+    conn.execute("CREATE TABLE test_customers (id INTEGER, name TEXT, email TEXT, age INTEGER)")
+    conn.executemany("INSERT INTO test_customers VALUES (?, ?, ?, ?)",
+                     ((i, f"name {i}", f"c{i}@example.com", 20 + i % 50) for i in range(rows)))
+    conn.commit()
+    conn.close()
+
+
+def serial_extract(connection, sql, rows_chunk, sink):
+    cursor = connection.cursor()
+    cursor.execute(sql)
+    header = [d[0] for d in cursor.description]
+    rows = 0
+    while True:
+        batch = cursor.fetchmany(rows_chunk)
+        if not batch:
+            break
+        sink.write(_encode_rows(batch, header))
+        header = None
+        rows += len(batch)
+    return rows
+
+
+def run_benchmark(rows, rows_chunk, rtt_ms, mbps, packet_us, upload_mbps):
+    work = Path(tempfile.mkdtemp(prefix="bench_bulk_extract_"))
+    try:
+        db = work / "dg_play.db"
+        make_db(db, rows)
+        sql = "SELECT id, name, email, age FROM test_customers"
+        report = {"rows": rows, "rows_chunk": rows_chunk, "rtt_ms": rtt_ms, "mbps": mbps,
+                  "upload_mbps": upload_mbps, "modes": {}}
+
+        def connect(packet_size):
+            link = LinkModel(rtt_ms, mbps, packet_size, packet_us)
+            return lambda: _Connection(sqlite3.connect(str(db), check_same_thread=False), link)
+
+        sizes = {}
+        for name, packet_size, overlapped in (("serial_4k", 4096, False), ("overlapped_4k", 4096, True),
+                                              ("overlapped_32k", 32767, True)):
+            sink = UploadSink(upload_mbps)
+            started = time.perf_counter()
+            if overlapped:
+                configs = {"sql": sql, "rows_chunk": rows_chunk, "packet_size": packet_size}
+                n = extract_to_csv(configs, sink, dbapi_connect=connect(packet_size))["rows"]
+            else:
+                n = serial_extract(connect(packet_size)(), sql, rows_chunk, sink)
+            seconds = time.perf_counter() - started
+            assert n == rows
+            sizes[name] = sink.bytes
+            report["modes"][name] = {"seconds": round(seconds, 2), "rows_per_second": round(rows / seconds)}
+        assert len(set(sizes.values())) == 1
+        base = report["modes"]["serial_4k"]["seconds"]
+        for mode in report["modes"].values():
+            mode["speedup"] = round(base / mode["seconds"], 2)
+        report["arrow_odbc"] = _arrow_available() or "available"
+        return report
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--rows-chunk", type=int, default=10000)
+    parser.add_argument("--rtt-ms", type=float, default=2.0)
+    parser.add_argument("--mbps", type=float, default=100.0)
+    parser.add_argument("--packet-us", type=float, default=20.0)
+    parser.add_argument("--upload-mbps", type=float, default=100.0)
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args.rows, args.rows_chunk, args.rtt_ms, args.mbps, args.packet_us,
+                                   args.upload_mbps), indent=2))
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Compression codec benchmark
+Encodes a scaled AdventureWorks CSV with each codec through
+pipelines.codecs.open_writer into a MultipartSink (parts discarded after
+counting), then PUTs the result to the RecordingSnowflake stand-in and times
+COPY INTO with the propagated COMPRESSION. Reports output size, ratio, encode
+MB/s and COPY seconds per codec.
+
+zstd cases need the zstandard package and are skipped without it.
+
+Usage:
+    python benchmarks/bench_codecs.py --rows 500000 --threads 4
+"""
+import argparse
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from benchmarks import synthetic
+from benchmarks.stand_ins import RecordingSnowflake
+from pipelines.codecs import MB, Codec, MultipartSink, open_writer
+
+
+def codecs_to_run(threads):
+    cases = [Codec("none"), Codec("gzip", 1), Codec("gzip", 6), Codec("gzip", 6, threads)]
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return cases, "zstandard not installed"
+    cases += [Codec("zstd", 3), Codec("zstd", 9), Codec("zstd", 19), Codec("zstd", 3, threads)]
+    return cases, None
+
+
+def _label(codec):
+    label = codec.name if codec.level is None else f"{codec.name}:{codec.level}"
+    return f"{label} x{codec.threads}" if codec.threads > 1 else label
+
+
+def encode(codec, src: Path):
+    out = io.BytesIO()
+    sink = MultipartSink(lambda n, body: out.write(body) and n)
+    writer = open_writer(codec, sink)
+    started = time.perf_counter()
+    with open(src, "rb") as f:
+        while True:
+            chunk = f.read(MB)
+            if not chunk:
+                break
+            writer.write(chunk)
+    writer.close()
+    sink.close()
+    return out.getvalue(), time.perf_counter() - started
+
+
+def run_benchmark(rows, threads):
+    work = Path(tempfile.mkdtemp(prefix="bench_codecs_"))
+    try:
+        src = work / "AdventureWorksSales_All.csv"
+        size = synthetic.write_csv(src, rows)
+        cases, skipped = codecs_to_run(threads)
+        results = {}
+        for codec in cases:
+            data, seconds = encode(codec, src)
+            snowflake = RecordingSnowflake()
+            snowflake.put("CODEC_STAGE", f"sales.csv{codec.extension}", data)
+            started = time.perf_counter()
+            loaded = snowflake.copy_into("SALES_CODEC", "CODEC_STAGE", synthetic.KEY_COLUMNS,
+                                         compression=codec.snowflake_compression)
+            copy_seconds = time.perf_counter() - started
+            assert loaded == rows
+            results[_label(codec)] = {
+                "output_mb": round(len(data) / MB, 2),
+                "ratio": round(size / len(data), 2),
+                "encode_mb_per_s": round(size / MB / seconds, 1),
+                "copy_seconds": round(copy_seconds, 2),
+            }
+        report = {"rows": rows, "input_mb": round(size / MB, 1), "cpu_count": os.cpu_count(), "codecs": results}
+        if skipped:
+            report["skipped"] = {"zstd": skipped}
+        return report
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--threads", type=int, default=max(2, os.cpu_count() or 1))
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args.rows, args.threads), indent=2))
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Small-file compaction benchmark
+Builds a synthetic prefix of many tiny AdventureWorks CSVs and compacts it
+with pipelines.compaction, reporting files/s, MB/s and the object count COPY
+INTO would see before and after.
+
+Usage:
+    python benchmarks/bench_compaction.py --files 10000 --rows-per-file 5
+"""
+import argparse
+import gzip
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from pipelines.compaction import LocalStorage, compact_prefix, lineage, load_keys, MB
+
+SAMPLE_FILE = BASE_DIR / "AdventureWorksSales_All.csv.gz"
+
+
+def build_prefix(root: Path, prefix: str, files: int, rows_per_file: int) -> int:
+    with gzip.open(SAMPLE_FILE, "rt", encoding="utf-8-sig") as f:
+        header = f.readline()
+        rows = [f.readline() for _ in range(1000)]
+
+    out_dir = root / prefix
+    out_dir.mkdir(parents=True, exist_ok=True)
+    total = 0
+    for i in range(files):
+        start = (i * rows_per_file) % (len(rows) - rows_per_file)
+        body = header + "".join(rows[start:start + rows_per_file])
+        path = out_dir / f"column_match_{i:06d}.csv"
+        path.write_text(body, encoding="utf-8")
+        total += len(body)
+    return total
+
+
+def run_benchmark(files: int, rows_per_file: int, target_mb: int):
+    root = Path(tempfile.mkdtemp(prefix="bench_compaction_"))
+    try:
+        prefix = "test_data/column_match/"
+        input_bytes = build_prefix(root, prefix, files, rows_per_file)
+
+        storage = LocalStorage(root)
+        started = time.perf_counter()
+        manifest = compact_prefix(
+            storage,
+            prefix,
+            "test_data/column_match_compacted/",
+            pattern=r".*\.csv",
+            target_bytes=target_mb * MB,
+        )
+        elapsed = time.perf_counter() - started
+
+        assert len(lineage(manifest)) == files, "manifest lost source files"
+        output_bytes = sum(b["bytes_out"] for b in manifest["bundles"])
+        return {
+            "benchmark": "compaction",
+            "files_in": files,
+            "objects_for_copy": len(load_keys(manifest)),
+            "input_mb": round(input_bytes / MB, 2),
+            "output_mb": round(output_bytes / MB, 2),
+            "elapsed_seconds": round(elapsed, 3),
+            "files_per_second": round(files / elapsed, 1),
+            "mb_per_second": round(input_bytes / MB / elapsed, 2),
+        }
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=10000)
+    parser.add_argument("--rows-per-file", type=int, default=5)
+    parser.add_argument("--target-mb", type=int, default=128)
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.files, args.rows_per_file, args.target_mb), indent=2))
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Per-file partition benchmark
+Copies --files local files (a stand-in for SFTP -> S3) with a simulated
+per-file round-trip latency, two ways:
+
+  single_step  the current path: one step loops over every matching file;
+               a failing file fails the step, and the retry starts the whole
+               batch again
+  per_file     pipelines.file_partitions.run_per_file: one partition per
+               file on --workers workers, each file retried on its own
+
+Two scenarios: "clean", where every file succeeds, and "with_failures",
+where one file fails transiently (first attempt only) and one permanently.
+Reports wall time, files copied (including repeated copies) and the final
+status of each path.
+
+Usage:
+    python benchmarks/bench_file_partitions.py --files 1000 --latency-ms 20 --workers 16
+"""
+import argparse
+import json
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from pipelines.file_partitions import items_from_entries, render_item, run_per_file, summarize
+from pipelines.sftp_snapshot import LocalListing, list_entries
+
+TARGET_KEY = "backups/{{ source.item.file_name }}"
+
+
+def make_files(src: Path, n: int):
+    src.mkdir()
+    rng = random.Random(1)
+    for i in range(n):
+        (src / f"orders_{i:05d}.csv").write_bytes(b"id,amount\n" + b"1,2\n" * rng.randint(10, 2000))
+
+
+def make_copier(src: Path, dst: Path, latency: float, transient: str, permanent: str):
+    attempts = {}
+    copies = [0]
+
+    def copy(item):
+        attempts[item.file_name] = attempts.get(item.file_name, 0) + 1
+        time.sleep(latency)
+        if item.file_name == permanent or (item.file_name == transient and attempts[item.file_name] == 1):
+            raise IOError(f"failed to read {item.file_name}")
+        key = render_item(TARGET_KEY, item)
+        shutil.copyfile(src / item.file_name, dst / key.replace("/", "_"))
+        copies[0] += 1
+        return {"target/key": key}
+
+    return copy, copies
+
+
+def single_step(items, copy, retries):
+    # The batch step: any failure fails the step and the retry redoes every file
+    for attempt in range(retries + 1):
+        try:
+            for item in items:
+                copy(item)
+            return "SUCCESS", attempt + 1
+        except IOError:
+            continue
+    return "FAILED", retries + 1
+
+
+def run_benchmark(files, latency_ms, workers, retries):
+    work = Path(tempfile.mkdtemp(prefix="bench_file_partitions_"))
+    try:
+        src = work / "src"
+        make_files(src, files)
+        items = items_from_entries(list_entries(LocalListing(), str(src), r"orders_.*\.csv"), str(src))
+        names = sorted(i.file_name for i in items)
+        report = {"files": files, "latency_ms": latency_ms, "workers": workers, "retries": retries}
+
+        for scenario, transient, permanent in (("clean", None, None),
+                                               ("with_failures", names[len(names) // 3], names[2 * len(names) // 3])):
+            report[scenario] = {}
+            for mode in ("single_step", "per_file"):
+                dst = work / f"{scenario}_{mode}"
+                dst.mkdir()
+                copy, copies = make_copier(src, dst, latency_ms / 1000, transient, permanent)
+                started = time.perf_counter()
+                if mode == "single_step":
+                    status, attempts = single_step(items, copy, retries)
+                    result = {"status": status, "step_attempts": attempts}
+                else:
+                    summary = summarize(run_per_file(items, copy, max_workers=workers, retries=retries))
+                    result = {"succeeded": summary["succeeded"], "failed": summary["failed"],
+                              "retried": summary["retried"]}
+                result["wall_seconds"] = round(time.perf_counter() - started, 2)
+                result["files_copied"] = copies[0]
+                result["files_landed"] = sum(1 for _ in dst.iterdir())
+                report[scenario][mode] = result
+        clean = report["clean"]
+        report["clean_speedup"] = round(clean["single_step"]["wall_seconds"] / clean["per_file"]["wall_seconds"], 1)
+        return report
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--retries", type=int, default=2)
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args.files, args.latency_ms, args.workers, args.retries), indent=2))
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Streaming handoff benchmark
+Models sql_s3_sftp_chain_job: SQL (SQLite stand-in) -> S3 landing/sales/
+(local directory) -> SFTP outbound (local directory), once as two sequential
+steps that re-read the landing copy and once pipelined with pipelines.handoff.
+
+--latency-ms adds a fixed delay per chunk on the landing and SFTP writes to
+model remote endpoints; with real network I/O the two legs overlap.
+
+Usage:
+    python benchmarks/bench_handoff.py --rows 200000 --latency-ms 2
+"""
+import argparse
+import csv
+import io
+import json
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from benchmarks.synthetic import load_sqlite
+from pipelines.compaction import LocalStorage
+from pipelines.handoff import run_pipelined
+
+LANDING_KEY = "landing/sales/sales_extract.csv"
+
+
+class _SlowFile:
+    """Wraps a file and sleeps per write to stand in for network latency."""
+
+    def __init__(self, f, latency: float):
+        self.f = f
+        self.latency = latency
+
+    def write(self, chunk):
+        if self.latency:
+            time.sleep(self.latency)
+        return self.f.write(chunk)
+
+
+def _extract(conn, writer, rows_chunk):
+    cursor = conn.execute('SELECT * FROM "SALES_EXTRACT"')
+    buf = io.StringIO()
+    out = csv.writer(buf)
+    out.writerow([d[0] for d in cursor.description])
+    rows = 0
+    while True:
+        batch = cursor.fetchmany(rows_chunk)
+        if not batch:
+            break
+        out.writerows(batch)
+        writer.write(buf.getvalue().encode())
+        buf.seek(0)
+        buf.truncate()
+        rows += len(batch)
+    return rows
+
+
+def _deliver(chunks, path, latency, marks):
+    with open(path, "wb") as f:
+        sink = _SlowFile(f, latency)
+        for chunk in chunks:
+            marks.setdefault("first_byte", time.perf_counter())
+            sink.write(chunk)
+
+
+def run_sequential(conn, root, sftp_dir, rows_chunk, latency):
+    storage = LocalStorage(root)
+    marks = {}
+    started = time.perf_counter()
+    with tempfile.TemporaryFile() as spool:
+        _extract(conn, _SlowFile(spool, latency), rows_chunk)
+        spool.seek(0)
+        storage.write(LANDING_KEY, spool)
+    with storage.open_read(LANDING_KEY) as f:
+        _deliver(iter(lambda: f.read(1024 * 1024), b""), sftp_dir / "sales_extract.csv", latency, marks)
+    return time.perf_counter() - started, marks["first_byte"] - started
+
+
+def run_streamed(conn, root, sftp_dir, rows_chunk, latency):
+    storage = LocalStorage(root)
+    marks = {}
+    started = time.perf_counter()
+    with tempfile.TemporaryFile() as spool:
+        run_pipelined(
+            lambda w: _extract(conn, w, rows_chunk),
+            {"sftp": lambda chunks: _deliver(chunks, sftp_dir / "sales_extract.csv", latency, marks)},
+            _SlowFile(spool, latency),
+        )
+        spool.seek(0)
+        storage.write(LANDING_KEY, spool)
+    return time.perf_counter() - started, marks["first_byte"] - started
+
+
+def run_benchmark(rows, rows_chunk, latency_ms):
+    work = Path(tempfile.mkdtemp(prefix="bench_handoff_"))
+    try:
+        conn = sqlite3.connect(str(work / "source.db"), check_same_thread=False)
+        load_sqlite(conn, rows)
+        results = {}
+        for name, fn in (("land_then_reread", run_sequential), ("streamed", run_streamed)):
+            root = work / name
+            sftp_dir = root / "sftp"
+            sftp_dir.mkdir(parents=True)
+            wall, first_byte = fn(conn, root, sftp_dir, rows_chunk, latency_ms / 1000)
+            assert (root / LANDING_KEY).read_bytes() == (sftp_dir / "sales_extract.csv").read_bytes()
+            results[name] = {"wall_seconds": round(wall, 3), "sftp_first_byte_seconds": round(first_byte, 3)}
+        results["speedup"] = round(results["land_then_reread"]["wall_seconds"] / results["streamed"]["wall_seconds"], 2)
+        return {"rows": rows, "rows_chunk": rows_chunk, "latency_ms": latency_ms, "results": results}
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--rows-chunk", type=int, default=5_000)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args.rows, args.rows_chunk, args.latency_ms), indent=2))
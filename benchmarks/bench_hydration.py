@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Run-parameter hydration benchmark
+Hydrates --requests RunRequests per sensor tick for cross_ref_test_job,
+each with its own per-file source_path, three ways:
+
+  per_request  the schema is parsed and the registry row fetched for every
+               request (what _get_template_vars does today)
+  compiled     pipelines.hydration.Hydrator with the cache disabled: schema
+               parsed once, registry fetched per request
+  memoized     Hydrator with the cache: one registry fetch per registry
+               version, then only the trigger fields are re-bound
+
+The registry is an SQLite table holding the job's parameter JSON (a stand-in
+for etl_job_parameter in the registry database).
+
+Usage:
+    python benchmarks/bench_hydration.py --requests 500 --ticks 20
+"""
+import argparse
+import json
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from pipelines.hydration import Hydrator
+
+CONFIG = BASE_DIR / "pipelines" / "sftp" / "cross_ref_test.yaml"
+JOB_NAME = "cross_ref_test_job"
+
+
+def make_registry(path: Path):
+    conn = sqlite3.connect(str(path))
+    conn.execute("CREATE TABLE etl_job_parameter (job_nm TEXT PRIMARY KEY, config_json TEXT, updated_at TEXT)")
+    conn.execute("INSERT INTO etl_job_parameter VALUES (?, ?, ?)", (JOB_NAME, json.dumps({
+        "source_path": "/home/ukatru/data", "target_bucket": "my-dagster-poc",
+        "uma_new_parameter": "a", "uma_new_parameter_2": "b", "source_columns": '["id", "amount"]',
+    }), "2024-06-01T00:00:00"))
+    conn.commit()
+
+    def fetch():
+        row = conn.execute("SELECT config_json FROM etl_job_parameter WHERE job_nm = ?", (JOB_NAME,)).fetchone()
+        return json.loads(row[0])
+
+    return conn, fetch
+
+
+def run_benchmark(requests, ticks):
+    job = next(j for j in yaml.safe_load(CONFIG.read_text())["jobs"] if j["name"] == JOB_NAME)
+    work = Path(tempfile.mkdtemp(prefix="bench_hydration_"))
+    try:
+        conn, fetch = make_registry(work / "registry.db")
+        tags = {"job_nm": JOB_NAME, "team": "Marketplace", "dagster/sensor_name": "cross_ref_sensor"}
+        compiled, memoized = Hydrator(job, cache_size=0), Hydrator(job)
+        modes = {
+            "per_request": lambda trigger: Hydrator(job, cache_size=0).hydrate(tags, fetch, trigger=trigger),
+            "compiled": lambda trigger: compiled.hydrate(tags, fetch, trigger=trigger),
+            "memoized": lambda trigger: memoized.hydrate(tags, fetch, "2024-06-01T00:00:00", trigger=trigger),
+        }
+        report = {"requests_per_tick": requests, "ticks": ticks, "modes": {}}
+        results = {}
+        for name, hydrate in modes.items():
+            started = time.perf_counter()
+            for t in range(ticks):
+                out = [hydrate({"source_path": f"/upload/{t}/{i}"}) for i in range(requests)]
+            seconds = time.perf_counter() - started
+            results[name] = out
+            report["modes"][name] = {
+                "us_per_request": round(seconds / (requests * ticks) * 1e6, 2),
+                "ms_per_tick": round(seconds / ticks * 1000, 2),
+            }
+        assert results["per_request"] == results["compiled"] == results["memoized"]
+        report["memoized_cache"] = memoized.stats()
+        report["speedup_vs_per_request"] = round(
+            report["modes"]["per_request"]["us_per_request"] / report["modes"]["memoized"]["us_per_request"], 1)
+        conn.close()
+        return report
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--ticks", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args.requests, args.ticks), indent=2))
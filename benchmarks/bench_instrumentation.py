@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Instrumentation overhead benchmark
+Serializes AdventureWorks rows in rows_chunk batches with per-phase
+instrumentation disabled and enabled, and reports the relative overhead
+(budget: < 1%).
+
+Usage:
+    python benchmarks/bench_instrumentation.py --rows 200000 --rows-chunk 10000
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from benchmarks import synthetic
+from pipelines.instrumentation import Instrumentation
+
+
+def _run(rows, rows_chunk, enabled):
+    inst = Instrumentation(enabled=enabled)
+    chunks = [rows[i:i + rows_chunk] for i in range(0, len(rows), rows_chunk)]
+    started = time.perf_counter()
+    for chunk in chunks:
+        with inst.phase("serialize") as phase:
+            buf = io.StringIO()
+            csv.writer(buf).writerows(chunk)
+            phase.add(rows=len(chunk), bytes=buf.tell())
+    return time.perf_counter() - started
+
+
+def run_benchmark(rows_target, rows_chunk, repeats):
+    rows = list(synthetic.iter_rows(rows_target))
+    _run(rows, rows_chunk, False)  # warm-up
+    # Alternate the two modes so drift (GC, CPU clocks) hits both equally
+    off, on = [], []
+    for _ in range(repeats):
+        off.append(_run(rows, rows_chunk, False))
+        on.append(_run(rows, rows_chunk, True))
+    off, on = min(off), min(on)
+    return {
+        "benchmark": "instrumentation_overhead",
+        "rows": rows_target,
+        "rows_chunk": rows_chunk,
+        "disabled_seconds": round(off, 4),
+        "enabled_seconds": round(on, 4),
+        "overhead_pct": round((on - off) / off * 100, 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--rows-chunk", type=int, default=10000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.rows, args.rows_chunk, args.repeats), indent=2))
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Multi-process CSV conversion benchmark
+Replicates the bundled AdventureWorks sample into one large CSV (default
+2 GB) and converts it with pipelines.parallel_csv at 1..N worker processes,
+reporting MB/s and speedup over one worker per target format.
+
+PARQUET needs pyarrow and is skipped without it.
+
+Usage:
+    python benchmarks/bench_parallel_csv.py --size-mb 2048 --workers 1 2 4 8
+    python benchmarks/bench_parallel_csv.py --size-mb 256 --format JSON
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from benchmarks import synthetic
+from pipelines.parallel_csv import MB, convert_csv
+
+
+def write_sized_csv(path: Path, size_mb: int) -> int:
+    probe_rows = 20_000
+    probe_size = synthetic.write_csv(path, probe_rows)
+    rows = max(probe_rows, int(size_mb * MB / (probe_size / probe_rows)))
+    return synthetic.write_csv(path, rows)
+
+
+def run_benchmark(size_mb, workers_list, formats):
+    work = Path(tempfile.mkdtemp(prefix="bench_parallel_csv_"))
+    try:
+        src = work / "AdventureWorksSales_All.csv"
+        size = write_sized_csv(src, size_mb)
+        report = {"input_mb": round(size / MB, 1), "cpu_count": os.cpu_count(), "formats": {}}
+        for fmt in formats:
+            if fmt == "PARQUET":
+                try:
+                    import pyarrow  # noqa: F401
+                except ImportError:
+                    report["formats"][fmt] = {"skipped": "pyarrow not installed"}
+                    continue
+            runs = []
+            for workers in workers_list:
+                out = work / f"out.{fmt.lower()}"
+                result = convert_csv(src, out, fmt, workers=workers)
+                runs.append({
+                    "workers": workers,
+                    "ranges": result["ranges"],
+                    "seconds": round(result["seconds"], 2),
+                    "mb_per_s": round(size / MB / result["seconds"], 1),
+                    "phases": {k: round(v, 2) for k, v in result["phases"].items()},
+                    "output_mb": round(out.stat().st_size / MB, 1),
+                })
+                out.unlink()
+            base = runs[0]["seconds"]
+            for run in runs:
+                run["speedup"] = round(base / run["seconds"], 2)
+            report["formats"][fmt] = runs
+        return report
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=2048)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--format", dest="formats", nargs="+", default=["PARQUET", "JSON"],
+                        choices=["PARQUET", "JSON"])
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args.size_mb, args.workers, args.formats), indent=2))
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Run-duration history benchmark
+Two parts, on pipelines.run_history:
+
+  store    records --assets x --partitions x --runs history rows (with
+           per-key pruning) and times inserts, percentile() and estimate()
+           lookups and the database size
+  packing  a year of daily partitions with skewed (lognormal) durations is
+           split into backfill runs with a 1 h budget, by expected cost
+           (pack_partitions) and by a fixed partitions-per-run count giving
+           about the same number of runs; reports the longest run and how many
+           runs overshoot the budget with actual durations
+
+Usage:
+    python benchmarks/bench_run_history.py --assets 50 --partitions 20 --runs 100
+"""
+import argparse
+import json
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from pipelines.run_history import RunHistory, pack_partitions
+
+BUDGET_SECONDS = 3600.0
+
+
+def bench_store(work: Path, assets: int, partitions: int, runs: int):
+    rng = random.Random(3)
+    history = RunHistory(work / "history.db", keep=runs)
+    t = time.perf_counter()
+    n = 0
+    for r in range(runs):
+        for a in range(assets):
+            for p in range(partitions):
+                mb = rng.randint(1, 500)
+                history.record(f"asset_{a}", 5 + mb * 0.2 * rng.uniform(0.8, 1.2), partition=f"p{p}",
+                               bytes=mb << 20, rows=mb * 5000, started_at=r)
+                n += 1
+    insert_s = time.perf_counter() - t
+
+    t = time.perf_counter()
+    for a in range(assets):
+        for p in range(partitions):
+            history.percentile(f"asset_{a}", 90, partition=f"p{p}")
+    percentile_ms = (time.perf_counter() - t) / (assets * partitions) * 1000
+
+    t = time.perf_counter()
+    for a in range(assets):
+        history.estimate(f"asset_{a}", 90, input_bytes=250 << 20)
+    estimate_ms = (time.perf_counter() - t) / assets * 1000
+    history.close()
+    return {
+        "rows_recorded": n,
+        "insert_us_per_row": round(insert_s / n * 1e6, 1),
+        "percentile_ms": round(percentile_ms, 3),
+        "estimate_ms": round(estimate_ms, 3),
+        "db_mb": round((work / "history.db").stat().st_size / 2 ** 20, 2),
+    }
+
+
+def bench_packing(work: Path):
+    rng = random.Random(5)
+    history = RunHistory(work / "packing.db")
+    days = [f"2024-{m:02d}-{d:02d}" for m in range(1, 13) for d in range(1, 29)]
+    # Month-end partitions are much heavier
+    typical = {day: 120 * rng.lognormvariate(0, 0.6) * (8 if day.endswith(("-27", "-28")) else 1) for day in days}
+    for day, cost in typical.items():
+        for i in range(5):
+            history.record("regional_sales_to_s3", cost * rng.uniform(0.9, 1.1), partition=day, started_at=i)
+
+    def actual(run):
+        return sum(typical[d] for d in run)
+
+    packed = pack_partitions(history, "regional_sales_to_s3", days, BUDGET_SECONDS, q=90)
+    per_run = -(-len(days) // len(packed))
+    fixed = [days[i:i + per_run] for i in range(0, len(days), per_run)]
+    history.close()
+    report = {}
+    for name, runs in (("fixed_count", fixed), ("packed_by_cost", packed)):
+        durations = [actual(r) for r in runs]
+        report[name] = {
+            "runs": len(runs),
+            "longest_run_s": round(max(durations)),
+            "runs_over_budget": sum(d > BUDGET_SECONDS for d in durations),
+        }
+    return report
+
+
+def run_benchmark(assets, partitions, runs):
+    work = Path(tempfile.mkdtemp(prefix="bench_run_history_"))
+    try:
+        return {
+            "store": bench_store(work, assets, partitions, runs),
+            "packing": {"budget_s": BUDGET_SECONDS, **bench_packing(work)},
+        }
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--assets", type=int, default=50)
+    parser.add_argument("--partitions", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=100)
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args.assets, args.partitions, args.runs), indent=2))
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Asset-selection resolution benchmark
+Generates a synthetic code location (default 10k assets in 100 groups, each
+group a layered DAG with some cross-group edges, and 1k jobs mixing group,
+tag, `name*`, `*name` and explicit-key selections) and resolves every job's
+selection two ways:
+
+  traversal  per selection item: scan all assets for groups/tags, walk the
+             graph for `name*` / `*name` (what resolving each AssetSelection
+             against the full graph amounts to)
+  index      pipelines.selection_index.SelectionIndex, built once
+
+Both must produce the same keys for every job. Index build time is reported
+separately and included in its total.
+
+Usage:
+    python benchmarks/bench_selection_index.py --assets 10000 --jobs 1000
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from pipelines.scheduler import upstream_of
+from pipelines.selection_index import SelectionIndex
+
+
+def build_configs(assets: int, jobs: int, groups: int = 100, seed: int = 7):
+    rng = random.Random(seed)
+    per_group = max(1, assets // groups)
+    defined = []
+    for g in range(groups):
+        names = []
+        for j in range(per_group):
+            name = f"g{g:03d}_asset_{j:04d}"
+            asset = {"name": name, "group": f"group_{g:03d}", "tags": {"domain": f"d{g % 10}", "tier": str(j % 3)}}
+            if j:
+                ins = {f"in_{k}": {"key": up} for k, up in enumerate(rng.sample(names[max(0, j - 10):], min(2, j)))}
+                asset["ins"] = ins
+            if defined and rng.random() < 0.05:
+                asset["deps"] = [rng.choice(defined)["name"]]
+            names.append(name)
+            defined.append(asset)
+    job_defs = []
+    for i in range(jobs):
+        kind = i % 5
+        if kind == 0:
+            selection = [f"group:group_{rng.randrange(groups):03d}"]
+        elif kind == 1:
+            selection = [{"key": f"{rng.choice(defined)['name']}*"}, {"key": f"{rng.choice(defined)['name']}*"}]
+        elif kind == 2:
+            selection = [f"*{rng.choice(defined)['name']}"]
+        elif kind == 3:
+            selection = [{"tag": f"domain=d{rng.randrange(10)}"}, {"group": f"group_{rng.randrange(groups):03d}"}]
+        else:
+            selection = [a["name"] for a in rng.sample(defined, 20)]
+        job_defs.append({"name": f"job_{i:04d}", "selection": selection})
+    return [{"assets": defined, "jobs": job_defs}]
+
+
+class TraversalResolver:
+    """Resolves each selection item from scratch against the asset list and graph."""
+
+    def __init__(self, configs):
+        self.assets = [a for c in configs for a in c.get("assets") or []]
+        self.order = {a["name"]: i for i, a in enumerate(self.assets)}
+        self.parents = {a["name"]: upstream_of(a) for a in self.assets}
+        self.children = {a["name"]: set() for a in self.assets}
+        for name, ups in self.parents.items():
+            for up in ups:
+                if up in self.children:
+                    self.children[up].add(name)
+
+    def _walk(self, start, edges):
+        seen = {start}
+        queue = deque([start])
+        while queue:
+            for nxt in edges.get(queue.popleft(), ()):
+                if nxt not in seen:
+                    seen.add(nxt)
+                    queue.append(nxt)
+        return seen
+
+    def _item(self, item):
+        if isinstance(item, dict):
+            if "key" in item:
+                item = item["key"]
+            else:
+                (kind, value), = item.items()
+                item = f"{kind}:{value}"
+        down, up = item.endswith("*"), item.startswith("*")
+        core = item.strip("*")
+        if core.startswith("group:"):
+            return {a["name"] for a in self.assets if a.get("group") == core[6:]}
+        if core.startswith("tag:"):
+            k, _, v = core[4:].partition("=")
+            return {a["name"] for a in self.assets if str((a.get("tags") or {}).get(k)) == v}
+        selected = {core}
+        if down:
+            selected |= self._walk(core, self.children)
+        if up:
+            selected |= self._walk(core, self.parents)
+        return selected
+
+    def resolve(self, selection):
+        selected = set()
+        for item in selection:
+            selected |= self._item(item)
+        return sorted(selected, key=self.order.__getitem__)
+
+
+def run_benchmark(assets, jobs):
+    configs = build_configs(assets, jobs)
+    job_defs = configs[0]["jobs"]
+
+    t = time.perf_counter()
+    traversal = TraversalResolver(configs)
+    baseline = {job["name"]: traversal.resolve(job["selection"]) for job in job_defs}
+    traversal_s = time.perf_counter() - t
+
+    t = time.perf_counter()
+    index = SelectionIndex.from_configs(configs)
+    build_s = time.perf_counter() - t
+    t = time.perf_counter()
+    resolved = index.resolve_jobs(configs)
+    resolve_s = time.perf_counter() - t
+
+    assert resolved == baseline, "index and traversal disagree"
+    return {
+        "assets": assets,
+        "jobs": jobs,
+        "selected_keys": sum(len(v) for v in resolved.values()),
+        "traversal_seconds": round(traversal_s, 3),
+        "index_build_seconds": round(build_s, 3),
+        "index_resolve_seconds": round(resolve_s, 3),
+        "index_total_seconds": round(build_s + resolve_s, 3),
+        "speedup": round(traversal_s / (build_s + resolve_s), 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--assets", type=int, default=10_000)
+    parser.add_argument("--jobs", type=int, default=1_000)
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args.assets, args.jobs), indent=2))
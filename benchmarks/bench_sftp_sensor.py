@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+SFTP sensor tick benchmark
+Compares one sensor tick over a large directory (default 100k files):
+
+  restat    listdir, stat every matching file, then stat again to check
+            is-modifying (the sleep between the two is excluded)
+  snapshot  one listdir_iter/listdir_attr listing diffed against the
+            snapshot in the sensor cursor (pipelines.sftp_snapshot)
+
+Against the local stand-in, round trips are counted and charged at --rtt-ms
+on top of the measured local time (one per stat, one per READDIR batch of
+~100 entries divided by paramiko's read-ahead). With --sftp-host the same
+directory is seeded on a real server (e.g. atmoz/sftp in Docker) and timed
+directly.
+
+Usage:
+    python benchmarks/bench_sftp_sensor.py --files 100000 --rtt-ms 1
+    python benchmarks/bench_sftp_sensor.py --sftp-host localhost --sftp-port 2222 \
+        --sftp-user foo --sftp-password pass --sftp-path /upload/sensor --files 20000
+"""
+import argparse
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from pipelines.sftp_snapshot import DEFAULT_READ_AHEADS, LocalListing, tick
+
+PATTERN = r".*\.csv"
+READDIR_BATCH = 100
+
+
+class _LocalClient(LocalListing):
+    def listdir(self, path):
+        return os.listdir(path)
+
+    def stat(self, path):
+        return os.stat(path)
+
+
+def build_directory(path: Path, files: int) -> None:
+    path.mkdir(parents=True, exist_ok=True)
+    for i in range(files):
+        (path / f"inventory_{i:06d}.csv").write_bytes(b"id,qty\n1,2\n")
+
+
+def restat_tick(client, path: str):
+    import re
+    regex = re.compile(PATTERN)
+    started = time.perf_counter()
+    names = [n for n in client.listdir(path) if regex.match(n)]
+    first = {n: client.stat(f"{path}/{n}").st_size for n in names}
+    stable = [n for n in names if client.stat(f"{path}/{n}").st_size == first[n]]
+    return time.perf_counter() - started, 1 + 2 * len(names), len(stable)
+
+
+def snapshot_tick(client, path: str, cursor, entries: int):
+    result, cursor = tick(client, path, PATTERN, cursor=cursor)
+    # OPENDIR, then READDIR batches pipelined `read_aheads` deep
+    round_trips = 1 + math.ceil(entries / READDIR_BATCH / DEFAULT_READ_AHEADS)
+    return result.seconds, round_trips, result, cursor
+
+
+def run_benchmark(files, rtt_ms, client=None, remote_path=None):
+    work = Path(tempfile.mkdtemp(prefix="bench_sftp_sensor_"))
+    try:
+        if client is None:
+            path = work / "data"
+            build_directory(path, files)
+            client, path = _LocalClient(), str(path)
+            modeled = True
+        else:
+            path, modeled = remote_path, False
+        restat_s, restat_calls, _ = restat_tick(client, path)
+        entries = len(client.listdir(path))
+        first_s, snap_calls, _, cursor = snapshot_tick(client, path, None, entries)
+        steady_s, _, steady, cursor = snapshot_tick(client, path, cursor, entries)
+
+        def total(measured, calls):
+            return round(measured + (calls * rtt_ms / 1000 if modeled else 0), 3)
+
+        return {
+            "files": files,
+            "rtt_ms": rtt_ms if modeled else "real server",
+            "restat": {"round_trips": restat_calls, "tick_seconds": total(restat_s, restat_calls)},
+            "snapshot_first_tick": {"round_trips": snap_calls, "tick_seconds": total(first_s, snap_calls)},
+            "snapshot_steady_tick": {
+                "round_trips": snap_calls,
+                "tick_seconds": total(steady_s, snap_calls),
+                "ready": len(steady.ready),
+                "cursor_kb": round(len(cursor) / 1024, 1),
+            },
+        }
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def _remote(args):
+    import paramiko
+
+    transport = paramiko.Transport((args.sftp_host, args.sftp_port))
+    transport.connect(username=args.sftp_user, password=args.sftp_password)
+    sftp = paramiko.SFTPClient.from_transport(transport)
+    try:
+        sftp.mkdir(args.sftp_path)
+    except IOError:
+        pass
+    existing = set(sftp.listdir(args.sftp_path))
+    for i in range(args.files):
+        name = f"inventory_{i:06d}.csv"
+        if name not in existing:
+            with sftp.open(f"{args.sftp_path}/{name}", "wb") as f:
+                f.write(b"id,qty\n1,2\n")
+    return sftp
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--rtt-ms", type=float, default=1.0)
+    parser.add_argument("--sftp-host")
+    parser.add_argument("--sftp-port", type=int, default=22)
+    parser.add_argument("--sftp-user")
+    parser.add_argument("--sftp-password")
+    parser.add_argument("--sftp-path", default="/upload/sensor_bench")
+    args = parser.parse_args()
+
+    client = _remote(args) if args.sftp_host else None
+    print(json.dumps(run_benchmark(args.files, args.rtt_ms, client, args.sftp_path), indent=2))
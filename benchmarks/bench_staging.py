@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Local staging benchmark
+Decompresses a .csv.gz spill and turns it into multipart bodies (hashing each
+part as an upload would for Content-MD5), once the naive way and once through
+pipelines.staging:
+
+  bytes   gzip.open().read() into one bytes object, sliced into parts
+  staged  readinto() into a StagingArea file, mmap + memoryview parts
+
+Each case runs in a fresh process and reports peak RSS and user-space copies
+per byte, for several object sizes.
+
+Usage:
+    python benchmarks/bench_staging.py --sizes-mb 64 256 1024
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import multiprocessing
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from pipelines.staging import MB, StagingArea
+
+SAMPLE_FILE = BASE_DIR / "AdventureWorksSales_All.csv.gz"
+PART_BYTES = 8 * MB
+
+
+def build_source(path: Path, size_mb: int) -> int:
+    with gzip.open(SAMPLE_FILE, "rb") as f:
+        sample = f.read()
+    written = 0
+    with gzip.open(path, "wb", compresslevel=1) as out:
+        while written < size_mb * MB:
+            out.write(sample)
+            written += len(sample)
+    return written
+
+
+def _bytes_mode(src: Path, work: Path):
+    with gzip.open(src, "rb") as f:
+        data = f.read()
+    copied = len(data)
+    digests = []
+    for start in range(0, len(data), PART_BYTES):
+        part = data[start:start + PART_BYTES]
+        copied += len(part)
+        digests.append(hashlib.md5(part).hexdigest())
+    return len(data), copied, digests
+
+
+def _staged_mode(src: Path, work: Path):
+    area = StagingArea(work / "stage", quota_bytes=64 * 1024 * MB)
+    with area.create("spill.csv") as staged, gzip.open(src, "rb") as f:
+        staged.copy_from(f)
+    digests = []
+    with staged.mapped() as view:
+        for part in staged.parts(view, PART_BYTES):
+            digests.append(hashlib.md5(part).hexdigest())
+            part.release()
+    return staged.size, staged.bytes_copied, digests
+
+
+MODES = {"bytes": _bytes_mode, "staged": _staged_mode}
+
+
+def _child(mode, src, work, queue):
+    started = time.perf_counter()
+    size, copied, digests = MODES[mode](Path(src), Path(work))
+    queue.put({
+        "seconds": round(time.perf_counter() - started, 2),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "copies_per_byte": round(copied / size, 2),
+        "parts_md5": hashlib.md5("".join(digests).encode()).hexdigest(),
+    })
+
+
+def run_benchmark(sizes_mb):
+    ctx = multiprocessing.get_context("spawn")
+    report = {}
+    for size_mb in sizes_mb:
+        work = Path(tempfile.mkdtemp(prefix="bench_staging_"))
+        try:
+            src = work / "spill.csv.gz"
+            build_source(src, size_mb)
+            runs = {}
+            for mode in MODES:
+                queue = ctx.Queue()
+                proc = ctx.Process(target=_child, args=(mode, str(src), str(work), queue))
+                proc.start()
+                runs[mode] = queue.get()
+                proc.join()
+            assert runs["bytes"]["parts_md5"] == runs["staged"]["parts_md5"]
+            report[f"{size_mb}MB"] = runs
+        finally:
+            shutil.rmtree(work, ignore_errors=True)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes-mb", type=int, nargs="+", default=[64, 256, 1024])
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args.sizes_mb), indent=2))
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Code-location startup benchmark
+Imports a module (default: definitions) in a fresh interpreter under
+`python -X importtime` and reports total import time, peak RSS, the slowest
+top-level packages, and whether any connector stack was imported eagerly.
+
+Connector stacks (boto3, paramiko, pyodbc, psycopg2, snowflake-connector,
+pandas, pyarrow) should only load when an asset of that type executes, not
+when the code server or sensor daemon loads definitions.py.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --module definitions --top 15
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+CONNECTOR_PACKAGES = (
+    "boto3",
+    "botocore",
+    "paramiko",
+    "pyodbc",
+    "psycopg2",
+    "snowflake",
+    "pandas",
+    "pyarrow",
+)
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+_PROBE = (
+    # __import__ (not importlib.import_module) so -X importtime logs the import
+    "import resource, sys; __import__(sys.argv[1]); "
+    "print('PEAK_RSS_KB', resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+)
+
+
+def import_profile(module: str = "definitions", cwd: Path = BASE_DIR) -> dict:
+    """Runs the import in a subprocess and parses the -X importtime report."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE, module],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": str(cwd)},
+    )
+    if proc.returncode != 0:
+        tail = proc.stderr.strip().splitlines()[-1:] or ["unknown error"]
+        raise RuntimeError(f"import {module} failed: {tail[0]}")
+
+    modules = {}
+    total_us = 0
+    by_package = defaultdict(int)
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if not m:
+            continue
+        self_us, cumulative_us, indent, name = int(m.group(1)), int(m.group(2)), m.group(3), m.group(4)
+        modules[name] = cumulative_us
+        by_package[name.split(".")[0]] += self_us
+        # The outermost entry (least indented) for the target gives the total
+        if name == module and len(indent) <= 1:
+            total_us = cumulative_us
+
+    peak_kb = next(
+        (int(l.split()[1]) for l in proc.stdout.splitlines() if l.startswith("PEAK_RSS_KB")), 0
+    )
+    connectors = sorted(p for p in CONNECTOR_PACKAGES if p in by_package)
+    return {
+        "module": module,
+        "total_ms": round(total_us / 1000, 1),
+        "modules_imported": len(modules),
+        "peak_rss_mb": round(peak_kb / 1024, 1),
+        "eager_connector_packages": connectors,
+        "pipelines_ms": round(by_package.get("pipelines", 0) / 1000, 1),
+        "pipelines_modules": sorted(m for m in modules if m == "pipelines" or m.startswith("pipelines.")),
+        "slowest_packages_ms": {
+            k: round(v / 1000, 1)
+            for k, v in sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:20]
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="definitions")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    report = import_profile(args.module)
+    report["slowest_packages_ms"] = dict(list(report["slowest_packages_ms"].items())[: args.top])
+    print(json.dumps(report, indent=2))
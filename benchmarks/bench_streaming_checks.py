@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Inline data-quality check overhead benchmark
+Streams a scaled AdventureWorks CSV through pipelines.streaming_checks.CsvTap
+in 1 MB chunks, first with no checks (the parse baseline an operator pays
+anyway) and then with each check type alone and all together. Reports
+microseconds per row and overhead relative to the baseline.
+
+Usage:
+    python benchmarks/bench_streaming_checks.py --rows 500000
+"""
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from benchmarks import synthetic
+from pipelines.streaming_checks import CsvTap
+
+MB = 1024 * 1024
+
+CHECKS = {
+    "row_count": {"name": "sales_row_count", "type": "row_count", "min": 1},
+    "null_ratio": {"name": "middle_name_nulls", "type": "null_ratio", "column": "CustomerMiddleName", "threshold": 1.0},
+    "min_max": {"name": "unit_price_range", "type": "min_max", "column": "SalesUnitPrice", "min": 0},
+    "approx_distinct": {"name": "distinct_products", "type": "approx_distinct", "column": "ProductKey"},
+    "unique_key_bloom": {"name": "order_line_unique", "type": "unique_key",
+                         "columns": list(synthetic.KEY_COLUMNS), "method": "bloom"},
+    "unique_key_hll": {"name": "order_line_unique_hll", "type": "unique_key",
+                       "columns": list(synthetic.KEY_COLUMNS), "method": "hll"},
+}
+
+
+def _stream(path: Path, checks):
+    tap = CsvTap(checks)
+    started = time.perf_counter()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(MB)
+            if not chunk:
+                break
+            tap.write(chunk)
+    results = tap.close()
+    return time.perf_counter() - started, results
+
+
+def run_benchmark(rows, repeat):
+    work = Path(tempfile.mkdtemp(prefix="bench_checks_"))
+    try:
+        src = work / "AdventureWorksSales_All.csv"
+        synthetic.write_csv(src, rows)
+        cases = {"baseline": []}
+        cases.update({name: [cfg] for name, cfg in CHECKS.items()})
+        cases["all"] = list(CHECKS.values())
+
+        report = {}
+        for name, checks in cases.items():
+            seconds = min(_stream(src, checks)[0] for _ in range(repeat))
+            report[name] = {"seconds": round(seconds, 3), "us_per_row": round(seconds / rows * 1e6, 2)}
+        base = report["baseline"]["seconds"]
+        for name, entry in report.items():
+            entry["overhead_pct"] = round((entry["seconds"] - base) / base * 100, 1)
+        _, results = _stream(src, cases["all"])
+        return {"rows": rows, "repeat": repeat, "checks": report, "results": results}
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args.rows, args.repeat), indent=2, default=str))
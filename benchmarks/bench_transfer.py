@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Small-object transfer benchmark
+Copies a prefix of many small objects (default 100k x 10KB) between two local
+stand-in stores, once with a thread pool of blocking get/put calls (the
+current per-object path) and once with pipelines.transfer's async core.
+
+--latency-ms adds a per-request round trip to every get and put, which is
+what dominates small-object S3/SFTP traffic; with 0 the run measures pure
+local overhead only.
+
+Usage:
+    python benchmarks/bench_transfer.py --objects 100000 --latency-ms 20
+    python benchmarks/bench_transfer.py --objects 10000 --threads 64 --in-flight 1000
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from pipelines.compaction import LocalStorage
+from pipelines.transfer import AsyncLocalStorage, copy_prefix
+
+PREFIX = "landing/objects/"
+
+
+class _LatencyAsync:
+    def __init__(self, inner, latency):
+        self.inner, self.latency, self.endpoint = inner, latency, inner.endpoint
+
+    async def list(self, prefix, pattern=None):
+        return await self.inner.list(prefix, pattern)
+
+    async def get(self, key):
+        await asyncio.sleep(self.latency)
+        return await self.inner.get(key)
+
+    async def put(self, key, data):
+        await asyncio.sleep(self.latency)
+        await self.inner.put(key, data)
+
+
+def build_prefix(root: Path, objects: int, size: int) -> None:
+    base = root / PREFIX
+    payload = os.urandom(size)
+    for i in range(objects):
+        shard = base / f"{i // 1000:04d}"
+        if i % 1000 == 0:
+            shard.mkdir(parents=True, exist_ok=True)
+        (shard / f"obj_{i:07d}.bin").write_bytes(payload)
+
+
+def run_threaded(src_root, dst_root, threads, latency):
+    src, dst = LocalStorage(src_root), LocalStorage(dst_root)
+
+    def copy(obj):
+        time.sleep(latency)
+        with src.open_read(obj.key) as f:
+            data = f.read()
+        time.sleep(latency)
+        dst.write("outbound/" + obj.key[len(PREFIX):], io.BytesIO(data))
+        return len(data)
+
+    started = time.perf_counter()
+    keys = src.list(PREFIX)
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        copied = sum(pool.map(copy, keys, chunksize=64))
+    return len(keys), copied, time.perf_counter() - started
+
+
+def run_async(src_root, dst_root, in_flight, latency):
+    src = _LatencyAsync(AsyncLocalStorage(src_root, endpoint="s3_prod"), latency)
+    dst = _LatencyAsync(AsyncLocalStorage(dst_root, endpoint="sftp_prod"), latency)
+    started = time.perf_counter()
+    result = copy_prefix(src, dst, PREFIX, "outbound/", max_in_flight=in_flight)
+    return result["objects"], result["bytes"], time.perf_counter() - started
+
+
+def run_benchmark(objects, size, latency_ms, threads, in_flight):
+    work = Path(tempfile.mkdtemp(prefix="bench_transfer_"))
+    try:
+        build_prefix(work / "src", objects, size)
+        results = {}
+        for name, fn, width in (("threaded", run_threaded, threads), ("async", run_async, in_flight)):
+            dst = work / f"dst_{name}"
+            count, copied, seconds = fn(work / "src", dst, width, latency_ms / 1000)
+            assert count == objects and copied == objects * size
+            results[name] = {
+                "concurrency": width,
+                "seconds": round(seconds, 2),
+                "objects_per_s": round(count / seconds),
+            }
+            shutil.rmtree(dst)
+        results["speedup"] = round(results["threaded"]["seconds"] / results["async"]["seconds"], 2)
+        return {"objects": objects, "object_bytes": size, "latency_ms": latency_ms, "results": results}
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objects", type=int, default=100_000)
+    parser.add_argument("--size", type=int, default=10 * 1024)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--in-flight", type=int, default=1000)
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args.objects, args.size, args.latency_ms, args.threads, args.in_flight), indent=2))
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+End-to-end pipeline throughput benchmark
+Runs representative pipeline shapes against local stand-ins and reports
+rows/s, MB/s, peak RSS and per-phase timings as JSON.
+
+Scenarios (mirroring pipelines/ YAMLs):
+  csv_to_parquet          s3_s3_csv_to_parquet.yaml
+  csv_to_json             s3_s3_csv_to_json.yaml
+  sftp_to_s3_multi_file   master_showcase.yaml (ingestion_sftp_inventory)
+  sql_to_s3_partitioned   multi_partitioned_pipeline.yaml (region partitions)
+  s3_to_snowflake_merge   snowflake_merge/sample_merge_pipeline (MERGE + hard delete)
+
+The scenarios are hand-written approximations of those pipelines (csv /
+pyarrow / sqlite3 calls, and RecordingSnowflake for the warehouse), not the
+operators the YAMLs run: those live in nexus_foundry, outside this repo. The
+numbers track the cost of each pipeline shape on this machine; they do not
+catch a regression in the operators themselves.
+
+Setup phases ("generate", "seed_sftp") are reported but not counted in
+`seconds` or the rates.
+
+Each scenario runs in its own process so peak RSS is per scenario. A
+scenario whose optional dependency is missing is reported as "skipped"; any
+other failure (including the process dying or hitting --timeout) is "error",
+and the exit status is then 1.
+
+Usage:
+    python benchmarks/harness.py --rows 200000 --output bench_output.json
+    python benchmarks/harness.py --scenario csv_to_json --s3-endpoint http://localhost:9000
+"""
+import argparse
+import csv
+import io
+import json
+import multiprocessing
+import platform
+import queue as queue_module
+import resource
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from benchmarks import synthetic
+from benchmarks.stand_ins import RecordingSnowflake, SFTPSource, make_s3_storage
+from pipelines.instrumentation import Instrumentation
+
+MB = 1024 * 1024
+SETUP_PHASES = ("generate", "seed_sftp")
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KB on Linux, bytes on macOS
+    return peak / MB if platform.system() == "Darwin" else peak / 1024
+
+
+def _read_all(storage, key) -> bytes:
+    with storage.open_read(key) as f:
+        return f.read()
+
+
+# ---------------------------------------------------------------------------
+# Scenarios: each returns (rows, bytes) and records phases on `timer`
+# ---------------------------------------------------------------------------
+
+def csv_to_parquet(work: Path, rows: int, storage, timer: Instrumentation, opts):
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+
+    src = work / "adventures" / "AdventureWorksSales_All.csv"
+    with timer.phase("generate"):
+        size = synthetic.write_csv(src, rows)
+    with timer.phase("parse"):
+        table = pacsv.read_csv(src)
+    out = work / "out.parquet"
+    with timer.phase("serialize"):
+        pq.write_table(table, out, compression="SNAPPY")
+    with timer.phase("upload"):
+        with open(out, "rb") as f:
+            storage.write("adventures/parquet/AdventureWorksSales_All.parquet", f)
+    return table.num_rows, size
+
+
+def csv_to_json(work: Path, rows: int, storage, timer: Instrumentation, opts):
+    src = work / "adventures" / "AdventureWorksSales_All.csv"
+    with timer.phase("generate"):
+        size = synthetic.write_csv(src, rows)
+    with timer.phase("parse"):
+        with open(src, encoding="utf-8", newline="") as f:
+            records = list(csv.DictReader(f))
+    out = work / "out.json"
+    with timer.phase("serialize"):
+        with open(out, "w", encoding="utf-8") as f:
+            f.write("[")
+            for i, rec in enumerate(records):
+                if i:
+                    f.write(",")
+                f.write(json.dumps(rec))
+            f.write("]")
+    with timer.phase("upload"):
+        with open(out, "rb") as f:
+            storage.write("adventures/json/AdventureWorksSales_All.json", f)
+    return len(records), size
+
+
+def sftp_to_s3_multi_file(work: Path, rows: int, storage, timer: Instrumentation, opts):
+    files = opts.files
+    local_dir = work / "upload"
+    with timer.phase("generate"):
+        size = synthetic.write_csv_files(local_dir, files, max(1, rows // files))
+    source = SFTPSource(
+        opts.sftp_path if opts.sftp_host else str(local_dir),
+        host=opts.sftp_host,
+        port=opts.sftp_port,
+        username=opts.sftp_user,
+        password=opts.sftp_password,
+    )
+    if opts.sftp_host:
+        with timer.phase("seed_sftp"):
+            for p in sorted(local_dir.iterdir()):
+                source.put(str(p), p.name)
+    with timer.phase("list"):
+        listing = source.list()
+    with timer.phase("transfer"):
+        for path, _ in listing:
+            with source.open_read(path) as f:
+                storage.write(f"raw/inventory/{Path(path).name}", f)
+    return max(1, rows // files) * files, size
+
+
+def sql_to_s3_partitioned(work: Path, rows: int, storage, timer: Instrumentation, opts):
+    conn = sqlite3.connect(work / "sales.db")
+    with timer.phase("generate"):
+        synthetic.load_sqlite(conn, rows)
+    col = synthetic.PARTITION_COLUMN
+    regions = [r[0] for r in conn.execute(f'SELECT DISTINCT "{col}" FROM SALES_EXTRACT')]
+    total_rows = 0
+    total_bytes = 0
+    for region in regions:
+        cur = conn.execute(f'SELECT * FROM SALES_EXTRACT WHERE "{col}" = ?', (region,))
+        header = [d[0] for d in cur.description]
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(header)
+        while True:
+            with timer.phase("extract") as phase:
+                chunk = cur.fetchmany(opts.rows_chunk)
+                phase.add(rows=len(chunk))
+            if not chunk:
+                break
+            with timer.phase("serialize"):
+                writer.writerows(chunk)
+            total_rows += len(chunk)
+        data = buf.getvalue().encode("utf-8")
+        total_bytes += len(data)
+        with timer.phase("upload") as phase:
+            phase.add(bytes=len(data))
+            storage.write(f"raw/regional_sales/region={region}/sales.csv", io.BytesIO(data))
+    conn.close()
+    return total_rows, total_bytes
+
+
+def s3_to_snowflake_merge(work: Path, rows: int, storage, timer: Instrumentation, opts):
+    files = opts.files
+    staged = work / "staged"
+    with timer.phase("generate"):
+        size = synthetic.write_csv_files(staged, files, max(1, rows // files))
+        for p in sorted(staged.iterdir()):
+            with open(p, "rb") as f:
+                storage.write(f"merge_test/full_sync/{p.name}", f)
+
+    snowflake = RecordingSnowflake()
+    with timer.phase("list"):
+        keys = [o.key for o in storage.list("merge_test/full_sync/")]
+    with timer.phase("download"):
+        payloads = [(k, _read_all(storage, k)) for k in keys]
+    with timer.phase("put"):
+        for k, data in payloads:
+            snowflake.put("MERGE_STAGE", k.rsplit("/", 1)[-1], data)
+    with timer.phase("copy"):
+        loaded = snowflake.copy_into("SALES_MERGE_HARD_STG", "MERGE_STAGE", synthetic.KEY_COLUMNS)
+    with timer.phase("merge"):
+        snowflake.merge("SALES_MERGE_HARD", "SALES_MERGE_HARD_STG", hard_delete=True)
+    return loaded, size
+
+
+SCENARIOS = {
+    "csv_to_parquet": csv_to_parquet,
+    "csv_to_json": csv_to_json,
+    "sftp_to_s3_multi_file": sftp_to_s3_multi_file,
+    "sql_to_s3_partitioned": sql_to_s3_partitioned,
+    "s3_to_snowflake_merge": s3_to_snowflake_merge,
+}
+
+
+def _run_scenario(name, opts, queue):
+    work = Path(tempfile.mkdtemp(prefix=f"bench_{name}_"))
+    try:
+        storage = make_s3_storage(work / "bucket", endpoint_url=opts.s3_endpoint)
+        timer = Instrumentation(name=name)
+        started = time.perf_counter()
+        rows, size = SCENARIOS[name](work, opts.rows, storage, timer, opts)
+        # Data generation and seeding are setup, not pipeline work
+        setup_ns = sum(timer.phases[p].work_ns for p in SETUP_PHASES if p in timer.phases)
+        elapsed = time.perf_counter() - started - setup_ns / 1e9
+        queue.put({
+            "status": "ok",
+            "rows": rows,
+            "mb": round(size / MB, 2),
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(rows / elapsed, 1) if elapsed else None,
+            "mb_per_second": round(size / MB / elapsed, 2) if elapsed else None,
+            "peak_rss_mb": round(_peak_rss_mb(), 1),
+            "phases": timer.summary(),
+        })
+    except ImportError as e:
+        queue.put({"status": "skipped", "reason": f"{e.name or e} is not installed"})
+    except Exception as e:  # noqa: BLE001 - reported, the other scenarios still run
+        queue.put({"status": "error", "reason": f"{type(e).__name__}: {e}"})
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def _wait_result(proc, queue, timeout=None, poll=0.5) -> dict:
+    """The scenario's result, or an error if its process dies (or runs past `timeout`) without one."""
+    deadline = time.monotonic() + timeout if timeout else None
+    while True:
+        try:
+            return queue.get(timeout=poll)
+        except queue_module.Empty:
+            pass
+        if not proc.is_alive():
+            try:
+                # The result may still be in flight from the exiting process
+                return queue.get(timeout=poll)
+            except queue_module.Empty:
+                return {"status": "error", "reason": f"process exited with code {proc.exitcode} without a result"}
+        if deadline is not None and time.monotonic() > deadline:
+            proc.terminate()
+            return {"status": "error", "reason": f"timed out after {timeout}s"}
+
+
+def run(opts):
+    ctx = multiprocessing.get_context("spawn")
+    results = {}
+    for name in opts.scenario or SCENARIOS:
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_run_scenario, args=(name, opts, queue))
+        proc.start()
+        results[name] = _wait_result(proc, queue, opts.timeout)
+        proc.join()
+        status = results[name]
+        if status["status"] == "ok":
+            print(f"✅ {name}: {status['rows_per_second']:,} rows/s, {status['peak_rss_mb']} MB peak", file=sys.stderr)
+        elif status["status"] == "skipped":
+            print(f"⚠️  {name}: skipped ({status['reason']})", file=sys.stderr)
+        else:
+            print(f"❌ {name}: error ({status['reason']})", file=sys.stderr)
+    return {
+        "benchmark": "pipeline_throughput",
+        "rows": opts.rows,
+        "python": platform.python_version(),
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "scenarios": results,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--files", type=int, default=100, help="File count for multi-file scenarios")
+    parser.add_argument("--rows-chunk", type=int, default=10000)
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS))
+    parser.add_argument("--output", help="Write the JSON report here as well as stdout")
+    parser.add_argument("--timeout", type=float, help="Seconds before a scenario is stopped and reported as an error")
+    parser.add_argument("--s3-endpoint", help="MinIO/moto server URL; default is a local directory")
+    parser.add_argument("--sftp-host")
+    parser.add_argument("--sftp-port", type=int, default=22)
+    parser.add_argument("--sftp-user")
+    parser.add_argument("--sftp-password")
+    parser.add_argument("--sftp-path", default="/upload")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text)
+    if any(r["status"] == "error" for r in report["scenarios"].values()):
+        sys.exit(1)
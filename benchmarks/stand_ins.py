@@ -0,0 +1,109 @@
+"""
+Local stand-ins for the external systems used by the benchmarks.
+
+S3 is a local directory (pipelines.compaction.LocalStorage) unless an
+S3-compatible endpoint such as MinIO is given. SFTP is a local directory unless
+a server is given. SQL sources are SQLite. Snowflake is a recording fake that
+applies PUT / COPY INTO / MERGE to in-memory tables so results can be checked.
+"""
+import csv
+import io
+import posixpath
+import stat
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from pipelines.codecs import decompress
+from pipelines.compaction import LocalStorage, S3Storage
+
+
+def make_s3_storage(root, bucket_name: str = "my-dagster-poc", endpoint_url: Optional[str] = None):
+    """LocalStorage under `root`, or S3Storage against a MinIO/moto endpoint."""
+    if endpoint_url:
+        import boto3
+        client = boto3.client("s3", endpoint_url=endpoint_url)
+        return S3Storage(bucket_name, client=client)
+    return LocalStorage(root)
+
+
+class SFTPSource:
+    """Lists and reads files from a local directory or a real SFTP server via paramiko."""
+
+    def __init__(self, path: str, host: Optional[str] = None, port: int = 22,
+                 username: Optional[str] = None, password: Optional[str] = None):
+        self.path = path
+        self._sftp = None
+        if host:
+            import paramiko
+            transport = paramiko.Transport((host, port))
+            transport.connect(username=username, password=password)
+            self._sftp = paramiko.SFTPClient.from_transport(transport)
+
+    def list(self) -> List[Tuple[str, int]]:
+        if self._sftp:
+            return sorted(
+                (posixpath.join(self.path, a.filename), a.st_size)
+                for a in self._sftp.listdir_attr(self.path)
+                if stat.S_ISREG(a.st_mode)
+            )
+        return sorted((str(p), p.stat().st_size) for p in Path(self.path).iterdir() if p.is_file())
+
+    def put(self, local_path: str, file_name: str) -> None:
+        """Seeds the source; only needed when it is a real server."""
+        if self._sftp:
+            self._sftp.put(local_path, posixpath.join(self.path, file_name))
+
+    def open_read(self, path: str):
+        if self._sftp:
+            f = self._sftp.open(path, "rb")
+            f.prefetch()
+            return f
+        return open(path, "rb")
+
+
+class RecordingSnowflake:
+    """
+    Minimal Snowflake fake: records every statement and keeps tables in memory.
+
+    stage -> {file_name: bytes}; tables -> {key_tuple: row_dict}.
+    """
+
+    def __init__(self):
+        self.statements: List[str] = []
+        self.stages: Dict[str, Dict[str, bytes]] = {}
+        self.tables: Dict[str, Dict[tuple, Dict[str, str]]] = {}
+
+    def put(self, stage: str, file_name: str, data: bytes) -> None:
+        self.statements.append(f"PUT file://{file_name} @{stage}")
+        self.stages.setdefault(stage, {})[file_name] = data
+
+    def copy_into(self, table: str, stage: str, key_columns, compression: str = "NONE") -> int:
+        self.statements.append(
+            f"COPY INTO {table} FROM @{stage} FILE_FORMAT=(TYPE=CSV COMPRESSION={compression} SKIP_HEADER=1)"
+        )
+        rows = self.tables.setdefault(table, {})
+        loaded = 0
+        for data in self.stages.get(stage, {}).values():
+            data = decompress(compression, data)
+            for row in csv.DictReader(io.StringIO(data.decode("utf-8"))):
+                rows[tuple(row[k] for k in key_columns)] = row
+                loaded += 1
+        return loaded
+
+    def merge(self, target: str, source: str, hard_delete: bool = True) -> Dict[str, int]:
+        self.statements.append(
+            f"MERGE INTO {target} USING {source} ON <keys> "
+            "WHEN MATCHED THEN UPDATE WHEN NOT MATCHED THEN INSERT"
+        )
+        src = self.tables.get(source, {})
+        tgt = self.tables.setdefault(target, {})
+        inserted = sum(1 for k in src if k not in tgt)
+        updated = len(src) - inserted
+        deleted = 0
+        if hard_delete:
+            stale = [k for k in tgt if k not in src]
+            deleted = len(stale)
+            for k in stale:
+                del tgt[k]
+        tgt.update(src)
+        return {"inserted": inserted, "updated": updated, "deleted": deleted}
@@ -0,0 +1,89 @@
+"""
+Scaled synthetic AdventureWorks data for the benchmarks.
+
+Rows are cycled from the bundled AdventureWorksSales_All.csv.gz sample, with
+SalesOrderNumber rewritten per cycle so keys stay unique at any scale (merge
+benchmarks rely on that).
+"""
+import csv
+import gzip
+import sqlite3
+from pathlib import Path
+from typing import Iterator, List
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+SAMPLE_FILE = BASE_DIR / "AdventureWorksSales_All.csv.gz"
+
+KEY_COLUMNS = ("SalesOrderNumber", "SalesOrderLineNumber")
+PARTITION_COLUMN = "SalesTerritoryRegion"
+
+
+def _open_sample():
+    return gzip.open(SAMPLE_FILE, "rt", encoding="utf-8-sig", newline="")
+
+
+def header() -> List[str]:
+    with _open_sample() as f:
+        return next(csv.reader(f))
+
+
+def iter_rows(rows_target: int) -> Iterator[List[str]]:
+    """
+    Yields `rows_target` rows, cycling the sample with unique order numbers.
+
+    The sample is streamed on every cycle rather than held in memory, so the
+    generator does not skew the peak RSS the benchmarks report.
+    """
+    emitted = 0
+    cycle = 0
+    while emitted < rows_target:
+        with _open_sample() as f:
+            reader = csv.reader(f)
+            next(reader)
+            for row in reader:
+                if emitted >= rows_target:
+                    return
+                if cycle:
+                    row[0] = f"{row[0]}-{cycle}"
+                yield row
+                emitted += 1
+        cycle += 1
+
+
+def write_csv(path: Path, rows_target: int) -> int:
+    """Writes a scaled CSV and returns its size in bytes."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header())
+        writer.writerows(iter_rows(rows_target))
+    return path.stat().st_size
+
+
+def write_csv_files(directory: Path, files: int, rows_per_file: int) -> int:
+    """Writes `files` CSVs of `rows_per_file` rows each; returns total bytes."""
+    directory.mkdir(parents=True, exist_ok=True)
+    cols = header()
+    rows = iter_rows(files * rows_per_file)
+    total = 0
+    for i in range(files):
+        path = directory / f"inventory_{i:05d}.csv"
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(cols)
+            for _ in range(rows_per_file):
+                writer.writerow(next(rows))
+        total += path.stat().st_size
+    return total
+
+
+def load_sqlite(conn: sqlite3.Connection, rows_target: int, table: str = "SALES_EXTRACT") -> None:
+    """Creates `table` in SQLite (all TEXT columns, like the raw CSV) and fills it."""
+    cols = header()
+    col_sql = ", ".join(f'"{c}" TEXT' for c in cols)
+    conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+    conn.execute(f'CREATE TABLE "{table}" ({col_sql})')
+    placeholders = ", ".join("?" for _ in cols)
+    conn.executemany(f'INSERT INTO "{table}" VALUES ({placeholders})', iter_rows(rows_target))
+    conn.execute(f'CREATE INDEX "ix_{table}_region" ON "{table}" ("{PARTITION_COLUMN}")')
+    conn.commit()
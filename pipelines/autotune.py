@@ -0,0 +1,234 @@
+"""
+Adaptive batch sizing for fetch chunks, write batches and multipart parts.
+
+`rows_chunk: 10000` suits a 10-column table on a LAN; a 3-column table over
+a slow link wants far bigger round trips, a 200-column table far smaller
+ones. Any of these settings can be set to `auto` and is then tuned during
+the run:
+
+    source:
+      type: SQLSERVER
+      configs:
+        rows_chunk: auto              # fetchmany() size
+    target:
+      type: S3
+      configs:
+        batch_size: auto              # rows per write / executemany
+        part_size: auto               # bytes per multipart part
+    autotune:                         # optional bounds (defaults below)
+      rows_chunk: {min: 1000, max: 500000}
+      memory_mb: 256                  # per-batch budget shared by all knobs
+
+Each knob is an AIMDTuner: it grows (doubling at first, then additively)
+while throughput improves, settles on the best value seen once it stops
+improving, and backs off multiplicatively when throughput drops or a batch
+would exceed the memory budget. That value is stored per asset in .nexus_cache/autotune.json, so the
+next run starts there instead of at the default.
+"""
+import time
+from pathlib import Path
+from typing import Dict, Mapping, Optional
+
+from pipelines.json_store import JsonFileStore
+
+DEFAULT_STORE_PATH = Path(".nexus_cache") / "autotune.json"
+
+MB = 1024 * 1024
+AUTO = "auto"
+
+# knob -> (default start, min, max)
+DEFAULTS = {
+    "rows_chunk": (10_000, 1_000, 500_000),
+    "batch_size": (10_000, 1_000, 500_000),
+    "part_size": (8 * MB, 5 * MB, 256 * MB),
+}
+DEFAULT_MEMORY_MB = 256
+
+
+class AIMDTuner:
+    """
+    Additive-increase / multiplicative-decrease controller for one batch size.
+
+        tuner = AIMDTuner("rows_chunk", start=10_000, minimum=1_000, maximum=500_000)
+        while True:
+            t = time.perf_counter()
+            rows = cursor.fetchmany(tuner.value)
+            if not rows:
+                break
+            tuner.record(len(rows), time.perf_counter() - t, nbytes)
+
+    `record()` takes the units moved (rows or bytes), the seconds it took and
+    optionally the bytes the batch held, and returns the next value. Growth
+    continues while throughput rises by more than `gain`; a drop of more than
+    `tolerance` backs off by `decrease`.
+    """
+
+    def __init__(self, name: str, start: int, minimum: int, maximum: int, step: Optional[int] = None,
+                 decrease: float = 0.5, tolerance: float = 0.1, gain: float = 0.02,
+                 memory_budget: Optional[int] = None, slow_start: bool = True):
+        if minimum > maximum:
+            raise ValueError(f"Autotune '{name}': min {minimum} is greater than max {maximum}")
+        self.name = name
+        self.minimum = minimum
+        self.maximum = maximum
+        self.step = step or max(1, (maximum - minimum) // 20)
+        self.decrease = decrease
+        self.tolerance = tolerance
+        self.gain = gain
+        self.memory_budget = memory_budget
+        self.slow_start = slow_start
+        self.samples = 0
+        self.backoffs = 0
+        self._last_rate: Optional[float] = None
+        self._bytes_per_unit: Optional[float] = None
+        self._rates: Dict[int, float] = {}
+        self.value = self._clamp(start)
+
+    def _clamp(self, value) -> int:
+        value = min(self.maximum, max(self.minimum, int(value)))
+        if self.memory_budget and self._bytes_per_unit:
+            value = min(value, max(self.minimum, int(self.memory_budget / self._bytes_per_unit)))
+        return value
+
+    def record(self, units: int, seconds: float, nbytes: Optional[int] = None) -> int:
+        if units < self.value or seconds <= 0:
+            # A short batch is the tail of the data, not a signal
+            return self.value
+        self.samples += 1
+        rate = units / seconds
+        if nbytes:
+            self._bytes_per_unit = nbytes / units
+        # Smoothed throughput per value tried; best_value is read from here
+        previous = self._rates.get(self.value)
+        self._rates[self.value] = rate if previous is None else 0.5 * previous + 0.5 * rate
+
+        over_budget = bool(
+            self.memory_budget and self._bytes_per_unit
+            and self.value * self._bytes_per_unit > self.memory_budget
+        )
+        last = self._last_rate
+        if over_budget or (last is not None and rate < last * (1 - self.tolerance)):
+            self.backoffs += 1
+            self.slow_start = False
+            nxt = self.value * self.decrease
+        elif last is None or rate > last * (1 + self.gain):
+            nxt = self.value * 2 if self.slow_start else self.value + self.step
+        else:
+            # Plateau: growing no longer pays, settle on the best value seen
+            self.slow_start = False
+            nxt = self.best_value
+        self._last_rate = rate
+        self.value = self._clamp(nxt)
+        return self.value
+
+    @property
+    def best_value(self) -> int:
+        """Value with the highest smoothed throughput that fits the memory budget."""
+        fitting = {
+            v: r for v, r in self._rates.items()
+            if not (self.memory_budget and self._bytes_per_unit and v * self._bytes_per_unit > self.memory_budget)
+        }
+        if not fitting:
+            return self.value
+        return max(fitting, key=fitting.get)
+
+
+def is_auto(value) -> bool:
+    return isinstance(value, str) and value.strip().lower() == AUTO
+
+
+class TuningStore:
+    """
+    Converged values per asset, in one JSON file per code location
+    (a pipelines.json_store.JsonFileStore, like SchemaCache).
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = Path(path)
+        self._store = JsonFileStore(self.path)
+
+    def get(self, asset_name: str) -> Dict[str, int]:
+        entry = self._store.read().get(asset_name) or {}
+        return {knob: v["value"] for knob, v in entry.items()}
+
+    def save(self, asset_name: str, tuners: Mapping[str, AIMDTuner]) -> None:
+        learned = {
+            knob: {"value": tuner.best_value, "samples": tuner.samples, "updated_at": time.time()}
+            for knob, tuner in tuners.items() if tuner.samples
+        }
+        self._store.update(lambda entries: entries.setdefault(asset_name, {}).update(learned))
+
+
+class BatchSizing:
+    """
+    The batch settings for one asset run: fixed values pass through, `auto`
+    knobs are tuners seeded from the store.
+
+        sizing = BatchSizing.from_asset(asset_config, store)
+        rows = cursor.fetchmany(sizing.get("rows_chunk"))
+        sizing.record("rows_chunk", len(rows), seconds, nbytes)
+        ...
+        sizing.save()
+    """
+
+    def __init__(self, asset_name: str, fixed: Mapping[str, int], tuners: Mapping[str, AIMDTuner],
+                 store: Optional[TuningStore] = None):
+        self.asset_name = asset_name
+        self.fixed = dict(fixed)
+        self.tuners = dict(tuners)
+        self.store = store
+
+    @classmethod
+    def from_asset(cls, asset: Mapping, store: Optional[TuningStore] = None) -> "BatchSizing":
+        source_cfg = (asset.get("source") or {}).get("configs") or {}
+        target_cfg = (asset.get("target") or {}).get("configs") or {}
+        bounds = asset.get("autotune") or {}
+        memory_budget = int(bounds.get("memory_mb", DEFAULT_MEMORY_MB) * MB)
+        learned = store.get(asset["name"]) if store else {}
+
+        fixed, tuners = {}, {}
+        for knob, cfg in (("rows_chunk", source_cfg), ("batch_size", target_cfg), ("part_size", target_cfg)):
+            start, lo, hi = DEFAULTS[knob]
+            value = cfg.get(knob)
+            if value is None:
+                continue
+            if not is_auto(value):
+                fixed[knob] = int(value)
+                continue
+            knob_bounds = bounds.get(knob) or {}
+            lo, hi = int(knob_bounds.get("min", lo)), int(knob_bounds.get("max", hi))
+            seeded = knob in learned
+            tuners[knob] = AIMDTuner(
+                knob,
+                start=learned.get(knob, start),
+                minimum=lo,
+                maximum=hi,
+                memory_budget=memory_budget,
+                # A learned start is already near the optimum; probe additively around it
+                slow_start=not seeded,
+            )
+        return cls(asset["name"], fixed, tuners, store)
+
+    def get(self, knob: str, default: Optional[int] = None) -> int:
+        tuner = self.tuners.get(knob)
+        if tuner is not None:
+            return tuner.value
+        if knob in self.fixed:
+            return self.fixed[knob]
+        return DEFAULTS[knob][0] if default is None else default
+
+    def record(self, knob: str, units: int, seconds: float, nbytes: Optional[int] = None) -> int:
+        tuner = self.tuners.get(knob)
+        if tuner is None:
+            return self.get(knob)
+        return tuner.record(units, seconds, nbytes)
+
+    def summary(self) -> Dict[str, Dict]:
+        return {
+            knob: {"value": t.value, "best": t.best_value, "samples": t.samples, "backoffs": t.backoffs}
+            for knob, t in self.tuners.items()
+        }
+
+    def save(self) -> None:
+        if self.store is not None and self.tuners:
+            self.store.save(self.asset_name, self.tuners)
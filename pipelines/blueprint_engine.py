@@ -0,0 +1,254 @@
+"""
+Compiled blueprint expansion.
+
+A blueprint (`blueprint: true`, e.g. pipelines/blueprints/cross_ref_assets.yaml)
+is instantiated once per team/instance with values for its `$[VAR]`
+placeholders. Deep-copying the whole document and re-substituting every string
+for every instance is O(instances x document size) in both time and memory.
+
+Instead the blueprint is compiled once: every string holding a placeholder
+becomes a "slot" with its literal/variable segments pre-split, and every
+container is marked as dynamic (has a slot somewhere below) or static.
+Instantiation then renders only the dynamic spine from the slots; static
+subtrees (partition definitions, checks, configs without placeholders) are
+plain structural copies, with no regex or YAML work.
+
+Each instance is an independent deep copy, so callers may modify it. With
+instantiate(..., shared=True) static subtrees are instead shared by reference
+between all instances (and the blueprint); such instances must be treated as
+read-only, and overrides go through apply_overrides(), which copies only the
+path it writes to.
+"""
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple, Union
+
+import yaml
+
+PLACEHOLDER = re.compile(r"\$\[([A-Za-z0-9_]+)\]")
+
+PathKey = Tuple[Union[str, int], ...]
+
+
+class BlueprintError(ValueError):
+    pass
+
+
+class _Slot:
+    """A string with placeholders, pre-split into literal and variable parts."""
+
+    __slots__ = ("parts", "whole_var", "variables")
+
+    def __init__(self, text: str):
+        self.parts: List[Tuple[bool, str]] = []
+        pos = 0
+        for m in PLACEHOLDER.finditer(text):
+            if m.start() > pos:
+                self.parts.append((False, text[pos:m.start()]))
+            self.parts.append((True, m.group(1)))
+            pos = m.end()
+        if pos < len(text):
+            self.parts.append((False, text[pos:]))
+        # "$[ASSET_NAME_1]" alone keeps the value's own type (lists, ints, ...)
+        self.whole_var = self.parts[0][1] if len(self.parts) == 1 and self.parts[0][0] else None
+        self.variables = {p for is_var, p in self.parts if is_var}
+
+    def render(self, values: Mapping[str, Any]):
+        try:
+            if self.whole_var is not None:
+                return values[self.whole_var]
+            return "".join(str(values[p]) if is_var else p for is_var, p in self.parts)
+        except KeyError as e:
+            raise BlueprintError(f"Missing blueprint value for $[{e.args[0]}]") from None
+
+
+class _Dict:
+    __slots__ = ("static", "dynamic", "dynamic_keys")
+
+    def __init__(self, static, dynamic, dynamic_keys):
+        self.static = static            # key -> shared value
+        self.dynamic = dynamic          # key -> compiled node
+        self.dynamic_keys = dynamic_keys  # [(slot, compiled value)]
+
+
+class _List:
+    __slots__ = ("items",)
+
+    def __init__(self, items):
+        self.items = items              # [(is_dynamic, value_or_node)]
+
+
+def _compile(node, memo):
+    """Returns (is_dynamic, compiled_or_original)."""
+    key = id(node)
+    if key in memo:
+        return memo[key]
+    if isinstance(node, str):
+        result = (True, _Slot(node)) if PLACEHOLDER.search(node) else (False, node)
+    elif isinstance(node, dict):
+        static, dynamic, dynamic_keys = {}, {}, []
+        for k, v in node.items():
+            is_dyn, compiled = _compile(v, memo)
+            if isinstance(k, str) and PLACEHOLDER.search(k):
+                dynamic_keys.append((_Slot(k), (is_dyn, compiled)))
+            elif is_dyn:
+                dynamic[k] = compiled
+            else:
+                static[k] = compiled
+        if dynamic or dynamic_keys:
+            result = (True, _Dict(static, dynamic, dynamic_keys))
+        else:
+            result = (False, node)
+    elif isinstance(node, list):
+        items = [_compile(v, memo) for v in node]
+        result = (True, _List(items)) if any(d for d, _ in items) else (False, node)
+    else:
+        result = (False, node)
+    # YAML anchors/aliases share objects; compile each shared object once
+    memo[key] = result
+    return result
+
+
+def _copy(node, memo):
+    """Structural copy of plain YAML data (dicts/lists); aliases stay aliased."""
+    if not isinstance(node, (dict, list)):
+        return node
+    key = id(node)
+    if key in memo:
+        return memo[key]
+    if isinstance(node, dict):
+        out = memo[key] = {}
+        for k, v in node.items():
+            out[k] = _copy(v, memo)
+    else:
+        out = memo[key] = []
+        out.extend(_copy(v, memo) for v in node)
+    return out
+
+
+def _shared(node, memo):
+    return node
+
+
+def _render(compiled, values, memo, static=_copy):
+    key = id(compiled)
+    if key in memo:
+        return memo[key]
+    if isinstance(compiled, _Slot):
+        return static(compiled.render(values), memo)
+    if isinstance(compiled, _Dict):
+        out = {k: static(v, memo) for k, v in compiled.static.items()}
+        for k, node in compiled.dynamic.items():
+            out[k] = _render(node, values, memo, static)
+        for slot, (is_dyn, node) in compiled.dynamic_keys:
+            out[slot.render(values)] = _render(node, values, memo, static) if is_dyn else static(node, memo)
+        result = out
+    elif isinstance(compiled, _List):
+        result = [_render(v, values, memo, static) if d else static(v, memo) for d, v in compiled.items]
+    else:
+        return static(compiled, memo)
+    # Keep aliases aliased inside one instance, as yaml.safe_load would
+    memo[key] = result
+    return result
+
+
+class CompiledBlueprint:
+    def __init__(self, document: Mapping[str, Any], name: str = None):
+        self.name = name or document.get("blueprint_name")
+        self.version = document.get("version")
+        body = {k: v for k, v in document.items() if k not in ("blueprint", "blueprint_name", "version")}
+        self._dynamic, self._compiled = _compile(body, {})
+        self.variables = sorted(self._collect_variables(self._compiled))
+
+    @classmethod
+    def from_file(cls, path) -> "CompiledBlueprint":
+        with open(path) as f:
+            document = yaml.safe_load(f)
+        if not document.get("blueprint"):
+            raise BlueprintError(f"{path} is not a blueprint (missing 'blueprint: true')")
+        return cls(document, name=document.get("blueprint_name") or Path(path).stem)
+
+    def _collect_variables(self, node, seen=None) -> set:
+        seen = seen if seen is not None else set()
+        if id(node) in seen:
+            return set()
+        seen.add(id(node))
+        if isinstance(node, _Slot):
+            return set(node.variables)
+        found = set()
+        if isinstance(node, _Dict):
+            for child in node.dynamic.values():
+                found |= self._collect_variables(child, seen)
+            for slot, (is_dyn, child) in node.dynamic_keys:
+                found |= slot.variables
+                if is_dyn:
+                    found |= self._collect_variables(child, seen)
+        elif isinstance(node, _List):
+            for is_dyn, child in node.items:
+                if is_dyn:
+                    found |= self._collect_variables(child, seen)
+        return found
+
+    def instantiate(self, values: Mapping[str, Any], shared: bool = False) -> Dict[str, Any]:
+        """
+        One instance. A deep copy by default; with shared=True static subtrees
+        are shared with other instances and must not be modified.
+        """
+        missing = [v for v in self.variables if v not in values]
+        if missing:
+            raise BlueprintError(
+                f"Blueprint '{self.name}' instance is missing values for: {', '.join(missing)}"
+            )
+        static = _shared if shared else _copy
+        if not self._dynamic:
+            return static(self._compiled, {})
+        return _render(self._compiled, values, {}, static)
+
+    def instantiate_many(self, instances: Iterable[Mapping[str, Any]], shared: bool = False) -> List[Dict[str, Any]]:
+        return [self.instantiate(values, shared) for values in instances]
+
+
+def _set_path(node, path: Sequence, value, where: tuple = ()):
+    """
+    Copy-on-write set: copies only the containers along `path`. Missing (or
+    null) mappings on the way are created; a missing list index is an error.
+    """
+    head, rest = path[0], path[1:]
+    where = where + (head,)
+    if node is None:
+        node = {}
+    if isinstance(node, list):
+        if not isinstance(head, int) or not -len(node) <= head < len(node):
+            raise BlueprintError(f"Override path {where}: no list item {head!r} (list has {len(node)} items)")
+        out = list(node)
+        out[head] = _set_path(node[head], rest, value, where) if rest else value
+        return out
+    if not isinstance(node, dict):
+        raise BlueprintError(f"Override path {where}: cannot set {head!r} inside a {type(node).__name__}")
+    out = dict(node)
+    out[head] = _set_path(node.get(head), rest, value, where) if rest else value
+    return out
+
+
+def apply_overrides(instances: List[Dict], overrides: Mapping[PathKey, Any]) -> List[Dict]:
+    """
+    Applies the same overrides to many instances in one pass.
+
+    `overrides` maps a path such as ("assets", 0, "group") to a value. Paths
+    are grouped by their first component so each instance spine is copied at
+    most once per top-level key. Instances are never mutated.
+    """
+    by_head: Dict[Any, List[Tuple[tuple, Any]]] = {}
+    for path, value in overrides.items():
+        by_head.setdefault(path[0], []).append((tuple(path[1:]), value))
+
+    result = []
+    for inst in instances:
+        out = dict(inst)
+        for head, changes in by_head.items():
+            sub = inst.get(head)
+            for rest, value in changes:
+                sub = _set_path(sub, rest, value, (head,)) if rest else value
+            out[head] = sub
+        result.append(out)
+    return result
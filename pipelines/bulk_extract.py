@@ -0,0 +1,305 @@
+"""
+Bulk SQL Server extract: columnar fetch, large packets, overlapped writes.
+
+regional_sales_export, ingestion_sql_customers and sql_to_s3_landing run
+their SELECT through a DB-API cursor: the driver builds a Python tuple per
+row as it reads, the CSV writer runs only after each fetchmany() returns,
+and the driver talks TDS in the default 4 KB packets. With `extract: bulk`
+on the source the result set is instead read into Arrow record batches by
+arrow-odbc (the ODBC driver fills column buffers, so the fetch itself makes
+no per-row Python objects) over 32 KB packets, and the fetch runs on its own
+thread feeding a bounded queue so the network and the encoder/uploader
+overlap:
+
+    source:
+      type: SQLSERVER
+      connection: sqlserver_prod
+      configs:
+        sql: "SELECT * FROM DG_PLAY.dbo.SALES_EXTRACT"
+        extract: bulk             # default: rows (the DB-API path)
+        packet_size: 32767        # TDS packet size in bytes (max 32767)
+        rows_chunk: 65536         # rows per batch
+        queue_batches: 4          # fetched batches buffered ahead of the writer
+
+Only the fetch is columnar: to match the rows path byte for byte, the CSV
+encoding converts each Arrow batch back to Python row tuples (_encode_arrow),
+so the bulk path saves fetch time, not encode time. The asset factory does
+not read `extract:` yet; operator code calls extract_to_csv().
+
+Fallback: when pyarrow/arrow-odbc are not installed, no ODBC connection
+string is available, or the bulk reader fails before its first batch, the
+extract runs on the DB-API path (fetchmany on a cursor, same queue overlap)
+and `fallback_reason` says why. Both paths write a header row and then the
+rows through the same csv writer, so their output is byte-identical (same
+quoting, True/False, str() of timestamps). Any DB-API connection works (pyodbc, pymssql, psycopg, sqlite3 in
+tests); it is used from the fetch thread, one thread at a time.
+"""
+import csv
+import io
+import queue
+import re
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from pipelines.instrumentation import Instrumentation
+
+EXTRACT_KEY = "extract"
+EXTRACT_BULK = "bulk"
+DEFAULT_PACKET_SIZE = 32767
+DEFAULT_ROWS_CHUNK = 65536
+DEFAULT_QUEUE_BATCHES = 4
+MAX_BYTES_PER_BATCH = 64 * 1024 * 1024
+
+_EOF = object()
+_PACKET_SIZE = re.compile(r"(?i)(^|;)\s*packet\s*size\s*=")
+
+
+def is_bulk(source: Mapping) -> bool:
+    return str(((source or {}).get("configs") or {}).get(EXTRACT_KEY, "")).lower() == EXTRACT_BULK
+
+
+def with_packet_size(connection_string: str, packet_size: int = DEFAULT_PACKET_SIZE) -> str:
+    """Adds `Packet Size=` to an ODBC connection string unless it already sets one."""
+    if _PACKET_SIZE.search(connection_string):
+        return connection_string
+    return f"{connection_string.rstrip(';')};Packet Size={int(packet_size)}"
+
+
+def _arrow_available() -> Optional[str]:
+    try:
+        import arrow_odbc  # noqa: F401
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        return f"{e.name} is not installed"
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Readers: iterate batches, each with the same columns
+# ---------------------------------------------------------------------------
+
+class DbapiReader:
+    """The current path: cursor.execute() + fetchmany(rows_chunk). Batches are lists of row tuples."""
+
+    kind = "dbapi"
+
+    def __init__(self, connection, sql: str, rows_chunk: int = DEFAULT_ROWS_CHUNK, params: Sequence = ()):
+        self.connection = connection
+        self.sql = sql
+        self.rows_chunk = rows_chunk
+        self.params = params
+        self.columns: List[str] = []
+
+    def __iter__(self) -> Iterator[List[tuple]]:
+        cursor = self.connection.cursor()
+        try:
+            cursor.arraysize = self.rows_chunk
+            if self.params:
+                cursor.execute(self.sql, self.params)
+            else:
+                cursor.execute(self.sql)
+            self.columns = [d[0] for d in cursor.description]
+            while True:
+                rows = cursor.fetchmany(self.rows_chunk)
+                if not rows:
+                    return
+                yield rows
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def num_rows(batch) -> int:
+        return len(batch)
+
+
+class ArrowOdbcReader:
+    """Columnar fetch into pyarrow RecordBatches via arrow-odbc."""
+
+    kind = "arrow"
+
+    def __init__(self, connection_string: str, sql: str, rows_chunk: int = DEFAULT_ROWS_CHUNK,
+                 packet_size: int = DEFAULT_PACKET_SIZE, max_bytes_per_batch: int = MAX_BYTES_PER_BATCH):
+        self.connection_string = with_packet_size(connection_string, packet_size)
+        self.sql = sql
+        self.rows_chunk = rows_chunk
+        self.max_bytes_per_batch = max_bytes_per_batch
+        self.columns: List[str] = []
+
+    def __iter__(self):
+        from arrow_odbc import read_arrow_batches_from_odbc
+
+        reader = read_arrow_batches_from_odbc(
+            query=self.sql,
+            connection_string=self.connection_string,
+            batch_size=self.rows_chunk,
+            max_bytes_per_batch=self.max_bytes_per_batch,
+        )
+        self.columns = list(reader.schema.names)
+        yield from reader
+
+    @staticmethod
+    def num_rows(batch) -> int:
+        return batch.num_rows
+
+
+# ---------------------------------------------------------------------------
+# CSV encoding
+# ---------------------------------------------------------------------------
+
+def _encode_rows(rows: List[tuple], columns: Optional[List[str]]) -> bytes:
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    if columns is not None:
+        writer.writerow(columns)
+    writer.writerows(["" if v is None else v for v in row] for row in rows)
+    return buf.getvalue().encode("utf-8")
+
+
+def _encode_arrow(batch, columns: Optional[List[str]]) -> bytes:
+    # Not pyarrow.csv: it quotes every string and header and writes true/false
+    # and ISO timestamps, unlike the rows path. Column-wise to_pylist() gives the
+    # same Python values a DB-API cursor returns.
+    return _encode_rows(list(zip(*(col.to_pylist() for col in batch.columns))), columns)
+
+
+# ---------------------------------------------------------------------------
+# Extract
+# ---------------------------------------------------------------------------
+
+def _fetch_ahead(batches: Iterator, max_batches: int, inst: Instrumentation, first=_EOF) -> Iterator:
+    """
+    Runs the fetch on its own thread, at most `max_batches` ahead of the
+    consumer. `first` is a batch already fetched (by _prime), yielded first.
+    """
+    q: "queue.Queue" = queue.Queue(maxsize=max(1, max_batches))
+    if first is not _EOF:
+        q.put(first)
+    stop = threading.Event()
+    errors: List[BaseException] = []
+
+    def produce():
+        it = iter(batches)
+        try:
+            while not stop.is_set():
+                with inst.phase("extract"):
+                    batch = next(it, _EOF)
+                if batch is _EOF:
+                    break
+                while not stop.is_set():
+                    try:
+                        q.put(batch, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+        except BaseException as e:  # noqa: BLE001 - re-raised in the consumer
+            errors.append(e)
+        finally:
+            # Closed on this thread (a generator cannot be closed from another
+            # while it runs); runs the reader's finally, which closes the cursor
+            close = getattr(it, "close", None)
+            if close is not None:
+                close()
+            q.put(_EOF)
+
+    thread = threading.Thread(target=produce, name="bulk-extract-fetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            with inst.wait("extract"):
+                batch = q.get()
+            if batch is _EOF:
+                break
+            yield batch
+        if errors:
+            raise errors[0]
+    finally:
+        stop.set()
+        # Unblock a producer waiting on a full queue
+        while thread.is_alive():
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                thread.join(0.05)
+
+
+def _prime(reader, inst: Instrumentation) -> Tuple[Optional[object], Iterator]:
+    """Starts the reader and fetches its first batch, so failures surface before any output."""
+    with inst.phase("extract"):
+        it = iter(reader)
+        return next(it, None), it
+
+
+def open_reader(configs: Mapping, connection_string: Optional[str] = None,
+                dbapi_connect: Optional[Callable[[], object]] = None,
+                inst: Optional[Instrumentation] = None) -> Tuple[object, object, Iterator, Optional[str]]:
+    """
+    (reader, first_batch, batches, fallback_reason) for a SQLSERVER source's
+    configs. The bulk path needs `connection_string` (ODBC); the DB-API path
+    needs `dbapi_connect`. The query and first fetch count as "extract".
+    """
+    inst = inst or Instrumentation(enabled=False)
+    sql = configs["sql"]
+    rows_chunk = int(configs.get("rows_chunk") or DEFAULT_ROWS_CHUNK)
+    reason = None
+    if str(configs.get(EXTRACT_KEY, "")).lower() == EXTRACT_BULK:
+        reason = _arrow_available() or (None if connection_string else "no ODBC connection string")
+        if reason is None:
+            reader = ArrowOdbcReader(connection_string, sql, rows_chunk,
+                                     int(configs.get("packet_size", DEFAULT_PACKET_SIZE)))
+            try:
+                first, it = _prime(reader, inst)
+                return reader, first, it, None
+            except Exception as e:  # noqa: BLE001 - nothing written yet, so the row path is safe
+                reason = f"bulk reader failed: {type(e).__name__}: {e}"
+    if dbapi_connect is None:
+        raise ValueError(f"No DB-API connection to fall back to ({reason})" if reason else
+                         "The rows extract path needs a DB-API connection")
+    reader = DbapiReader(dbapi_connect(), sql, rows_chunk)
+    first, it = _prime(reader, inst)
+    return reader, first, it, reason
+
+
+def extract_to_csv(configs: Mapping, sink, connection_string: Optional[str] = None,
+                   dbapi_connect: Optional[Callable[[], object]] = None,
+                   inst: Optional[Instrumentation] = None) -> Dict:
+    """
+    Runs the source query and writes CSV (with a header) to `sink` (anything
+    with write(bytes): a spool file, MultipartSink, handoff.TeeWriter, ...).
+    """
+    inst = inst or Instrumentation(enabled=False)
+    started = time.perf_counter()
+    reader, first, batches, fallback_reason = open_reader(configs, connection_string, dbapi_connect, inst)
+    encode = _encode_arrow if reader.kind == "arrow" else _encode_rows
+    queue_batches = int(configs.get("queue_batches", DEFAULT_QUEUE_BATCHES))
+
+    rows = nbytes = 0
+    header = reader.columns
+    if first is None:
+        # Nothing to fetch ahead: close the primed iterator (and its cursor) now
+        close = getattr(batches, "close", None)
+        if close is not None:
+            close()
+        chunk = _encode_rows([], header)
+        sink.write(chunk)
+        nbytes += len(chunk)
+    else:
+        for batch in _fetch_ahead(batches, queue_batches, inst, first):
+            n = reader.num_rows(batch)
+            with inst.phase("serialize") as p:
+                chunk = encode(batch, header)
+                p.add(rows=n, bytes=len(chunk))
+            with inst.phase("upload") as p:
+                sink.write(chunk)
+                p.add(bytes=len(chunk))
+            header = None
+            rows += n
+            nbytes += len(chunk)
+    return {
+        "path": reader.kind,
+        "fallback_reason": fallback_reason,
+        "columns": reader.columns,
+        "rows": rows,
+        "bytes": nbytes,
+        "seconds": time.perf_counter() - started,
+    }
@@ -0,0 +1,326 @@
+"""
+Compression codecs for landing outputs.
+
+Target configs accept a `compression:` setting for CSV, JSON and Parquet:
+
+    target:
+      type: S3
+      configs:
+        key: "raw/regional_sales/region={{ partition_key.region }}/date={{ partition_key.date }}/sales.csv"
+        object_type: CSV
+        compression: zstd:9          # or: gzip, gzip:1, none
+        # compression: {codec: gzip, level: 6, threads: 4}
+
+  - CSV/JSON: gzip (stdlib; parallel when threads > 1) or zstd (zstandard,
+    multithreaded natively). Output streams through open_writer() into any
+    sink, e.g. MultipartSink, so nothing is staged in full.
+  - PARQUET: snappy, gzip, brotli, zstd (with level) or none, passed to
+    pyarrow via parquet_writer_options().
+
+Downstream Snowflake assets that load what an upstream asset wrote pick up
+the codec automatically through downstream_compression() /
+copy_file_format(), so COPY INTO does not need a hand-written
+COMPRESSION = ... that can drift from the writer.
+"""
+import struct
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Union
+
+MB = 1024 * 1024
+S3_MIN_PART_BYTES = 5 * MB
+
+_STREAM_CODECS = ("none", "gzip", "zstd")
+_PARQUET_CODECS = ("none", "snappy", "gzip", "brotli", "zstd", "lz4")
+_EXTENSIONS = {"gzip": ".gz", "zstd": ".zst"}
+_ALIASES = {"gz": "gzip", "zst": "zstd", "uncompressed": "none", "": "none"}
+
+
+@dataclass(frozen=True)
+class Codec:
+    name: str = "none"
+    level: Optional[int] = None
+    threads: int = 1
+
+    @property
+    def extension(self) -> str:
+        return _EXTENSIONS.get(self.name, "")
+
+    @property
+    def snowflake_compression(self) -> str:
+        """COMPRESSION value for a CSV/JSON FILE_FORMAT."""
+        return self.name.upper() if self.name in ("gzip", "zstd") else "NONE"
+
+
+def parse_compression(value: Union[None, str, Mapping], object_type: str = "CSV") -> Codec:
+    """Parses `compression:` ("zstd", "zstd:9", or {codec, level, threads})."""
+    if value is None:
+        return Codec("snappy") if object_type.upper() == "PARQUET" else Codec()
+    if isinstance(value, Mapping):
+        name, level, threads = value.get("codec", "none"), value.get("level"), value.get("threads", 1)
+    else:
+        name, _, level = str(value).partition(":")
+        threads = 1
+    name = str(name).strip().lower()
+    name = _ALIASES.get(name, name)
+    allowed = _PARQUET_CODECS if object_type.upper() == "PARQUET" else _STREAM_CODECS
+    if name not in allowed:
+        raise ValueError(
+            f"Unsupported compression '{name}' for {object_type}; expected one of {', '.join(allowed)}"
+        )
+    return Codec(name, int(level) if level not in (None, "") else None, max(1, int(threads)))
+
+
+def parquet_writer_options(codec: Codec) -> Dict:
+    options = {"compression": codec.name.upper()}
+    if codec.level is not None:
+        options["compression_level"] = codec.level
+    return options
+
+
+def copy_file_format(object_type: str, codec: Codec, **options) -> str:
+    """FILE_FORMAT body for COPY INTO, e.g. "TYPE = CSV COMPRESSION = ZSTD SKIP_HEADER = 1"."""
+    object_type = object_type.upper()
+    parts = [f"TYPE = {object_type}"]
+    # Snowflake detects Parquet's internal codecs itself
+    parts.append("COMPRESSION = AUTO" if object_type == "PARQUET" else f"COMPRESSION = {codec.snowflake_compression}")
+    for key, value in options.items():
+        parts.append(f"{key.upper()} = {_sql_value(value)}")
+    return " ".join(parts)
+
+
+def _sql_value(value) -> str:
+    # Snowflake string literal: single quotes, embedded quotes doubled (repr() would backslash-escape)
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (list, tuple)):
+        return "(" + ", ".join(_sql_value(v) for v in value) + ")"
+    return str(value)
+
+
+# ---------------------------------------------------------------------------
+# Streaming writers
+# ---------------------------------------------------------------------------
+
+class MultipartSink:
+    """
+    Buffers compressed output into parts of at least `part_bytes` and hands
+    each to `upload_part(part_number, body)` as soon as it is full.
+    """
+
+    def __init__(self, upload_part: Callable[[int, bytes], object], part_bytes: int = 8 * MB,
+                 complete: Callable[[List], object] = None):
+        if part_bytes < S3_MIN_PART_BYTES:
+            part_bytes = S3_MIN_PART_BYTES
+        self.upload_part = upload_part
+        self.part_bytes = part_bytes
+        self.complete = complete
+        self.parts: List = []
+        self.bytes_written = 0
+        self._buf = bytearray()
+
+    def write(self, data) -> int:
+        self._buf += data
+        self.bytes_written += len(data)
+        if len(self._buf) >= self.part_bytes:
+            self._flush()
+        return len(data)
+
+    def _flush(self) -> None:
+        if self._buf or not self.parts:
+            self.parts.append(self.upload_part(len(self.parts) + 1, bytes(self._buf)))
+            self._buf.clear()
+
+    def close(self):
+        self._flush()
+        return self.complete(self.parts) if self.complete else self.parts
+
+
+def s3_multipart_sink(client, bucket: str, key: str, part_bytes: int = 8 * MB) -> MultipartSink:
+    upload_id = client.create_multipart_upload(Bucket=bucket, Key=key)["UploadId"]
+
+    def upload_part(number, body):
+        etag = client.upload_part(Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=body)["ETag"]
+        return {"PartNumber": number, "ETag": etag}
+
+    def complete(parts):
+        return client.complete_multipart_upload(
+            Bucket=bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+        )
+
+    sink = MultipartSink(upload_part, part_bytes, complete)
+    sink.abort = lambda: client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+    return sink
+
+
+class ParallelGzipWriter:
+    """
+    pigz-style gzip: input is cut into blocks, each block is raw-deflated on a
+    thread pool (zlib releases the GIL) and ended with a sync flush, and the
+    blocks are written in order between one gzip header and trailer. The
+    result is a single ordinary gzip member.
+    """
+
+    def __init__(self, sink, level: int = 6, threads: int = 4, block_bytes: int = 1 * MB):
+        self.sink = sink
+        self.level = level
+        self.block_bytes = block_bytes
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="pgzip")
+        self._pending = deque()
+        self._max_pending = threads * 2
+        self._buf = bytearray()
+        self._crc = 0
+        self._size = 0
+        self.sink.write(b"\x1f\x8b\x08\x00" + struct.pack("<I", int(time.time())) + b"\x00\xff")
+
+    def _deflate(self, block: bytes) -> bytes:
+        c = zlib.compressobj(self.level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        return c.compress(block) + c.flush(zlib.Z_SYNC_FLUSH)
+
+    def _submit(self, block: bytes) -> None:
+        self._crc = zlib.crc32(block, self._crc)
+        self._size += len(block)
+        self._pending.append(self._pool.submit(self._deflate, block))
+        # Backpressure: never hold more than 2 blocks per thread in memory
+        while len(self._pending) > self._max_pending:
+            self.sink.write(self._pending.popleft().result())
+
+    def write(self, data) -> int:
+        self._buf += data
+        while len(self._buf) >= self.block_bytes:
+            self._submit(bytes(self._buf[:self.block_bytes]))
+            del self._buf[:self.block_bytes]
+        return len(data)
+
+    def close(self) -> None:
+        if self._buf:
+            self._submit(bytes(self._buf))
+            self._buf.clear()
+        while self._pending:
+            self.sink.write(self._pending.popleft().result())
+        self._pool.shutdown()
+        final = zlib.compressobj(self.level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        self.sink.write(final.flush(zlib.Z_FINISH))
+        self.sink.write(struct.pack("<II", self._crc & 0xFFFFFFFF, self._size & 0xFFFFFFFF))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _GzipWriter:
+    def __init__(self, sink, level: int):
+        self.sink = sink
+        self._c = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def write(self, data) -> int:
+        out = self._c.compress(data)
+        if out:
+            self.sink.write(out)
+        return len(data)
+
+    def close(self) -> None:
+        self.sink.write(self._c.flush())
+
+
+class _ZstdWriter:
+    def __init__(self, sink, level: int, threads: int):
+        import zstandard
+
+        # threads=-1 would mean "all cores"; 0 is single-threaded
+        params = {"level": level, "threads": threads if threads > 1 else 0}
+        self._writer = zstandard.ZstdCompressor(**params).stream_writer(sink, closefd=False)
+
+    def write(self, data) -> int:
+        return self._writer.write(data)
+
+    def close(self) -> None:
+        self._writer.flush(1)  # FLUSH_FRAME
+        self._writer.close()
+
+
+class _PassThrough:
+    def __init__(self, sink):
+        self.sink = sink
+
+    def write(self, data) -> int:
+        return self.sink.write(data)
+
+    def close(self) -> None:
+        pass
+
+
+def open_writer(codec: Codec, sink):
+    """Streaming compressor writing into `sink`; call close() to finish the stream."""
+    if codec.name == "gzip":
+        level = 6 if codec.level is None else codec.level
+        if codec.threads > 1:
+            return ParallelGzipWriter(sink, level=level, threads=codec.threads)
+        return _GzipWriter(sink, level)
+    if codec.name == "zstd":
+        return _ZstdWriter(sink, 3 if codec.level is None else codec.level, codec.threads)
+    if codec.name == "none":
+        return _PassThrough(sink)
+    raise ValueError(f"'{codec.name}' is not a streaming codec (Parquet only)")
+
+
+def decompress(codec_name: str, data: bytes) -> bytes:
+    name = _ALIASES.get(codec_name.lower(), codec_name.lower())
+    if name == "gzip":
+        return zlib.decompress(data, 16 + zlib.MAX_WBITS)
+    if name == "zstd":
+        import zstandard
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    return data
+
+
+# ---------------------------------------------------------------------------
+# Propagation to downstream COPY INTO
+# ---------------------------------------------------------------------------
+
+def _static_prefix(path: str) -> str:
+    return path.split("{{", 1)[0]
+
+
+def downstream_compression(configs: Iterable[Mapping]) -> Dict[str, Codec]:
+    """
+    Codec each Snowflake-target asset should declare in its FILE_FORMAT.
+
+    A Snowflake asset whose S3 source key/prefix overlaps an upstream S3
+    target's key/prefix (same bucket; templated parts like
+    {{ partition_key.region }} are ignored) inherits that target's compression.
+    """
+    writers = []
+    loaders = []
+    for config in configs:
+        for asset in config.get("assets") or []:
+            source, target = asset.get("source") or {}, asset.get("target") or {}
+            t_cfg = target.get("configs") or {}
+            if target.get("type") == "S3" and "compression" in t_cfg:
+                path = t_cfg.get("key") or t_cfg.get("prefix") or ""
+                if t_cfg.get("key"):
+                    path = path.rsplit("/", 1)[0] + "/"
+                writers.append((
+                    t_cfg.get("bucket_name"),
+                    _static_prefix(path),
+                    parse_compression(t_cfg["compression"], t_cfg.get("object_type", "CSV")),
+                ))
+            if source.get("type") == "S3" and target.get("type") == "SNOWFLAKE":
+                s_cfg = source.get("configs") or {}
+                loaders.append((asset["name"], s_cfg.get("bucket_name"), s_cfg.get("key") or s_cfg.get("prefix") or ""))
+
+    resolved = {}
+    for name, bucket, path in loaders:
+        for w_bucket, w_prefix, codec in writers:
+            prefix = _static_prefix(path)
+            if bucket == w_bucket and (prefix.startswith(w_prefix) or w_prefix.startswith(prefix)):
+                resolved[name] = codec
+                break
+    return resolved
@@ -0,0 +1,274 @@
+"""
+Small-file compaction ahead of Snowflake COPY INTO.
+
+Prefix loads such as `test_column_name_match` (prefix: test_data/column_match/)
+can pick up thousands of tiny CSVs. COPY pays a per-file overhead, so we
+concatenate the small objects into gzip bundles of a target size first and
+point COPY at the bundles instead.
+
+Every bundle remembers the original objects it was built from (the manifest),
+so lineage still reports the real source files, and a bundle rejected under
+`on_error: SKIP_FILE` can be replayed member-by-member so only the bad
+original file is skipped.
+"""
+import argparse
+import gzip
+import io
+import json
+import re
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+MB = 1024 * 1024
+
+DEFAULT_TARGET_BYTES = 128 * MB
+DEFAULT_SMALL_FILE_BYTES = 16 * MB
+MANIFEST_NAME = "_compaction_manifest.json"
+
+
+@dataclass
+class SourceObject:
+    key: str
+    size: int
+
+
+@dataclass
+class Bundle:
+    key: str
+    header: Optional[bytes] = None
+    members: List[str] = field(default_factory=list)
+    bytes_in: int = 0
+    bytes_out: int = 0
+
+
+class LocalStorage:
+    """Directory-backed storage, used for local runs and the benchmark."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def list(self, prefix: str, pattern: Optional[str] = None) -> List[SourceObject]:
+        base = self.root / prefix
+        regex = re.compile(pattern) if pattern else None
+        objects = []
+        for path in sorted(base.rglob("*")):
+            if not path.is_file():
+                continue
+            key = path.relative_to(self.root).as_posix()
+            if regex and not regex.match(path.name):
+                continue
+            objects.append(SourceObject(key, path.stat().st_size))
+        return objects
+
+    def open_read(self, key: str):
+        return open(self.root / key, "rb")
+
+    def write(self, key: str, fileobj) -> None:
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fileobj.seek(0)
+        with open(path, "wb") as out:
+            while True:
+                chunk = fileobj.read(MB)
+                if not chunk:
+                    break
+                out.write(chunk)
+
+
+class S3Storage:
+    """Thin boto3 wrapper with the same interface as LocalStorage."""
+
+    def __init__(self, bucket_name: str, client=None):
+        if client is None:
+            import boto3
+            client = boto3.client("s3")
+        self.client = client
+        self.bucket_name = bucket_name
+
+    def list(self, prefix: str, pattern: Optional[str] = None) -> List[SourceObject]:
+        regex = re.compile(pattern) if pattern else None
+        objects = []
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                if regex and not regex.match(obj["Key"].rsplit("/", 1)[-1]):
+                    continue
+                objects.append(SourceObject(obj["Key"], obj["Size"]))
+        return objects
+
+    def open_read(self, key: str):
+        return self.client.get_object(Bucket=self.bucket_name, Key=key)["Body"]
+
+    def write(self, key: str, fileobj) -> None:
+        fileobj.seek(0)
+        self.client.upload_fileobj(fileobj, self.bucket_name, key)
+
+
+def _read_header(stream) -> bytes:
+    if hasattr(stream, "readline"):
+        return stream.readline()
+    header = b""
+    while not header.endswith(b"\n"):
+        ch = stream.read(1)
+        if not ch:
+            break
+        header += ch
+    return header
+
+
+def compact_prefix(
+    storage,
+    prefix: str,
+    output_prefix: str,
+    pattern: Optional[str] = None,
+    has_headers: bool = True,
+    target_bytes: int = DEFAULT_TARGET_BYTES,
+    small_file_bytes: int = DEFAULT_SMALL_FILE_BYTES,
+    compresslevel: int = 6,
+) -> Dict:
+    """
+    Compacts the small objects under `prefix` into gzip bundles under `output_prefix`.
+
+    Objects at or above `small_file_bytes` are left alone and listed as passthrough.
+    A bundle is closed once its compressed size reaches `target_bytes`, or when the
+    next member has a different CSV header (so column_name_match keeps working).
+    Returns the manifest, which is also written next to the bundles.
+    """
+    objects = storage.list(prefix, pattern)
+    small = [o for o in objects if o.size < small_file_bytes]
+    passthrough = [o.key for o in objects if o.size >= small_file_bytes]
+
+    bundles: List[Bundle] = []
+    spool = None
+    gz = None
+    current: Optional[Bundle] = None
+    started = time.perf_counter()
+
+    def close_current():
+        nonlocal spool, gz, current
+        if current is None:
+            return
+        gz.close()
+        current.bytes_out = spool.tell()
+        storage.write(current.key, spool)
+        spool.close()
+        bundles.append(current)
+        spool, gz, current = None, None, None
+
+    for obj in small:
+        with storage.open_read(obj.key) as stream:
+            header = _read_header(stream) if has_headers else None
+            if current is not None and (
+                spool.tell() >= target_bytes or header != current.header
+            ):
+                close_current()
+            if current is None:
+                key = f"{output_prefix.rstrip('/')}/part_{len(bundles):05d}.csv.gz"
+                current = Bundle(key=key, header=header)
+                # Spill to disk rather than memory: bundles can be hundreds of MB
+                spool = tempfile.TemporaryFile(prefix="compaction_")
+                gz = gzip.GzipFile(fileobj=spool, mode="wb", compresslevel=compresslevel)
+                if header:
+                    gz.write(header)
+            last = b"\n"
+            while True:
+                chunk = stream.read(MB)
+                if not chunk:
+                    break
+                gz.write(chunk)
+                last = chunk[-1:]
+            # Guard against members without a trailing newline gluing rows together
+            if last != b"\n":
+                gz.write(b"\n")
+        current.members.append(obj.key)
+        current.bytes_in += obj.size
+
+    close_current()
+
+    manifest = {
+        "source_prefix": prefix,
+        "output_prefix": output_prefix,
+        "pattern": pattern,
+        "has_headers": has_headers,
+        "files_scanned": len(objects),
+        "files_compacted": len(small),
+        "passthrough": passthrough,
+        "bundles": [
+            {
+                "key": b.key,
+                "members": b.members,
+                "bytes_in": b.bytes_in,
+                "bytes_out": b.bytes_out,
+            }
+            for b in bundles
+        ],
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+    }
+    storage.write(
+        f"{output_prefix.rstrip('/')}/{MANIFEST_NAME}",
+        io.BytesIO(json.dumps(manifest, indent=2).encode("utf-8")),
+    )
+    return manifest
+
+
+def load_keys(manifest: Dict) -> List[str]:
+    """Keys COPY INTO should load: the bundles plus any passthrough objects."""
+    return [b["key"] for b in manifest["bundles"]] + list(manifest["passthrough"])
+
+
+def lineage(manifest: Dict) -> List[str]:
+    """The original source objects, for lineage / files_scanned metadata."""
+    files = []
+    for b in manifest["bundles"]:
+        files.extend(b["members"])
+    return files + list(manifest["passthrough"])
+
+
+def members_to_replay(manifest: Dict, rejected_keys: Iterable[str]) -> List[str]:
+    """
+    Maps bundles skipped by COPY (on_error: SKIP_FILE) back to their original objects.
+
+    Loading these members individually restores per-file SKIP_FILE semantics:
+    only the file that is actually bad gets skipped, not its whole bundle.
+    """
+    rejected = set(rejected_keys)
+    replay = []
+    for b in manifest["bundles"]:
+        if b["key"] in rejected:
+            replay.extend(b["members"])
+    replay.extend(k for k in manifest["passthrough"] if k in rejected)
+    return replay
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact small files before a Snowflake COPY INTO.")
+    parser.add_argument("--bucket", help="S3 bucket (omit to use --root)")
+    parser.add_argument("--root", help="Local directory acting as the bucket")
+    parser.add_argument("--prefix", required=True)
+    parser.add_argument("--output-prefix", required=True)
+    parser.add_argument("--pattern")
+    parser.add_argument("--no-headers", action="store_true")
+    parser.add_argument("--target-mb", type=int, default=DEFAULT_TARGET_BYTES // MB)
+    parser.add_argument("--small-file-mb", type=int, default=DEFAULT_SMALL_FILE_BYTES // MB)
+    args = parser.parse_args()
+
+    storage = S3Storage(args.bucket) if args.bucket else LocalStorage(args.root or ".")
+    manifest = compact_prefix(
+        storage,
+        args.prefix,
+        args.output_prefix,
+        pattern=args.pattern,
+        has_headers=not args.no_headers,
+        target_bytes=args.target_mb * MB,
+        small_file_bytes=args.small_file_mb * MB,
+    )
+    print(f"📦 Compacted {manifest['files_compacted']:,} files into {len(manifest['bundles'])} bundles")
+    print(f"   Passthrough: {len(manifest['passthrough'])}")
+    print(f"   Elapsed: {manifest['elapsed_seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,24 @@
-from dagster import asset
+from dagster import AssetExecutionContext, asset
 
 @asset(group_name="native_python")
-def python_processing_asset():
+def python_processing_asset(context: AssetExecutionContext):
     """
     Example of a native Python asset that power developers can write.
     This lives in pipelines/ and is merged with the YAML definitions.
+    Tag the run with perf/instrumentation: "true" to get per-phase metadata,
+    or perf/profile: "true" to capture a flamegraph of the run.
     """
-    return {"status": "success", "processed_by": "python"}
+    # Imported here, not at module level: definitions.py loads this module in
+    # the code server and sensor daemon, which never run the asset
+    from pipelines.instrumentation import Instrumentation
+    from pipelines.profiling import RunProfiler
+
+    with RunProfiler.from_context(context, "python_processing_asset") as prof:
+        inst = Instrumentation.from_tags(context.run.tags, name="python_processing_asset")
+        with inst.phase("process") as phase:
+            result = {"status": "success", "processed_by": "python"}
+            phase.add(rows=1)
+    context.add_output_metadata({**inst.to_dagster_metadata(), **prof.to_dagster_metadata()})
+    if inst.otel_endpoint:
+        inst.export_otel({"dagster.run_id": context.run.run_id})
+    return result
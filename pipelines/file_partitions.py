@@ -0,0 +1,299 @@
+"""
+Per-file dynamic partitions for multi-file SFTP/S3 ingestion.
+
+cross_ref_test_asset or ingestion_sftp_inventory materializes every file
+matching `pattern` in one step: the files are copied one after another,
+and one bad file fails (and re-runs) the whole batch. With `per_file:` each
+discovered file becomes a dynamic partition of the asset instead, so files
+run in parallel across run workers and each has its own retries, status
+and materialization:
+
+    - name: cross_ref_test_asset
+      source:
+        type: SFTP
+        configs:
+          path: "{{ params.source_path }}"
+          pattern: "{{ params.source_pattern }}"
+      target:
+        type: S3
+        configs:
+          key: "backups{{ source.path }}/{{ source.item.file_name }}"
+      per_file:
+        partitions: cross_ref_files     # dynamic partitions name (default <asset>_files)
+        max_workers: 16                 # in-process runner only
+        retries: 2
+
+The asset factory does not read `per_file:` yet: the helpers below build
+the partitions, sensor requests and per-file runs for code that wires it in.
+
+The sensor (or a listing in the source) registers new files with
+AddDynamicPartitionsRequest and yields one RunRequest per file; the
+partition key is the file name, so `source.item.*` templates render exactly
+as in the batch path. For assets that already have a time partition
+(partitions_def: daily) the file becomes the second dimension of a
+MultiPartitionsDefinition.
+
+  - partition_key() / file_name_from_key(): reversible encoding of file
+    names into valid partition keys;
+  - FileItem: the `source.item` context, also carried in run tags;
+  - render_item(): re-binds `{{ source.item.* }}` in an asset's configs;
+  - run_per_file(): thread-pool runner with per-file retries, status and
+    lineage metadata, for local runs and tests;
+  - to_dagster_partitions_def() / sensor_requests(): the Dagster objects.
+"""
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+from urllib.parse import unquote
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_RETRIES = 2
+FILE_DIMENSION = "file"
+TAG_PREFIX = "nexus/file_"
+
+# Dagster rejects control characters and "..." in partition keys, and
+# "|" / "," separate multi-partition dimensions and key ranges
+_UNSAFE = re.compile(r"[%|,\[\]*\x00-\x1f\x7f]|\.{3,}")
+_ITEM_EXPR = re.compile(r"\{\{\s*source\.item\.([A-Za-z_][A-Za-z0-9_]*)\s*\}\}")
+
+
+def is_per_file(asset: Mapping) -> bool:
+    return bool(asset.get("per_file"))
+
+
+def partition_key(file_name: str) -> str:
+    """The file name, with characters Dagster does not accept percent-encoded."""
+    return _UNSAFE.sub(lambda m: "".join(f"%{ord(c):02X}" for c in m.group()), file_name)
+
+
+def file_name_from_key(key: str) -> str:
+    return unquote(key)
+
+
+@dataclass(frozen=True)
+class FileItem:
+    """One discovered file; context() is what `{{ source.item.* }}` sees."""
+    file_name: str
+    path: str = ""
+    size: Optional[int] = None
+    mtime: Optional[int] = None
+
+    @property
+    def key(self) -> str:
+        return partition_key(self.file_name)
+
+    @property
+    def full_path(self) -> str:
+        if not self.path:
+            return self.file_name
+        return self.path.rstrip("/") + "/" + self.file_name
+
+    def context(self) -> Dict[str, Any]:
+        # object_name is what S3 sources call it (cross_ref_test_asset_2)
+        return {
+            "file_name": self.file_name,
+            "object_name": self.full_path.lstrip("/") if self.path else self.file_name,
+            "path": self.full_path,
+            "size": self.size,
+            "mtime": self.mtime,
+        }
+
+    def to_tags(self) -> Dict[str, str]:
+        tags = {TAG_PREFIX + "name": self.file_name, TAG_PREFIX + "path": self.path}
+        if self.size is not None:
+            tags[TAG_PREFIX + "size"] = str(self.size)
+        if self.mtime is not None:
+            tags[TAG_PREFIX + "mtime"] = str(self.mtime)
+        return tags
+
+    @classmethod
+    def from_tags(cls, key: str, tags: Mapping[str, str], path: str = "") -> "FileItem":
+        """
+        From a sensor-launched run's tags; runs launched from the UI or a
+        backfill only have the partition key, which still gives the file name.
+        """
+        size, mtime = tags.get(TAG_PREFIX + "size"), tags.get(TAG_PREFIX + "mtime")
+        return cls(
+            tags.get(TAG_PREFIX + "name") or file_name_from_key(key),
+            tags.get(TAG_PREFIX + "path", path),
+            int(size) if size is not None else None,
+            int(mtime) if mtime is not None else None,
+        )
+
+
+def items_from_entries(entries: Iterable[Tuple[str, int, int]], path: str = "") -> List[FileItem]:
+    """From sftp_snapshot.list_entries() or TickResult.ready."""
+    return [FileItem(name, path, size, mtime) for name, size, mtime in entries]
+
+
+def render_item(configs: Any, item: FileItem) -> Any:
+    """
+    Substitutes `{{ source.item.* }}` in (nested) configs and leaves every
+    other expression ({{ params.* }}, {{ source.path }}) for the factory.
+    """
+    ctx = item.context()
+
+    def sub(m):
+        name = m.group(1)
+        if name not in ctx:
+            raise ValueError(f"Unknown source.item field '{name}' (have: {', '.join(ctx)})")
+        return "" if ctx[name] is None else str(ctx[name])
+
+    if isinstance(configs, str):
+        return _ITEM_EXPR.sub(sub, configs) if "source.item" in configs else configs
+    if isinstance(configs, Mapping):
+        return {k: render_item(v, item) for k, v in configs.items()}
+    if isinstance(configs, list):
+        return [render_item(v, item) for v in configs]
+    return configs
+
+
+@dataclass
+class PerFileSpec:
+    asset_name: str
+    partitions_name: str
+    max_workers: int = DEFAULT_MAX_WORKERS
+    retries: int = DEFAULT_RETRIES
+    retry_delay: float = 1.0
+    time_partitioned: bool = False
+
+    @classmethod
+    def from_asset(cls, asset: Mapping) -> "PerFileSpec":
+        block = asset.get("per_file")
+        if not block:
+            raise ValueError(f"Asset '{asset['name']}' does not set per_file")
+        block = block if isinstance(block, Mapping) else {}
+        source_type = str((asset.get("source") or {}).get("type", "")).upper()
+        if source_type not in ("SFTP", "S3"):
+            raise ValueError(f"per_file needs an SFTP or S3 source, '{asset['name']}' has {source_type or 'none'}")
+        return cls(
+            asset_name=asset["name"],
+            partitions_name=block.get("partitions", f"{asset['name']}_files"),
+            max_workers=int(block.get("max_workers", DEFAULT_MAX_WORKERS)),
+            retries=int(block.get("retries", DEFAULT_RETRIES)),
+            retry_delay=float(block.get("retry_delay", 1.0)),
+            time_partitioned=bool(asset.get("partitions_def")),
+        )
+
+
+# ---------------------------------------------------------------------------
+# In-process runner
+# ---------------------------------------------------------------------------
+
+@dataclass
+class FileRun:
+    item: FileItem
+    status: str = "PENDING"      # SUCCESS | FAILED
+    attempts: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+def run_per_file(items: Sequence[FileItem], fn: Callable[[FileItem], Optional[Mapping]],
+                 max_workers: int = DEFAULT_MAX_WORKERS, retries: int = DEFAULT_RETRIES,
+                 retry_delay: float = 0.0,
+                 on_done: Optional[Callable[[FileRun], None]] = None) -> List[FileRun]:
+    """
+    Runs fn(item) for every file on a thread pool. A failing file is retried
+    up to `retries` times with linear backoff and then marked FAILED; it never
+    affects the others. fn may return metadata (e.g. {"target/key": ...}),
+    which is kept next to the source lineage of that file.
+    """
+    lock = threading.Lock()
+
+    def one(item: FileItem) -> FileRun:
+        run = FileRun(item, metadata={"source/path": item.full_path, "source/partition_key": item.key})
+        started = time.perf_counter()
+        while True:
+            run.attempts += 1
+            try:
+                run.metadata.update(fn(item) or {})
+                run.status, run.error = "SUCCESS", None
+                break
+            except Exception as e:  # noqa: BLE001 - a file's failure is its own status
+                run.error = f"{type(e).__name__}: {e}"
+                if run.attempts > retries:
+                    run.status = "FAILED"
+                    break
+                if retry_delay:
+                    time.sleep(retry_delay * run.attempts)
+        run.seconds = time.perf_counter() - started
+        if on_done is not None:
+            with lock:
+                on_done(run)
+        return run
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="per_file") as pool:
+        return list(pool.map(one, items))
+
+
+def summarize(runs: Iterable[FileRun]) -> Dict[str, Any]:
+    runs = list(runs)
+    failed = [r for r in runs if r.status == "FAILED"]
+    return {
+        "files": len(runs),
+        "succeeded": len(runs) - len(failed),
+        "failed": [r.item.file_name for r in failed],
+        "retried": sum(1 for r in runs if r.attempts > 1),
+        "max_file_seconds": max((r.seconds for r in runs), default=0.0),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Dagster
+# ---------------------------------------------------------------------------
+
+def to_dagster_partitions_def(spec: PerFileSpec, time_partitions_def=None):
+    """
+    DynamicPartitionsDefinition named spec.partitions_name, or a
+    MultiPartitionsDefinition of (date, file) when the asset also has a time
+    partition (pass the factory-built one).
+    """
+    from dagster import DynamicPartitionsDefinition, MultiPartitionsDefinition
+
+    files = DynamicPartitionsDefinition(name=spec.partitions_name)
+    if time_partitions_def is None:
+        return files
+    return MultiPartitionsDefinition({"date": time_partitions_def, FILE_DIMENSION: files})
+
+
+def sensor_requests(spec: PerFileSpec, job_name: str, items: Iterable[FileItem],
+                    existing_keys: Iterable[str] = (), date: Optional[str] = None,
+                    tags: Optional[Mapping[str, str]] = None) -> Tuple[List, List]:
+    """
+    (dynamic_partitions_requests, run_requests) for a SensorResult. Files
+    already registered are not added again; each (file, size, mtime) gets its
+    own run_key, so a rewritten file runs again and a re-listed one does not.
+    """
+    from dagster import AddDynamicPartitionsRequest, MultiPartitionKey, RunRequest
+
+    if spec.time_partitioned and date is None:
+        raise ValueError(f"'{spec.asset_name}' is time-partitioned; pass the date partition for new files")
+    existing = set(existing_keys)
+    new_keys, runs = [], []
+    for item in items:
+        key = item.key
+        if key not in existing:
+            existing.add(key)
+            new_keys.append(key)
+        pk = MultiPartitionKey({"date": date, FILE_DIMENSION: key}) if spec.time_partitioned else key
+        runs.append(RunRequest(
+            run_key=f"{date + '|' if date else ''}{key}:{item.size}:{item.mtime}",
+            job_name=job_name,
+            partition_key=pk,
+            tags={**(tags or {}), **item.to_tags(), "dagster/max_retries": str(spec.retries)},
+        ))
+    adds = [AddDynamicPartitionsRequest(spec.partitions_name, new_keys)] if new_keys else []
+    return adds, runs
+
+
+def item_for_partition(context, path: str = "") -> FileItem:
+    """Inside the asset: the FileItem for the partition being materialized."""
+    key = context.partition_key
+    if hasattr(key, "keys_by_dimension"):
+        key = key.keys_by_dimension[FILE_DIMENSION]
+    return FileItem.from_tags(key, context.run.tags, path)
@@ -0,0 +1,192 @@
+"""
+Streaming handoff between chained assets.
+
+In chains like sql_s3_sftp_chain.yaml (sql_to_s3_landing -> s3_to_sftp_outbound)
+the downstream step re-lists and re-downloads what the upstream step has just
+written to `landing/sales/`. With `handoff: stream` on the downstream asset,
+both steps run in the same run as one pipelined unit instead: the upstream
+writer tees each chunk into the landing copy (still persisted, so lineage and
+re-runs work as before) and into a bounded pipe that the downstream consumer
+reads while the upstream is still producing.
+
+    assets:
+      - name: s3_to_sftp_outbound
+        deps: [sql_to_s3_landing]
+        handoff: stream
+        source:
+          type: S3
+          connection: s3_prod
+          configs:
+            bucket_name: "my-dagster-poc"
+            prefix: "landing/sales/"     # where sql_to_s3_landing writes
+
+The asset factory does not read `handoff:` yet: streamed_edges() finds the
+opted-in pairs and run_pipelined() runs one, for callers that wire it in.
+
+The pipe is bounded, so a slow consumer applies backpressure instead of
+buffering the dataset in memory. If a consumer fails, the producer keeps
+writing the landing copy and the consumer's step can fall back to the normal
+land-then-reread path.
+"""
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pipelines.scheduler import upstream_of
+
+HANDOFF_KEY = "handoff"
+HANDOFF_STREAM = "stream"
+
+_EOF = object()
+
+
+def is_streamed(asset_config: Dict) -> bool:
+    return str(asset_config.get(HANDOFF_KEY, "")).lower() == HANDOFF_STREAM
+
+
+def _location(side: Dict) -> tuple:
+    configs = side.get("configs") or {}
+    return (
+        side.get("connection"),
+        configs.get("bucket_name"),
+        configs.get("prefix") or configs.get("path"),
+    )
+
+
+def streamed_edges(configs: Iterable[Dict]) -> List[Tuple[str, str]]:
+    """
+    (upstream, downstream) pairs that can be pipelined.
+
+    The downstream asset must opt in with `handoff: stream`, depend on the
+    upstream via ins/deps, and read exactly where the upstream writes.
+    """
+    assets = {}
+    for config in configs:
+        for asset in config.get("assets") or []:
+            assets[asset["name"]] = asset
+
+    edges = []
+    for name, asset in assets.items():
+        if not is_streamed(asset):
+            continue
+        for up in sorted(upstream_of(asset)):
+            if up in assets and _location(assets[up].get("target") or {}) == _location(asset.get("source") or {}):
+                edges.append((up, name))
+    return edges
+
+
+class _Pipe:
+    """Bounded single-consumer chunk pipe."""
+
+    def __init__(self, max_chunks: int):
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_chunks)
+        self.closed_by_consumer = False
+        self.error: Optional[BaseException] = None
+
+    def put(self, chunk) -> None:
+        while not self.closed_by_consumer:
+            try:
+                self._queue.put(chunk, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def close(self, error: Optional[BaseException] = None) -> None:
+        self.error = error
+        self.put(_EOF)
+
+    def abandon(self) -> None:
+        """Consumer gave up: stop applying backpressure to the producer."""
+        self.closed_by_consumer = True
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            chunk = self._queue.get()
+            if chunk is _EOF:
+                if self.error is not None:
+                    raise RuntimeError("upstream writer failed") from self.error
+                return
+            yield chunk
+
+
+class TeeWriter:
+    """File-like writer that persists to the landing sink and feeds every pipe."""
+
+    def __init__(self, landing, pipes: List[_Pipe]):
+        self.landing = landing
+        self.pipes = pipes
+        self.bytes_written = 0
+
+    def write(self, chunk: bytes) -> int:
+        self.landing.write(chunk)
+        for pipe in self.pipes:
+            if not pipe.closed_by_consumer:
+                pipe.put(chunk)
+        self.bytes_written += len(chunk)
+        return len(chunk)
+
+
+def run_pipelined(
+    produce: Callable[[TeeWriter], object],
+    consumers: Dict[str, Callable[[Iterator[bytes]], object]],
+    landing,
+    max_chunks: int = 16,
+) -> Dict:
+    """
+    Runs `produce(writer)` in this thread and each consumer in its own thread.
+
+    `landing` is any object with write() (a spool file, a multipart upload
+    writer, ...). Returns the producer result, per-consumer results and errors,
+    and bytes written. Producer errors propagate to consumers and are re-raised.
+    """
+    pipes = {name: _Pipe(max_chunks) for name in consumers}
+    results: Dict[str, object] = {}
+    errors: Dict[str, BaseException] = {}
+
+    def consume(name, fn):
+        pipe = pipes[name]
+        try:
+            results[name] = fn(iter(pipe))
+        except BaseException as e:
+            errors[name] = e
+        finally:
+            # Also when fn returned before EOF: stop applying backpressure to the producer
+            pipe.abandon()
+
+    threads = [
+        threading.Thread(target=consume, args=(name, fn), name=f"handoff-{name}", daemon=True)
+        for name, fn in consumers.items()
+    ]
+    for t in threads:
+        t.start()
+
+    writer = TeeWriter(landing, list(pipes.values()))
+    started = time.perf_counter()
+    produce_error = None
+    produced = None
+    try:
+        produced = produce(writer)
+    except BaseException as e:
+        produce_error = e
+    finally:
+        for pipe in pipes.values():
+            if not pipe.closed_by_consumer:
+                pipe.close(produce_error)
+        for t in threads:
+            t.join()
+
+    if produce_error is not None:
+        raise produce_error
+    return {
+        "produced": produced,
+        "results": results,
+        "errors": errors,
+        "bytes_written": writer.bytes_written,
+        "seconds": time.perf_counter() - started,
+    }
@@ -0,0 +1,283 @@
+"""
+Compiled params_schema and memoized run-parameter hydration.
+
+Every run resolves its job's parameters: the `params_schema` shorthand
+("string!|/upload", "list!|[]") is parsed, job_overrides, ops_config and the
+registry values are layered on top, and is_strict is checked. A sensor
+issuing hundreds of RunRequests per tick repeats all of that, including the
+registry lookup, for every request although only the per-file fields differ.
+
+Here each job's schema is compiled once into typed fields, and the hydrated
+parameters are memoized per (job, asset, tags, registry version). A request
+then costs one cache lookup plus re-binding its own trigger fields:
+
+    hydrator = Hydrator.from_configs(configs)["cross_ref_test_job"]
+    params = hydrator.hydrate(
+        tags=run_tags,
+        registry=lambda: provider.get_job_params("cross_ref_test_job"),   # only called on a miss
+        registry_version=row_updated_at,
+        trigger={"source_path": "/upload/2024-06-01"},
+    )
+
+Layers, lowest first:
+  1. schema defaults ("string!|/upload" -> "/upload");
+  2. job_overrides;
+  3. ops_config[asset] from the YAML;
+  4. registry values, then the registry's `_ops_config[asset]`;
+  5. run tags "param/<name>" (launchpad and sensor overrides);
+  6. trigger fields (per file / per request; never cached).
+
+Schema keys may be prefixed with an asset ("sales_asset.source_bucket");
+they apply only when hydrating that asset. A "!" field with no value fails;
+with is_strict, so does a value for a name the schema does not declare.
+"""
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+import yaml
+
+PARAM_TAG_PREFIX = "param/"
+DEFAULT_CACHE_SIZE = 1024
+REGISTRY_OPS_KEY = "_ops_config"
+
+_MISSING = object()
+
+
+class ParamsValidationError(ValueError):
+    pass
+
+
+def _as_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ("true", "1", "yes", "y", "on"):
+        return True
+    if text in ("false", "0", "no", "n", "off", ""):
+        return False
+    raise ValueError(f"not a boolean: {value!r}")
+
+
+def _as_list(value) -> list:
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    text = str(value).strip()
+    if text.startswith("["):
+        return list(json.loads(text))
+    return [part.strip() for part in text.split(",")] if text else []
+
+
+def _as_dict(value) -> dict:
+    if isinstance(value, Mapping):
+        return dict(value)
+    loaded = yaml.safe_load(str(value)) if str(value).strip() else {}
+    if not isinstance(loaded, dict):
+        raise ValueError(f"not a mapping: {value!r}")
+    return loaded
+
+
+_COERCE: Dict[str, Callable[[Any], Any]] = {
+    "string": str,
+    "str": str,
+    "int": int,
+    "integer": int,
+    "float": float,
+    "number": float,
+    "bool": _as_bool,
+    "boolean": _as_bool,
+    "list": _as_list,
+    "dict": _as_dict,
+    "json": _as_dict,
+}
+
+
+class Field:
+    __slots__ = ("name", "type", "required", "default", "coerce")
+
+    def __init__(self, name: str, spec: str):
+        spec = str(spec)
+        type_part, sep, default = spec.partition("|")
+        type_part = type_part.strip()
+        self.name = name
+        self.required = type_part.endswith("!")
+        self.type = type_part.rstrip("!").lower() or "string"
+        if self.type not in _COERCE:
+            raise ParamsValidationError(f"Unknown type '{self.type}' for parameter '{name}' in '{spec}'")
+        self.coerce = _COERCE[self.type]
+        self.default = self(default) if sep else _MISSING
+
+    def __call__(self, value):
+        try:
+            return self.coerce(value)
+        except (TypeError, ValueError) as e:
+            raise ParamsValidationError(f"Parameter '{self.name}' expects {self.type}: {e}") from None
+
+
+class ParamsSchema:
+    """A job's params_schema, parsed once: shared fields and per-asset (prefixed) fields."""
+
+    def __init__(self, params_schema: Optional[Mapping[str, str]] = None, is_strict: bool = False):
+        self.is_strict = is_strict
+        self.fields: Dict[str, Field] = {}
+        self.asset_fields: Dict[str, Dict[str, Field]] = {}
+        for key, spec in (params_schema or {}).items():
+            asset, dot, name = key.rpartition(".")
+            if dot:
+                self.asset_fields.setdefault(asset, {})[name] = Field(name, spec)
+            else:
+                self.fields[key] = Field(key, spec)
+        self._defaults = {n: f.default for n, f in self.fields.items() if f.default is not _MISSING}
+        self._by_asset: Dict[Optional[str], Dict[str, Field]] = {None: self.fields}
+
+    def fields_for(self, asset: Optional[str]) -> Dict[str, Field]:
+        fields = self._by_asset.get(asset)
+        if fields is None:
+            fields = {**self.fields, **self.asset_fields.get(asset, {})}
+            self._by_asset[asset] = fields
+        return fields
+
+    def defaults_for(self, asset: Optional[str]) -> Dict[str, Any]:
+        extra = self.asset_fields.get(asset)
+        if not extra:
+            return self._defaults
+        return {**self._defaults, **{n: f.default for n, f in extra.items() if f.default is not _MISSING}}
+
+    def validate(self, values: Mapping[str, Any], asset: Optional[str] = None,
+                 check_required: bool = True) -> Dict[str, Any]:
+        """Coerces declared fields; raises one error listing every problem."""
+        fields = self.fields_for(asset)
+        out, problems = {}, []
+        for name, value in values.items():
+            field = fields.get(name)
+            if field is None:
+                if self.is_strict:
+                    problems.append(f"'{name}' is not declared in params_schema (is_strict)")
+                else:
+                    out[name] = value
+                continue
+            try:
+                out[name] = field(value)
+            except ParamsValidationError as e:
+                problems.append(str(e))
+        if check_required:
+            problems += [f"Required parameter '{n}' has no value" for n, f in fields.items()
+                         if f.required and n not in out]
+        if problems:
+            where = f" for asset '{asset}'" if asset else ""
+            raise ParamsValidationError(f"Invalid parameters{where}: " + "; ".join(problems))
+        return out
+
+
+def _scoped(values: Mapping[str, Any], asset: Optional[str]) -> Dict[str, Any]:
+    """Plain keys plus "<asset>.<name>" keys of this asset (other assets' keys dropped)."""
+    out, own = {}, {}
+    for key, value in values.items():
+        prefix, dot, name = key.rpartition(".")
+        if not dot:
+            out[key] = value
+        elif prefix == asset:
+            own[name] = value
+    out.update(own)
+    return out
+
+
+def _copy(value):
+    """Copies nested lists/dicts (what list/dict/json params hold); much cheaper than deepcopy."""
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    return value
+
+
+class Hydrator:
+    """
+    Hydrates one job's parameters. Results are memoized (LRU) by
+    (asset, tags, registry_version); pass a new registry_version whenever
+    the registry row changes. A registry passed without a version is never
+    cached: it is resolved on every call.
+    """
+
+    def __init__(self, job: Mapping, cache_size: int = DEFAULT_CACHE_SIZE):
+        self.job_name = job["name"]
+        self.schema = ParamsSchema(job.get("params_schema"), bool(job.get("is_strict")))
+        self.job_overrides = dict(job.get("job_overrides") or {})
+        self.ops_config = {k: dict(v or {}) for k, v in (job.get("ops_config") or {}).items()}
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    @classmethod
+    def from_configs(cls, configs: Iterable[Mapping], cache_size: int = DEFAULT_CACHE_SIZE) -> Dict[str, "Hydrator"]:
+        return {job["name"]: cls(job, cache_size) for config in configs for job in config.get("jobs") or []}
+
+    def _resolve(self, tags: Mapping[str, str], registry: Mapping[str, Any], asset: Optional[str]) -> Dict[str, Any]:
+        schema = self.schema
+        values = dict(schema.defaults_for(asset))
+        values.update(schema.validate(_scoped(self.job_overrides, asset), asset, check_required=False))
+        if asset in self.ops_config:
+            values.update(schema.validate(self.ops_config[asset], asset, check_required=False))
+        if registry:
+            shared = {k: v for k, v in registry.items() if k != REGISTRY_OPS_KEY}
+            values.update(schema.validate(_scoped(shared, asset), asset, check_required=False))
+            per_asset = (registry.get(REGISTRY_OPS_KEY) or {}).get(asset)
+            if per_asset:
+                values.update(schema.validate(per_asset, asset, check_required=False))
+        from_tags = {k[len(PARAM_TAG_PREFIX):]: v for k, v in tags.items() if k.startswith(PARAM_TAG_PREFIX)}
+        if from_tags:
+            values.update(schema.validate(_scoped(from_tags, asset), asset, check_required=False))
+        return values
+
+    def hydrate(self, tags: Optional[Mapping[str, str]] = None,
+                registry: Union[Mapping[str, Any], Callable[[], Mapping[str, Any]], None] = None,
+                registry_version: Any = None, trigger: Optional[Mapping[str, Any]] = None,
+                asset: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Parameters for one run (and asset). `registry` may be a callable; it
+        is only called on a cache miss. Returns a fresh dict each call; list
+        and dict values are copies, so callers may modify them.
+        """
+        tags = tags or {}
+        # Without a version a changed registry row would never be seen
+        use_cache = self.cache_size and (registry is None or registry_version is not None)
+        # Only param/ tags change the result; dagster/* and per-file tags would defeat the cache
+        key = (asset, registry_version, tuple(sorted((k, v) for k, v in tags.items()
+                                                     if k.startswith(PARAM_TAG_PREFIX))))
+        with self._lock:
+            cached = self._cache.get(key) if use_cache else None
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+        if cached is None:
+            self.misses += 1
+            cached = self._resolve(tags, registry() if callable(registry) else (registry or {}), asset)
+            if use_cache:
+                with self._lock:
+                    self._cache[key] = cached
+                    if len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+        params = {k: _copy(v) for k, v in cached.items()}
+        if trigger:
+            params.update(self.schema.validate(trigger, asset, check_required=False))
+        missing = [n for n, f in self.schema.fields_for(asset).items() if f.required and n not in params]
+        if missing:
+            where = f" for asset '{asset}'" if asset else ""
+            raise ParamsValidationError(
+                f"Job '{self.job_name}' is missing required parameters{where}: {', '.join(missing)}"
+            )
+        return params
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._cache)}
+
+
+def hydrate_requests(hydrator: Hydrator, triggers: Iterable[Mapping[str, Any]], **kwargs) -> List[Dict[str, Any]]:
+    """Parameters for a batch of RunRequests from one sensor tick."""
+    return [hydrator.hydrate(trigger=trigger, **kwargs) for trigger in triggers]
@@ -0,0 +1,75 @@
+"""
+Small JSON-file stores shared by the caches of a code location.
+
+SchemaCache (.nexus_cache/schema_cache.json) and TuningStore
+(.nexus_cache/autotune.json) keep one JSON object per file: read once,
+served from memory, and rewritten atomically on each change. Several runs of
+a code location may write the same file at once, so every change re-reads
+the file under a lock (an flock on "<file>.lock" where the platform has
+fcntl) and applies itself to what is on disk:
+
+    store = JsonFileStore(".nexus_cache/schema_cache.json")
+    entry = store.read().get(key)
+    store.update(lambda entries: entries.__setitem__(key, value))
+
+A missing or corrupt file reads as empty: a cold cache, never an error.
+"""
+import contextlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional, TypeVar
+
+try:
+    import fcntl
+except ImportError:  # Windows: in-process locking only
+    fcntl = None
+
+T = TypeVar("T")
+
+
+class JsonFileStore:
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict] = None
+
+    def _read_file(self) -> Dict:
+        try:
+            entries = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def read(self) -> Dict:
+        """The entries, read from disk on first use. Callers must not modify them; use update()."""
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._read_file()
+            return self._entries
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield
+            return
+        with open(self.path.with_name(self.path.name + ".lock"), "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def update(self, change: Callable[[Dict], T]) -> T:
+        """Re-reads the file, applies change(entries) and writes the result back; returns what change returned."""
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self._file_lock():
+                entries = self._read_file()
+                result = change(entries)
+                tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+                tmp.write_text(json.dumps(entries, indent=2, sort_keys=True))
+                tmp.replace(self.path)
+            self._entries = entries
+            return result
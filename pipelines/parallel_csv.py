@@ -0,0 +1,325 @@
+"""
+Multi-process CSV conversion for single huge files.
+
+Single-object conversions (s3_s3_csv_to_parquet.yaml,
+s3_s3_csv_to_json_single_file.yaml) parse and encode the whole file on one
+core. Here the file is split into byte ranges that end on record boundaries,
+each range is parsed and encoded in a process pool, and the parts are
+assembled in order:
+
+  - PARQUET: each worker writes its range as an Arrow IPC file; the parent
+    memory-maps it (zero-copy) and appends it as one row group to a single
+    Parquet file.
+  - JSON (orient: records): each worker writes a comma-joined slice of the
+    array; the parent streams them into one file, or into the parts of an S3
+    multipart upload (multipart_bodies()).
+
+Boundaries are quote-aware: a newline only ends a record when the number of
+quote characters before it is even, so quoted fields with embedded newlines
+are never split. Finding them is one sequential pass of bytes.count/find over
+the file, which runs at memory speed.
+"""
+import csv
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+MB = 1024 * 1024
+SCAN_BLOCK = 8 * MB
+MIN_RANGE_BYTES = 4 * MB
+S3_MIN_PART_BYTES = 5 * MB
+SAMPLE_RANGES = 8
+SAMPLE_BYTES = 1 * MB
+
+# pyarrow: "In CSV column #2: CSV conversion error to int64: invalid value 'abc'"
+_CONVERSION_ERROR = re.compile(r"CSV column #(\d+): CSV conversion error")
+
+
+def _record_end(f, start: int, quote: bytes) -> int:
+    """Offset just past the first record (e.g. the header) starting at `start`."""
+    return find_boundaries(f, start, [start], quote)[0] if start < os.fstat(f.fileno()).st_size else start
+
+
+def find_boundaries(f, start: int, targets: List[int], quote: bytes = b'"', block: int = SCAN_BLOCK) -> List[int]:
+    """
+    For each target offset (ascending), the offset just past the first newline
+    at or after it that is outside quotes. Targets past the last record are
+    dropped.
+    """
+    boundaries = []
+    parity = 0
+    offset = start
+    ti = 0
+    f.seek(start)
+    while ti < len(targets):
+        buf = f.read(block)
+        if not buf:
+            break
+        pos = 0
+        while ti < len(targets) and targets[ti] < offset + len(buf):
+            search = max(targets[ti] - offset, pos)
+            parity ^= buf.count(quote, pos, search) & 1
+            pos = search
+            found = False
+            while True:
+                nl = buf.find(b"\n", pos)
+                if nl < 0:
+                    break
+                parity ^= buf.count(quote, pos, nl) & 1
+                pos = nl + 1
+                if not parity:
+                    found = True
+                    break
+            if not found:
+                break
+            boundaries.append(offset + pos)
+            ti += 1
+        parity ^= buf.count(quote, pos) & 1
+        offset += len(buf)
+    return boundaries
+
+
+def split_ranges(path, parts: int, quotechar: str = '"', has_headers: bool = True,
+                 min_range_bytes: int = MIN_RANGE_BYTES) -> Tuple[bytes, List[Tuple[int, int]]]:
+    """Returns (header line, [(start, end)]) covering every data record exactly once."""
+    quote = quotechar.encode()
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        data_start = _record_end(f, 0, quote) if has_headers else 0
+        f.seek(0)
+        header = f.read(data_start)
+        parts = max(1, min(parts, (size - data_start) // max(1, min_range_bytes) or 1))
+        step = (size - data_start) / parts
+        targets = [data_start + int(step * i) for i in range(1, parts)]
+        cuts = [b for b in find_boundaries(f, data_start, targets, quote) if b < size]
+    edges = [data_start] + cuts + [size]
+    return header, [(a, b) for a, b in zip(edges, edges[1:]) if b > a]
+
+
+def _field_names(header: bytes, delimiter: str) -> List[str]:
+    text = header.decode("utf-8-sig")
+    return [name.strip() for name in next(csv.reader(io.StringIO(text), delimiter=delimiter))]
+
+
+def _read_range(path, start: int, end: int) -> bytes:
+    with open(path, "rb") as f:
+        f.seek(start)
+        return f.read(end - start)
+
+
+def _json_part(path, start, end, fields, delimiter, out_path) -> int:
+    text = _read_range(path, start, end).decode("utf-8")
+    rows = 0
+    with open(out_path, "w", encoding="utf-8") as out:
+        for record in csv.reader(io.StringIO(text, newline=""), delimiter=delimiter):
+            if not record:
+                continue
+            if rows:
+                out.write(",")
+            out.write(json.dumps(dict(zip(fields, record))))
+            rows += 1
+    return rows
+
+
+def _arrow_options(fields, delimiter, column_types):
+    import pyarrow.csv as pacsv
+
+    return dict(
+        read_options=pacsv.ReadOptions(column_names=fields),
+        parse_options=pacsv.ParseOptions(delimiter=delimiter, newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(column_types=column_types),
+    )
+
+
+def _arrow_part(path, start, end, fields, delimiter, out_path, column_types) -> int:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
+    table = pacsv.read_csv(
+        pa.py_buffer(_read_range(path, start, end)), **_arrow_options(fields, delimiter, column_types)
+    )
+    with pa.OSFile(str(out_path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return table.num_rows
+
+
+def _convert_range(args) -> Tuple[int, int, str]:
+    index, fmt, path, start, end, fields, delimiter, work_dir, column_types = args
+    if fmt == "JSON":
+        out_path = Path(work_dir) / f"part_{index:05d}.json"
+        rows = _json_part(path, start, end, fields, delimiter, out_path)
+    else:
+        out_path = Path(work_dir) / f"part_{index:05d}.arrow"
+        rows = _arrow_part(path, start, end, fields, delimiter, out_path, column_types)
+    return index, rows, str(out_path)
+
+
+def _widen(a, b):
+    """A type both samples convert to: equal, int -> float, null -> anything, else string."""
+    import pyarrow as pa
+
+    if a == b or pa.types.is_null(b):
+        return a
+    if pa.types.is_null(a):
+        return b
+    if pa.types.is_integer(a) and pa.types.is_floating(b) or pa.types.is_floating(a) and pa.types.is_integer(b):
+        return pa.float64()
+    if pa.types.is_integer(a) and pa.types.is_integer(b):
+        return pa.int64()
+    return pa.string()
+
+
+def _infer_column_types(path, ranges, fields, delimiter, quotechar='"',
+                        samples: int = SAMPLE_RANGES, sample_bytes: int = SAMPLE_BYTES) -> Dict:
+    """
+    Infers Arrow types so every part shares one schema: the head of up to
+    `samples` ranges spread over the file, widened to a common type per column.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
+    picked = ranges if len(ranges) <= samples else [ranges[i * len(ranges) // samples] for i in range(samples)]
+    types: Dict = {}
+    with open(path, "rb") as f:
+        for start, end in picked:
+            cut = end
+            if end > start + sample_bytes:
+                cut = (find_boundaries(f, start, [start + sample_bytes], quotechar.encode()) or [end])[0]
+            table = pacsv.read_csv(pa.py_buffer(_read_range(path, start, min(cut, end))),
+                                   **_arrow_options(fields, delimiter, None))
+            for field in table.schema:
+                types[field.name] = _widen(types[field.name], field.type) if field.name in types else field.type
+    return types
+
+
+def multipart_bodies(part_paths: List[str], min_part_bytes: int = S3_MIN_PART_BYTES) -> Iterator[bytes]:
+    """
+    JSON array bodies for an S3 multipart upload, each >= min_part_bytes except
+    the last. Parts are streamed, so memory stays around min_part_bytes.
+    """
+    buf = bytearray(b"[")
+    first = True
+    for part in part_paths:
+        if os.path.getsize(part) == 0:
+            continue
+        if not first:
+            buf += b","
+        first = False
+        with open(part, "rb") as f:
+            while True:
+                chunk = f.read(max(1, min_part_bytes - len(buf)))
+                if not chunk:
+                    break
+                buf += chunk
+                if len(buf) >= min_part_bytes:
+                    yield bytes(buf)
+                    buf.clear()
+    buf += b"]"
+    yield bytes(buf)
+
+
+def _assemble_parquet(part_paths: List[str], out_path, compression: str) -> None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for part in part_paths:
+            with pa.memory_map(part) as source:
+                table = pa.ipc.open_file(source).read_all()
+            if writer is None:
+                writer = pq.ParquetWriter(str(out_path), table.schema, compression=compression)
+            writer.write_table(table, row_group_size=max(1, table.num_rows))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def convert_csv(
+    path,
+    out_path,
+    object_type: str = "PARQUET",
+    workers: Optional[int] = None,
+    delimiter: str = ",",
+    quotechar: str = '"',
+    compression: str = "snappy",
+    column_types: Optional[Dict] = None,
+    min_range_bytes: int = MIN_RANGE_BYTES,
+) -> Dict:
+    """
+    Converts one CSV file to PARQUET or JSON (array of records) using `workers` processes.
+
+    Returns {"rows", "ranges", "workers", "seconds", "phases": {...}}.
+    """
+    object_type = object_type.upper()
+    if object_type not in ("PARQUET", "JSON"):
+        raise ValueError(f"Unsupported object_type for parallel conversion: {object_type}")
+    workers = workers or os.cpu_count() or 1
+    phases = {}
+
+    started = time.perf_counter()
+    header, ranges = split_ranges(path, workers * 4, quotechar, min_range_bytes=min_range_bytes)
+    fields = _field_names(header, delimiter)
+    inferred = object_type == "PARQUET" and column_types is None and bool(ranges)
+    if inferred:
+        column_types = _infer_column_types(path, ranges, fields, delimiter, quotechar)
+    phases["split"] = time.perf_counter() - started
+
+    work_dir = tempfile.mkdtemp(prefix="nexus_parallel_csv_")
+    widened = []
+    try:
+        t = time.perf_counter()
+        while True:
+            tasks = [
+                (i, object_type, str(path), a, b, fields, delimiter, work_dir, column_types)
+                for i, (a, b) in enumerate(ranges)
+            ]
+            try:
+                if workers > 1 and len(tasks) > 1:
+                    with ProcessPoolExecutor(max_workers=workers) as pool:
+                        results = list(pool.map(_convert_range, tasks))
+                else:
+                    results = [_convert_range(task) for task in tasks]
+                break
+            except Exception as e:
+                # A value the samples did not show (e.g. "abc" in an int column
+                # past the sampled heads): widen that column to string and redo
+                # every part, so all row groups keep one schema
+                m = _CONVERSION_ERROR.search(str(e)) if inferred else None
+                if m is None or fields[int(m.group(1))] in widened:
+                    raise
+                import pyarrow as pa
+
+                name = fields[int(m.group(1))]
+                widened.append(name)
+                column_types = {**column_types, name: pa.string()}
+        results.sort()
+        phases["parse_encode"] = time.perf_counter() - t
+
+        t = time.perf_counter()
+        part_paths = [p for _, _, p in results]
+        if object_type == "JSON":
+            with open(out_path, "wb") as out:
+                for body in multipart_bodies(part_paths):
+                    out.write(body)
+        else:
+            _assemble_parquet(part_paths, out_path, compression)
+        phases["assemble"] = time.perf_counter() - t
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        "rows": sum(rows for _, rows, _ in results),
+        "ranges": len(ranges),
+        "workers": workers,
+        "widened_to_string": widened,
+        "seconds": time.perf_counter() - started,
+        "phases": phases,
+    }
@@ -0,0 +1,240 @@
+"""
+Per-run sampling profiler.
+
+Turned on for a single run, without redeploying, by either
+  - a run tag:            perf/profile: "true"   (or "py-spy")
+  - a job param:          profile: "true"        (params_schema: profile: "string|false")
+
+The default sampler is built in: a daemon thread that samples the executing
+thread's stack every `interval` seconds (5ms default) and counts collapsed
+stacks. The output is a folded-stack file (`frame;frame;frame count`) that
+flamegraph.pl, speedscope and inferno render directly. With "py-spy", py-spy
+is attached to the process instead (native frames, lower overhead); if it is
+not installed or exits at once (e.g. no ptrace permission) the built-in
+sampler runs instead. A py-spy that fails later is reported as
+perf/profile_error rather than a flamegraph path that does not exist.
+
+Optionally, `perf/profile_memory: "<N>"` records tracemalloc and writes the
+top-N allocation sites.
+
+Artifacts are written next to the run ($DAGSTER_HOME/storage/<run_id>/profiles)
+and their paths returned as materialization metadata.
+"""
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from functools import wraps
+from pathlib import Path
+from typing import Dict, Mapping, Optional
+
+PROFILE_TAG = "perf/profile"
+PROFILE_MEMORY_TAG = "perf/profile_memory"
+PROFILE_PARAM = "profile"
+
+_TRUE_VALUES = {"true", "1", "on", "yes", "py-spy"}
+
+PYSPY_START_CHECK = 0.2   # seconds py-spy must survive to count as attached
+PYSPY_STOP_TIMEOUT = 30   # seconds to write its output after SIGINT before it is killed
+
+
+def profile_mode(tags: Optional[Mapping[str, str]], params: Optional[Mapping] = None) -> Optional[str]:
+    """Returns "sampler", "py-spy" or None from run tags / job params."""
+    value = str((tags or {}).get(PROFILE_TAG) or (params or {}).get(PROFILE_PARAM) or "").lower()
+    if value not in _TRUE_VALUES:
+        return None
+    return "py-spy" if value == "py-spy" else "sampler"
+
+
+def profile_dir(run_id: str) -> Path:
+    dagster_home = os.environ.get("DAGSTER_HOME")
+    if dagster_home:
+        return Path(dagster_home) / "storage" / run_id / "profiles"
+    return Path(".nexus_cache") / "profiles" / run_id
+
+
+class StackSampler:
+    """Samples one thread's Python stack on a timer and counts folded stacks."""
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = 0.005):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="nexus-stack-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write_folded(self, path: Path) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+class RunProfiler:
+    """
+    Context manager wrapping one asset execution.
+
+        with RunProfiler.from_context(context, "cross_ref_test_asset") as prof:
+            ...
+        context.add_output_metadata(prof.to_dagster_metadata())
+
+    Does nothing (and costs nothing) when profiling is not requested.
+    """
+
+    def __init__(self, run_id: str, name: str, mode: Optional[str], memory_top_n: int = 0,
+                 interval: float = 0.005):
+        self.run_id = run_id
+        self.name = name
+        self.mode = mode
+        self.memory_top_n = memory_top_n
+        self.interval = interval
+        self.artifacts: Dict[str, str] = {}
+        self._sampler: Optional[StackSampler] = None
+        self._pyspy: Optional[subprocess.Popen] = None
+        self._pyspy_out: Optional[Path] = None
+        self._started_tracemalloc = False
+        self._started = 0.0
+
+    @classmethod
+    def from_context(cls, context, name: str, params: Optional[Mapping] = None) -> "RunProfiler":
+        tags = context.run.tags
+        memory = str(tags.get(PROFILE_MEMORY_TAG, "0"))
+        return cls(
+            run_id=context.run.run_id,
+            name=name,
+            mode=profile_mode(tags, params),
+            memory_top_n=int(memory) if memory.isdigit() else 0,
+        )
+
+    @property
+    def out_dir(self) -> Path:
+        return profile_dir(self.run_id)
+
+    def __enter__(self):
+        if self.mode is None:
+            return self
+        self._started = time.perf_counter()
+        if self.memory_top_n and not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+            self._started_tracemalloc = True
+        if self.mode == "py-spy" and shutil.which("py-spy"):
+            out = self.out_dir / f"{self.name}.speedscope.json"
+            out.parent.mkdir(parents=True, exist_ok=True)
+            self._pyspy = subprocess.Popen(
+                ["py-spy", "record", "--pid", str(os.getpid()), "--format", "speedscope",
+                 "--rate", str(int(1 / self.interval)), "--output", str(out)],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            self._pyspy_out = out
+            try:
+                code = self._pyspy.wait(timeout=PYSPY_START_CHECK)
+            except subprocess.TimeoutExpired:
+                pass
+            else:
+                self.artifacts["profile_error"] = f"py-spy exited with code {code} on start"
+                self._pyspy = None
+        if self._pyspy is None:
+            # py-spy missing, failed, or not requested: fall back to the built-in sampler
+            self._sampler = StackSampler(interval=self.interval).start()
+        return self
+
+    def _stop_pyspy(self) -> None:
+        # py-spy writes its output on SIGINT
+        self._pyspy.send_signal(signal.SIGINT)
+        try:
+            code = self._pyspy.wait(timeout=PYSPY_STOP_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self._pyspy.kill()
+            self._pyspy.wait()
+            self.artifacts["profile_error"] = f"py-spy did not finish within {PYSPY_STOP_TIMEOUT}s; killed"
+            return
+        out = self._pyspy_out
+        if code == 0 and out.exists() and out.stat().st_size:
+            self.artifacts["flamegraph"] = str(out)
+        else:
+            self.artifacts["profile_error"] = f"py-spy exited with code {code} and wrote no profile"
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.mode is None:
+            return False
+        if self._sampler:
+            self._sampler.stop()
+            path = self._sampler.write_folded(self.out_dir / f"{self.name}.folded")
+            self.artifacts["flamegraph"] = str(path)
+        if self._pyspy:
+            self._stop_pyspy()
+        if self.memory_top_n and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            path = self.out_dir / f"{self.name}.tracemalloc.txt"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "w") as f:
+                for stat in snapshot.statistics("lineno")[: self.memory_top_n]:
+                    f.write(f"{stat}\n")
+            self.artifacts["tracemalloc"] = str(path)
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+        self.artifacts["profiled_seconds"] = f"{time.perf_counter() - self._started:.3f}"
+        return False
+
+    def to_dagster_metadata(self) -> Dict:
+        if not self.artifacts:
+            return {}
+        from dagster import MetadataValue
+
+        metadata = {}
+        for key, value in self.artifacts.items():
+            if key == "profiled_seconds":
+                metadata["perf/profiled_seconds"] = MetadataValue.float(float(value))
+            elif key == "profile_error":
+                metadata["perf/profile_error"] = MetadataValue.text(value)
+            else:
+                metadata[f"perf/{key}"] = MetadataValue.path(value)
+        return metadata
+
+
+def profiled(fn):
+    """
+    Decorator for native assets whose first argument is the execution context.
+
+        @asset
+        @profiled
+        def my_asset(context): ...
+    """
+
+    @wraps(fn)
+    def wrapper(context, *args, **kwargs):
+        with RunProfiler.from_context(context, fn.__name__) as prof:
+            result = fn(context, *args, **kwargs)
+        metadata = prof.to_dagster_metadata()
+        if metadata:
+            context.add_output_metadata(metadata)
+        return result
+
+    return wrapper
@@ -0,0 +1,296 @@
+"""
+Run-duration history for ETAs, SLA-aware schedules and partition packing.
+
+Every materialization records one row per (asset, partition): duration,
+rows, bytes and peak memory. The store is a single SQLite table
+(.nexus_cache/run_history.db), or any DB-API connection to the registry
+database, pruned to the most recent `keep` rows per asset and partition so
+it stays small.
+
+Queries:
+  - samples(asset, partition): the recent (duration, bytes) rows themselves;
+  - percentile(asset, q, partition): duration percentile (q in percent,
+    0-100) over recent runs, per partition when it has enough history, else
+    across the asset;
+  - estimate(asset, q, partition, input_bytes): when bytes are known and the
+    asset has a size history, a least-squares duration ~ bytes fit plus the
+    q-th percentile of its residuals;
+  - durations(assets, q): input for scheduler.critical_path_ranks.
+
+Built on those:
+  - job_eta(): critical-path ETA of a job's steps;
+  - sla_start_cron(): for a schedule with `sla:` (the time its data must
+    land), the cron that starts the job early enough;
+  - pack_partitions(): groups partitions into runs of at most
+    `max_run_seconds` expected work (first-fit decreasing).
+
+    schedules:
+      - name: daily_master_showcase
+        job: master_showcase_job
+        cron: "0 6 * * *"
+        sla: "07:00"            # or {deadline: "07:00", percentile: 95, margin_minutes: 10}
+"""
+import math
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+from pipelines.scheduler import critical_path_ranks
+
+DEFAULT_DB_PATH = Path(".nexus_cache") / "run_history.db"
+DEFAULT_KEEP = 200
+DEFAULT_WINDOW = 50
+MIN_PARTITION_SAMPLES = 3
+MIN_FIT_SAMPLES = 5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS run_history (
+    asset        TEXT NOT NULL,
+    partition    TEXT NOT NULL DEFAULT '',
+    job          TEXT,
+    run_id       TEXT,
+    started_at   REAL NOT NULL,
+    duration_s   REAL NOT NULL,
+    rows_count   INTEGER,
+    bytes_count  INTEGER,
+    peak_mem_mb  REAL,
+    status       TEXT NOT NULL DEFAULT 'SUCCESS'
+)
+"""
+_INDEX = "CREATE INDEX IF NOT EXISTS run_history_key ON run_history (asset, partition, started_at)"
+
+
+def quantile(values: Sequence[float], q: float) -> float:
+    """Linear-interpolated quantile, q in [0, 1]."""
+    ordered = sorted(values)
+    if not ordered:
+        raise ValueError("quantile of an empty sequence")
+    pos = (len(ordered) - 1) * q
+    lo, hi = math.floor(pos), math.ceil(pos)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def _q(percentile: float) -> float:
+    """Percent (0-100) -> quantile; q=1 means p1, never p100."""
+    if not 0 <= percentile <= 100:
+        raise ValueError(f"percentile must be in percent (0-100), got {percentile!r}")
+    return percentile / 100
+
+
+class RunHistory:
+    def __init__(self, path=DEFAULT_DB_PATH, connection=None, placeholder: str = "?", keep: int = DEFAULT_KEEP):
+        """
+        SQLite at `path`, or an existing DB-API `connection` (e.g. the
+        registry's Postgres, with placeholder="%s").
+        """
+        if connection is None:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(path))
+            # One small write per materialization; WAL avoids an fsync of the whole journal each time
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+        self.conn = connection
+        self.p = placeholder
+        self.keep = keep
+        cur = self.conn.cursor()
+        cur.execute(_SCHEMA)
+        cur.execute(_INDEX)
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # -- writing -------------------------------------------------------------
+
+    def record(self, asset: str, duration: float, partition: Optional[str] = None, rows: Optional[int] = None,
+               bytes: Optional[int] = None, peak_memory_mb: Optional[float] = None, job: Optional[str] = None,
+               run_id: Optional[str] = None, started_at: Optional[float] = None, status: str = "SUCCESS") -> None:
+        p = self.p
+        partition = partition or ""
+        cur = self.conn.cursor()
+        cur.execute(
+            f"INSERT INTO run_history (asset, partition, job, run_id, started_at, duration_s, rows_count, "
+            f"bytes_count, peak_mem_mb, status) VALUES ({', '.join([p] * 10)})",
+            (asset, partition, job, run_id, time.time() if started_at is None else started_at, duration,
+             rows, bytes, peak_memory_mb, status),
+        )
+        # Keep the newest `keep` rows for this key
+        cur.execute(
+            f"DELETE FROM run_history WHERE asset = {p} AND partition = {p} AND started_at < ("
+            f"SELECT MIN(started_at) FROM (SELECT started_at FROM run_history WHERE asset = {p} "
+            f"AND partition = {p} ORDER BY started_at DESC LIMIT {int(self.keep)}) AS newest)",
+            (asset, partition, asset, partition),
+        )
+        self.conn.commit()
+
+    def record_metadata(self, asset: str, metadata: Mapping, **kwargs) -> None:
+        """Records from Instrumentation.to_metadata(): total seconds, and rows/bytes of the busiest phase."""
+        phases = metadata.get("perf/phases") or {}
+        self.record(
+            asset,
+            metadata.get("perf/total_seconds", 0.0),
+            rows=max((p.get("rows") or 0 for p in phases.values()), default=None) or None,
+            bytes=max((p.get("bytes") or 0 for p in phases.values()), default=None) or None,
+            **kwargs,
+        )
+
+    # -- querying ------------------------------------------------------------
+
+    def samples(self, asset: str, partition: Optional[str] = None,
+                window: int = DEFAULT_WINDOW) -> List[Tuple[float, Optional[int]]]:
+        """(duration_s, bytes_count) of the latest successful runs, newest first; all partitions when None."""
+        p = self.p
+        sql = f"SELECT duration_s, bytes_count FROM run_history WHERE asset = {p} AND status = 'SUCCESS'"
+        params: list = [asset]
+        if partition is not None:
+            sql += f" AND partition = {p}"
+            params.append(partition)
+        sql += f" ORDER BY started_at DESC LIMIT {int(window)}"
+        cur = self.conn.cursor()
+        cur.execute(sql, params)
+        return cur.fetchall()
+
+    def _durations(self, asset: str, partition: Optional[str], window: int) -> List[Tuple[float, Optional[int]]]:
+        if partition is not None:
+            rows = self.samples(asset, partition, window)
+            if len(rows) >= MIN_PARTITION_SAMPLES:
+                return rows
+        return self.samples(asset, None, window)
+
+    def percentile(self, asset: str, q: float = 50, partition: Optional[str] = None,
+                   window: int = DEFAULT_WINDOW) -> Optional[float]:
+        """Duration percentile (q in percent, 0-100) of recent successful runs; None without history."""
+        rows = self._durations(asset, partition, window)
+        return quantile([r[0] for r in rows], _q(q)) if rows else None
+
+    def estimate(self, asset: str, q: float = 50, partition: Optional[str] = None,
+                 input_bytes: Optional[int] = None, window: int = DEFAULT_WINDOW) -> Optional[float]:
+        """Expected duration, scaled by input size when a size history exists."""
+        rows = self._durations(asset, partition, window)
+        if not rows:
+            return None
+        sized = [(d, b) for d, b in rows if b is not None]
+        if input_bytes is None or len(sized) < MIN_FIT_SAMPLES:
+            return quantile([d for d, _ in rows], _q(q))
+        n = len(sized)
+        mean_b = sum(b for _, b in sized) / n
+        mean_d = sum(d for d, _ in sized) / n
+        var_b = sum((b - mean_b) ** 2 for _, b in sized)
+        slope = sum((b - mean_b) * (d - mean_d) for d, b in sized) / var_b if var_b else 0.0
+        slope = max(0.0, slope)
+        intercept = mean_d - slope * mean_b
+        residual = quantile([d - (intercept + slope * b) for d, b in sized], _q(q))
+        return max(0.0, intercept + slope * input_bytes + residual)
+
+    def durations(self, assets: Iterable[str], q: float = 50, default: Optional[float] = None) -> Dict[str, float]:
+        """{asset: duration percentile} for assets with history (or `default`)."""
+        result = {}
+        for asset in assets:
+            value = self.percentile(asset, q)
+            if value is None:
+                value = default
+            if value is not None:
+                result[asset] = value
+        return result
+
+    def summary(self, asset: str, partition: Optional[str] = None, window: int = DEFAULT_WINDOW) -> Dict:
+        p = self.p
+        sql = (f"SELECT duration_s, rows_count, bytes_count, peak_mem_mb FROM run_history "
+               f"WHERE asset = {p} AND status = 'SUCCESS'")
+        params: list = [asset]
+        if partition is not None:
+            sql += f" AND partition = {p}"
+            params.append(partition)
+        cur = self.conn.cursor()
+        cur.execute(sql + f" ORDER BY started_at DESC LIMIT {int(window)}", params)
+        rows = cur.fetchall()
+        if not rows:
+            return {"runs": 0}
+        durations = [r[0] for r in rows]
+        peaks = [r[3] for r in rows if r[3] is not None]
+        return {
+            "runs": len(rows),
+            "p50_seconds": quantile(durations, 0.5),
+            "p90_seconds": quantile(durations, 0.9),
+            "p99_seconds": quantile(durations, 0.99),
+            "avg_rows": sum(r[1] or 0 for r in rows) / len(rows),
+            "avg_bytes": sum(r[2] or 0 for r in rows) / len(rows),
+            "max_peak_mem_mb": max(peaks) if peaks else None,
+        }
+
+
+# ---------------------------------------------------------------------------
+# ETA, SLA and packing
+# ---------------------------------------------------------------------------
+
+def job_eta(history: RunHistory, steps: Mapping, q: float = 90, default: float = 60.0) -> float:
+    """
+    Expected seconds for a job: its longest path at the q-th percentile step
+    durations (steps as built by scheduler.build_steps).
+    """
+    ranks = critical_path_ranks(steps, history.durations(steps, q, default=default))
+    return max(ranks.values(), default=0.0)
+
+
+def parse_sla(sla: Union[str, Mapping]) -> Dict:
+    """`sla: "07:00"` or {deadline, percentile, margin_minutes} -> normalized dict."""
+    if isinstance(sla, str):
+        sla = {"deadline": sla}
+    hour, _, minute = str(sla["deadline"]).partition(":")
+    return {
+        "deadline_minutes": int(hour) * 60 + int(minute or 0),
+        "percentile": float(sla.get("percentile", 90)),
+        "margin_minutes": float(sla.get("margin_minutes", 10)),
+    }
+
+
+def sla_start_cron(cron: str, sla: Union[str, Mapping], eta_seconds: float) -> str:
+    """
+    The schedule's cron, moved earlier when needed so that start + ETA +
+    margin lands before the SLA deadline. Only the minute and hour fields are
+    changed, so it applies to fixed-time crons such as "0 6 * * *".
+    """
+    fields = cron.split()
+    if len(fields) != 5 or not fields[0].isdigit() or not fields[1].isdigit():
+        raise ValueError(f"SLA scheduling needs a fixed minute and hour in the cron, got '{cron}'")
+    spec = parse_sla(sla)
+    scheduled = int(fields[1]) * 60 + int(fields[0])
+    latest = spec["deadline_minutes"] - math.ceil(eta_seconds / 60 + spec["margin_minutes"])
+    if latest >= scheduled:
+        return cron
+    # Crossing midnight would change the day-of-week/day-of-month meaning
+    if latest < 0:
+        raise ValueError(
+            f"ETA of {eta_seconds / 60:.0f} min cannot meet SLA {sla!r} on the same day as '{cron}'"
+        )
+    return " ".join([str(latest % 60), str(latest // 60)] + fields[2:])
+
+
+def pack_partitions(history: RunHistory, asset: str, partitions: Iterable[str], max_run_seconds: float,
+                    q: float = 90, default: Optional[float] = None) -> List[List[str]]:
+    """
+    Groups partitions into runs of at most `max_run_seconds` expected work,
+    largest first (first-fit decreasing). Partitions without history cost the
+    asset-level estimate, or `default`.
+    """
+    fallback = history.percentile(asset, q)
+    if fallback is None:
+        fallback = default if default is not None else max_run_seconds
+    costs = []
+    for key in partitions:
+        rows = history.samples(asset, key)
+        cost = quantile([r[0] for r in rows], _q(q)) if rows else fallback
+        costs.append((cost, key))
+    costs.sort(key=lambda c: -c[0])
+
+    bins: List[List] = []  # [remaining_seconds, [keys]]
+    for cost, key in costs:
+        for b in bins:
+            if b[0] >= cost:
+                b[0] -= cost
+                b[1].append(key)
+                break
+        else:
+            bins.append([max_run_seconds - cost, [key]])
+    return [keys for _, keys in bins]
@@ -0,0 +1,409 @@
+"""
+Fair-share run queue across teams and concurrency pools.
+
+Job-level `concurrency.limit` and asset-level `concurrency_key` are fixed caps
+applied first come, first served, so one team's backfill can fill every slot
+and other teams' schedules (daily_master_showcase,
+daily_cross_ref_schedule_tags_concurrency) wait behind it. FairShareQueue
+decides which queued run starts next:
+
+  - weighted fair share, hierarchical: the org with the fewest running runs
+    per unit of weight goes first, then the team within it; ties go to the
+    one that has started the least weighted work so far (virtual time), then
+    to the oldest queued run;
+  - within a team, the `priority` job tag orders runs (critical > high >
+    normal > low, or an integer), FIFO within a priority;
+  - each pool (an asset `concurrency_key`, or `job:<name>` for a job's
+    `concurrency.limit`) caps concurrent runs and can also rate-limit starts
+    with a token bucket; a run whose pool is full is skipped, not waited on,
+    so it does not block the runs behind it.
+
+Queued runs are kept per team in one heap per pool set (runs of one job share
+a pool set), so picking the next run checks each pool set once instead of
+rescanning every queued run behind a full pool.
+
+team / org come from the run's tags, falling back to the code location's
+metadata.yaml. Queue latency (start - submit) is recorded per team and
+reported as percentiles.
+"""
+import heapq
+import itertools
+import math
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import yaml
+
+METADATA_FILE = Path(__file__).resolve().parent.parent / "metadata.yaml"
+
+PRIORITIES = {"critical": 3, "high": 2, "normal": 1, "medium": 1, "low": 0}
+DEFAULT_TEAM = "unassigned"
+
+
+def load_metadata(path=METADATA_FILE) -> Dict:
+    """team / org / code_location of this code location (metadata.yaml)."""
+    try:
+        with open(path) as f:
+            return yaml.safe_load(f) or {}
+    except OSError:
+        return {}
+
+
+def parse_priority(value) -> int:
+    if value is None:
+        return PRIORITIES["normal"]
+    if isinstance(value, int):
+        return value
+    text = str(value).strip().lower()
+    if text in PRIORITIES:
+        return PRIORITIES[text]
+    try:
+        return int(text)
+    except ValueError:
+        raise ValueError(f"Unknown priority '{value}'; use {', '.join(PRIORITIES)} or an integer") from None
+
+
+class TokenBucket:
+    """`rate` tokens per second up to `burst`; one token per run start."""
+
+    def __init__(self, rate: float, burst: float, now: float = 0.0):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def available(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= 1
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def next_token_at(self, now: float) -> float:
+        self._refill(now)
+        if self.tokens >= 1 or self.rate <= 0:
+            return now
+        return now + (1 - self.tokens) / self.rate
+
+
+@dataclass
+class Pool:
+    name: str
+    limit: Optional[int] = None
+    bucket: Optional[TokenBucket] = None
+    running: int = 0
+
+    def can_start(self, now: float) -> bool:
+        if self.limit is not None and self.running >= self.limit:
+            return False
+        return self.bucket is None or self.bucket.available(now)
+
+
+@dataclass
+class QueuedRun:
+    run_id: str
+    job: str
+    team: str = DEFAULT_TEAM
+    org: str = DEFAULT_TEAM
+    priority: int = PRIORITIES["normal"]
+    pools: Tuple[str, ...] = ()
+    submitted_at: float = 0.0
+    started_at: Optional[float] = None
+    # Expected run time; only used by simulate()
+    duration: float = 1.0
+
+
+@dataclass
+class _Team:
+    org: str
+    weight: float = 1.0
+    running: int = 0
+    started_work: float = 0.0
+    queued: int = 0
+    # pools -> heap of [-priority, seq, run]; fifo mode pushes priority 0
+    queues: Dict[Tuple[str, ...], List] = field(default_factory=dict)
+
+    def oldest(self) -> float:
+        return min((heap[0][1] for heap in self.queues.values() if heap), default=math.inf)
+
+
+def percentiles(values: Sequence[float], points: Iterable[int] = (50, 90, 95, 99)) -> Dict[str, float]:
+    """Nearest-rank percentiles, plus count and max."""
+    ordered = sorted(values)
+    if not ordered:
+        return {"count": 0}
+    result = {"count": len(ordered)}
+    for p in points:
+        result[f"p{p}"] = ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+    result["max"] = ordered[-1]
+    return result
+
+
+class FairShareQueue:
+    def __init__(
+        self,
+        max_concurrent: int = 10,
+        team_weights: Mapping[str, float] = None,
+        org_weights: Mapping[str, float] = None,
+        pools: Mapping[str, Mapping] = None,
+        mode: str = "fair_share",
+    ):
+        if mode not in ("fair_share", "fifo"):
+            raise ValueError(f"Unknown run queue mode: {mode}")
+        self.max_concurrent = max_concurrent
+        self.team_weights = dict(team_weights or {})
+        self.org_weights = dict(org_weights or {})
+        self.mode = mode
+        self.pools: Dict[str, Pool] = {}
+        for name, spec in (pools or {}).items():
+            self.add_pool(name, **spec)
+        self.teams: Dict[str, _Team] = {}
+        self.running: Dict[str, QueuedRun] = {}
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self._seq = itertools.count()
+
+    def add_pool(self, name: str, limit: Optional[int] = None, rate: Optional[float] = None,
+                 burst: Optional[float] = None) -> Pool:
+        if rate is not None and not rate > 0:
+            raise ValueError(f"Pool '{name}': rate must be > 0 starts per second, got {rate}")
+        if burst is not None and not burst >= 1:
+            raise ValueError(f"Pool '{name}': burst must be >= 1 (one start needs a whole token), got {burst}")
+        if burst is not None and rate is None:
+            raise ValueError(f"Pool '{name}': burst needs a rate")
+        bucket = TokenBucket(rate, burst if burst is not None else max(1.0, rate)) if rate is not None else None
+        pool = self.pools[name] = Pool(name, limit, bucket)
+        return pool
+
+    def __len__(self):
+        return sum(t.queued for t in self.teams.values())
+
+    # -- queueing ------------------------------------------------------------
+
+    def submit(self, run: QueuedRun) -> None:
+        team = self.teams.get(run.team)
+        if team is None:
+            team = self.teams[run.team] = _Team(run.org, self.team_weights.get(run.team, 1.0))
+        priority = -run.priority if self.mode == "fair_share" else 0
+        heapq.heappush(team.queues.setdefault(tuple(run.pools), []), [priority, next(self._seq), run])
+        team.queued += 1
+
+    def _runnable(self, pools: Tuple[str, ...], now: float) -> bool:
+        return all(self.pools[p].can_start(now) for p in pools if p in self.pools)
+
+    def _best_head(self, team: _Team, now: float, runnable: Dict) -> Optional[List]:
+        """Head of the team's best runnable pool-set heap; `runnable` caches checks within one pick."""
+        best = None
+        for pools, heap in team.queues.items():
+            if not heap or (best is not None and heap[0][:2] >= best[0][:2]):
+                continue
+            ok = runnable.get(pools)
+            if ok is None:
+                ok = runnable[pools] = self._runnable(pools, now)
+            if ok:
+                best = (heap[0], heap)
+        return best
+
+    def _take(self, team: _Team, best) -> QueuedRun:
+        entry, heap = best
+        heapq.heappop(heap)
+        team.queued -= 1
+        return entry[2]
+
+    def _pop_runnable(self, team: _Team, now: float, runnable: Dict = None) -> Optional[QueuedRun]:
+        """Best run of the team whose pools have capacity; blocked runs stay queued."""
+        best = self._best_head(team, now, {} if runnable is None else runnable)
+        return self._take(team, best) if best is not None else None
+
+    def _org_load(self) -> Dict[str, Tuple[float, float]]:
+        load: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0.0])
+        for team in self.teams.values():
+            load[team.org][0] += team.running
+            load[team.org][1] += team.started_work
+        weight = self.org_weights
+        return {org: (r / weight.get(org, 1.0), w / weight.get(org, 1.0)) for org, (r, w) in load.items()}
+
+    def _fair_order(self) -> List[str]:
+        org_load = self._org_load()
+
+        def key(name):
+            team = self.teams[name]
+            return (*org_load[team.org], team.running / team.weight, team.started_work / team.weight, team.oldest())
+
+        return sorted((n for n, t in self.teams.items() if t.queued), key=key)
+
+    def _start(self, run: QueuedRun, now: float) -> None:
+        team = self.teams[run.team]
+        team.running += 1
+        team.started_work += 1
+        for p in run.pools:
+            pool = self.pools.get(p)
+            if pool is not None:
+                pool.running += 1
+                if pool.bucket is not None:
+                    pool.bucket.take(now)
+        run.started_at = now
+        self.running[run.run_id] = run
+        self.latencies[run.team].append(now - run.submitted_at)
+
+    def dequeue(self, now: float) -> List[QueuedRun]:
+        """Starts as many queued runs as slots and pools allow; returns them."""
+        started = []
+        while len(self.running) < self.max_concurrent:
+            run = self._next_fifo(now) if self.mode == "fifo" else self._next_fair(now)
+            if run is None:
+                break
+            self._start(run, now)
+            started.append(run)
+        return started
+
+    def _next_fair(self, now: float) -> Optional[QueuedRun]:
+        runnable = {}
+        for name in self._fair_order():
+            run = self._pop_runnable(self.teams[name], now, runnable)
+            if run is not None:
+                return run
+        return None
+
+    def _next_fifo(self, now: float) -> Optional[QueuedRun]:
+        # Oldest runnable run overall, like the default QueuedRunCoordinator
+        runnable, best, best_team = {}, None, None
+        for team in self.teams.values():
+            head = self._best_head(team, now, runnable)
+            if head is not None and (best is None or head[0][1] < best[0][1]):
+                best, best_team = head, team
+        return self._take(best_team, best) if best is not None else None
+
+    def finish(self, run_id: str) -> None:
+        run = self.running.pop(run_id)
+        self.teams[run.team].running -= 1
+        for p in run.pools:
+            pool = self.pools.get(p)
+            if pool is not None:
+                pool.running -= 1
+
+    def next_wakeup(self, now: float) -> Optional[float]:
+        """Earliest time a rate-limited pool gets a token, for the daemon's sleep."""
+        times = [p.bucket.next_token_at(now) for p in self.pools.values() if p.bucket is not None]
+        later = [t for t in times if t > now]
+        return min(later) if later else None
+
+    def latency_percentiles(self) -> Dict[str, Dict[str, float]]:
+        """Queue latency (start - submit) percentiles per team."""
+        return {team: percentiles(values) for team, values in sorted(self.latencies.items())}
+
+
+# ---------------------------------------------------------------------------
+# Building runs from YAML
+# ---------------------------------------------------------------------------
+
+def pools_from_configs(configs: Iterable[Mapping], pool_specs: Mapping[str, Mapping] = None) -> Tuple[Dict, Dict]:
+    """
+    (pools, job_pools): pool specs for every `concurrency_key` and job
+    `concurrency.limit`, and the pools each job's runs hold.
+
+    `concurrency_key` pools are uncapped unless `pool_specs` gives a limit or
+    rate, since their per-asset limit lives in Dagster's instance config.
+    """
+    configs = list(configs)
+    asset_pools = {}
+    for config in configs:
+        for asset in config.get("assets") or []:
+            if asset.get("concurrency_key"):
+                asset_pools[asset["name"]] = asset["concurrency_key"]
+    pools = {name: dict(spec) for name, spec in (pool_specs or {}).items()}
+    job_pools = {}
+    for config in configs:
+        for job in config.get("jobs") or []:
+            held = set()
+            selection = job.get("selection") or []
+            for item in [selection] if isinstance(selection, str) else selection:
+                key = item.get("key") if isinstance(item, Mapping) else item
+                if isinstance(key, str) and key.strip("*+") in asset_pools:
+                    held.add(asset_pools[key.strip("*+")])
+            limit = (job.get("concurrency") or {}).get("limit")
+            if limit:
+                pools.setdefault(f"job:{job['name']}", {})["limit"] = int(limit)
+                held.add(f"job:{job['name']}")
+            for pool in held:
+                pools.setdefault(pool, {})
+            job_pools[job["name"]] = tuple(sorted(held))
+    return pools, job_pools
+
+
+def make_run(run_id: str, job: Mapping, tags: Mapping = None, metadata: Mapping = None,
+             job_pools: Mapping[str, Tuple[str, ...]] = None, submitted_at: float = 0.0,
+             duration: float = 1.0) -> QueuedRun:
+    """QueuedRun for a job; run tags override job tags, which override metadata.yaml."""
+    merged = {**(metadata or {}), **(job.get("tags") or {}), **(tags or {})}
+    team = str(merged.get("team") or DEFAULT_TEAM)
+    return QueuedRun(
+        run_id=run_id,
+        job=job["name"],
+        team=team,
+        org=str(merged.get("org") or team),
+        priority=parse_priority(merged.get("priority")),
+        pools=tuple((job_pools or {}).get(job["name"], ())),
+        submitted_at=submitted_at,
+        duration=duration,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Simulation
+# ---------------------------------------------------------------------------
+
+def simulate(queue: FairShareQueue, runs: Iterable[QueuedRun],
+             on_start: Callable[[QueuedRun, FairShareQueue], None] = None) -> Dict:
+    """
+    Replays arrivals (run.submitted_at) and run durations through `queue`.
+
+    Returns makespan, per-team latency percentiles and the peak concurrent
+    runs seen per pool. `on_start` is called after each start, for checks.
+    """
+    arrivals = sorted(runs, key=lambda r: r.submitted_at)
+    events: List[Tuple[float, int, str]] = []  # (end_time, seq, run_id)
+    seq = itertools.count()
+    peak: Dict[str, int] = defaultdict(int)
+    clock = 0.0
+    i = 0
+    while i < len(arrivals) or len(queue) or events:
+        while i < len(arrivals) and arrivals[i].submitted_at <= clock:
+            queue.submit(arrivals[i])
+            i += 1
+        for run in queue.dequeue(clock):
+            heapq.heappush(events, (clock + run.duration, next(seq), run.run_id))
+            for p in run.pools:
+                if p in queue.pools:
+                    peak[p] = max(peak[p], queue.pools[p].running)
+            if on_start is not None:
+                on_start(run, queue)
+        candidates = []
+        if events:
+            candidates.append(events[0][0])
+        if i < len(arrivals):
+            candidates.append(arrivals[i].submitted_at)
+        wakeup = queue.next_wakeup(clock)
+        if wakeup is not None and len(queue):
+            candidates.append(wakeup)
+        if not candidates:
+            if len(queue):
+                raise RuntimeError("Deadlock: runs are queued but no pool can ever start them")
+            break
+        clock = max(clock, min(candidates))
+        while events and events[0][0] <= clock:
+            _, _, run_id = heapq.heappop(events)
+            queue.finish(run_id)
+    return {
+        "mode": queue.mode,
+        "makespan": clock,
+        "latency": queue.latency_percentiles(),
+        "pool_peak": dict(peak),
+    }
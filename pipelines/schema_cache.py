@@ -0,0 +1,210 @@
+"""
+Schema inference cache for S3/SQL -> Snowflake loads.
+
+Loads using `schema_strategy: create/evolve/strict`, `auto_create_table`,
+`add_new_columns` or `type_mismatch_failure` need the inferred source schema,
+the current target DDL and the column mapping before every COPY. Sampling the
+source and describing the table through INFORMATION_SCHEMA on every run is
+wasted work when nothing changed, so the results are cached per
+(target database.schema.table, column_match_config, source fingerprint).
+
+An entry is reused only while:
+  - the source fingerprint matches (CSV header / Parquet footer hash), and
+  - the table's DDL version matches: LAST_DDL from a single
+    INFORMATION_SCHEMA.TABLES lookup (ddl_version()), much cheaper than
+    describing columns.
+    (LAST_ALTERED also moves on every COPY/MERGE, so it would miss on every
+    run.)
+"""
+import hashlib
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from pipelines.json_store import JsonFileStore
+
+DEFAULT_CACHE_PATH = Path(".nexus_cache") / "schema_cache.json"
+
+COLUMN_NAME_MATCH = "column_name_match"
+TARGET_COLUMN_ORDER = "target_column_order"
+
+# One-row lookup used as the DDL version; replaces a full column describe.
+# {tables} is INFORMATION_SCHEMA.TABLES, qualified with the database when one
+# is given (an unqualified one only sees the current database). Parameters:
+# schema (NULL for the session's current one), table. Both are upper-cased,
+# as Snowflake stores unquoted identifiers.
+DDL_VERSION_SQL = (
+    "SELECT TO_VARCHAR(LAST_DDL) FROM {tables} "
+    "WHERE TABLE_SCHEMA = COALESCE(UPPER(%s), CURRENT_SCHEMA()) AND TABLE_NAME = UPPER(%s)"
+)
+
+
+def _quote_identifier(name: str) -> str:
+    return '"' + name.upper().replace('"', '""') + '"'
+
+
+def ddl_version_query(table_name: str, database: Optional[str] = None,
+                      schema: Optional[str] = None) -> Tuple[str, Tuple]:
+    """(sql, params) for the DDL version of a table; see ddl_version()."""
+    tables = "INFORMATION_SCHEMA.TABLES"
+    if database:
+        tables = f"{_quote_identifier(database)}.{tables}"
+    return DDL_VERSION_SQL.format(tables=tables), (schema, table_name)
+
+
+def ddl_version(cursor, table_name: str, database: Optional[str] = None, schema: Optional[str] = None) -> str:
+    """
+    The table's LAST_DDL as a string, from a DB-API cursor on Snowflake.
+    "" when the table does not exist (yet), so creating it invalidates too.
+    """
+    cursor.execute(*ddl_version_query(table_name, database, schema))
+    row = cursor.fetchone()
+    return "" if row is None or row[0] is None else str(row[0])
+
+
+def csv_fingerprint(header_line, delimiter: str = ",") -> str:
+    """Fingerprint of a CSV source: the normalized header row."""
+    if isinstance(header_line, bytes):
+        header_line = header_line.decode("utf-8-sig")
+    columns = [c.strip() for c in header_line.strip().lstrip("\ufeff").split(delimiter)]
+    return "csv:" + hashlib.sha256("\x1f".join(columns).encode("utf-8")).hexdigest()
+
+
+def parquet_fingerprint(footer_bytes: bytes) -> str:
+    """
+    Fingerprint of a Parquet source from its footer.
+
+    Callers pass the trailing bytes of the object (a ranged GET of the last
+    64KB is plenty), so no data pages are read.
+    """
+    return "parquet:" + hashlib.sha256(footer_bytes).hexdigest()
+
+
+def build_column_mapping(
+    source_columns: Sequence[str],
+    target_columns: Sequence[str],
+    mode: str = COLUMN_NAME_MATCH,
+) -> Dict[str, Optional[str]]:
+    """
+    Maps each source column to a target column (or None when it has no match).
+
+    column_name_match is case-insensitive, as Snowflake upper-cases unquoted
+    identifiers; target_column_order maps by position.
+    """
+    if mode == TARGET_COLUMN_ORDER:
+        return {
+            src: (target_columns[i] if i < len(target_columns) else None)
+            for i, src in enumerate(source_columns)
+        }
+    if mode != COLUMN_NAME_MATCH:
+        raise ValueError(f"Unknown column_match_config: {mode}")
+    by_upper = {t.upper(): t for t in target_columns}
+    return {src: by_upper.get(src.upper()) for src in source_columns}
+
+
+class SchemaCache:
+    """
+    JSON-file backed cache, shared by all assets in a code location.
+
+    The file is small (one entry per source layout and table); see
+    pipelines.json_store for how it is read and how concurrent runs merge.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = Path(path)
+        self._store = JsonFileStore(self.path)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _table(table_name: str, database: Optional[str], schema: Optional[str]) -> str:
+        return ".".join(part.upper() for part in (database or "", schema or "", table_name))
+
+    def _key(self, fingerprint: str, table_name: str, database: Optional[str], schema: Optional[str],
+             column_match: str) -> str:
+        return f"{self._table(table_name, database, schema)}|{column_match}|{fingerprint}"
+
+    def get(self, fingerprint: str, table_name: str, ddl_version: str, database: Optional[str] = None,
+            schema: Optional[str] = None, column_match: str = COLUMN_NAME_MATCH) -> Optional[Dict]:
+        entry = self._store.read().get(self._key(fingerprint, table_name, database, schema, column_match))
+        with self._lock:
+            if entry is None or entry["ddl_version"] != str(ddl_version):
+                self.misses += 1
+                return None
+            self.hits += 1
+        return entry
+
+    def put(
+        self,
+        fingerprint: str,
+        table_name: str,
+        ddl_version: str,
+        source_schema: List[Dict],
+        target_ddl: str,
+        column_mapping: Dict[str, Optional[str]],
+        database: Optional[str] = None,
+        schema: Optional[str] = None,
+        column_match: str = COLUMN_NAME_MATCH,
+    ) -> Dict:
+        entry = {
+            "fingerprint": fingerprint,
+            "table_name": table_name,
+            "table": self._table(table_name, database, schema),
+            "column_match": column_match,
+            "ddl_version": str(ddl_version),
+            "source_schema": source_schema,
+            "target_ddl": target_ddl,
+            "column_mapping": column_mapping,
+            "updated_at": time.time(),
+        }
+        key = self._key(fingerprint, table_name, database, schema, column_match)
+        self._store.update(lambda entries: entries.__setitem__(key, entry))
+        return entry
+
+    def invalidate_table(self, table_name: str, database: Optional[str] = None,
+                         schema: Optional[str] = None) -> int:
+        """Drops every entry for a table, e.g. after schema_strategy: evolve altered it."""
+        prefix = f"{self._table(table_name, database, schema)}|"
+
+        def drop(entries: Dict[str, Dict]) -> int:
+            stale = [k for k in entries if k.startswith(prefix)]
+            for k in stale:
+                del entries[k]
+            return len(stale)
+
+        return self._store.update(drop)
+
+    def get_or_resolve(
+        self,
+        fingerprint: str,
+        table_name: str,
+        ddl_version: str,
+        resolve: Callable[[], Dict],
+        database: Optional[str] = None,
+        schema: Optional[str] = None,
+        column_match: str = COLUMN_NAME_MATCH,
+    ) -> Dict:
+        """
+        Returns the cached entry, or calls `resolve()` and stores its result.
+
+        `resolve` does the expensive work (sample the source, describe the
+        table) and returns a dict with source_schema, target_ddl and
+        column_mapping. It is only called on a miss.
+        """
+        entry = self.get(fingerprint, table_name, ddl_version, database, schema, column_match)
+        if entry is not None:
+            return entry
+        resolved = resolve()
+        return self.put(
+            fingerprint,
+            table_name,
+            ddl_version,
+            resolved["source_schema"],
+            resolved["target_ddl"],
+            resolved["column_mapping"],
+            database,
+            schema,
+            column_match,
+        )
@@ -0,0 +1,200 @@
+"""
+Precomputed asset-selection index for YAML jobs, sensors and schedules.
+
+The factory turns every `selection:` into an AssetSelection (keys(...),
+.downstream(), groups(...), unions) and Dagster resolves each one against the
+full asset graph. With thousands of assets and jobs that is one graph
+traversal per selection item per job at every definitions load.
+
+SelectionIndex is built once per definitions build from the parsed YAMLs:
+
+  - group -> keys, tag (k and k=v) -> keys
+  - upstream / downstream closure per key
+
+Keys are numbered in declaration order and every set is a Python int used as
+a bitset, so a closure is computed once (one pass in topological order) and
+a union of selection items is a handful of ORs. resolve() accepts every form
+the factory accepts:
+
+    selection: "*"
+    selection: "group:big_showcase"
+    selection: [sales_ingestion_asset, "marketing_ingestion_asset*", "*sales_transformed_asset"]
+    selection:
+      - key: sales_ingestion_asset*
+      - group: marketing_pipeline
+      - tag: "domain=sales"
+
+`name*` / `name+` select the asset and everything downstream (as the
+factory's job_factory does), `*name` the asset and everything upstream.
+"""
+from typing import Dict, Iterable, List, Mapping, Union
+
+from pipelines.scheduler import upstream_of
+
+Selection = Union[str, Mapping, Iterable]
+
+
+def _bits(mask: int) -> List[int]:
+    """Positions of the set bits, ascending; linear in the width of the mask."""
+    digits = bin(mask)[:1:-1]
+    positions = []
+    i = digits.find("1")
+    while i >= 0:
+        positions.append(i)
+        i = digits.find("1", i + 1)
+    return positions
+
+
+class SelectionIndex:
+    def __init__(self, assets: Iterable[Mapping]):
+        self.keys: List[str] = []
+        self.position: Dict[str, int] = {}
+        self.groups: Dict[str, int] = {}
+        self.tags: Dict[str, int] = {}
+        upstream: Dict[str, set] = {}
+        for asset in assets:
+            name = asset["name"]
+            if name in self.position:
+                raise ValueError(f"Duplicate asset key '{name}'")
+            bit = 1 << len(self.keys)
+            self.position[name] = len(self.keys)
+            self.keys.append(name)
+            group = asset.get("group") or asset.get("group_name") or "default"
+            self.groups[group] = self.groups.get(group, 0) | bit
+            for k, v in (asset.get("tags") or {}).items():
+                for tag in (k, f"{k}={v}"):
+                    self.tags[tag] = self.tags.get(tag, 0) | bit
+            upstream[name] = upstream_of(asset)
+
+        # Edges to assets defined outside these configs (external/observable
+        # sources) do not contribute to closures
+        self._parents: List[List[int]] = [
+            [self.position[u] for u in upstream[name] if u in self.position] for name in self.keys
+        ]
+        self._children: List[List[int]] = [[] for _ in self.keys]
+        for i, parents in enumerate(self._parents):
+            for p in parents:
+                self._children[p].append(i)
+        self.all = (1 << len(self.keys)) - 1
+        order = self._topological_order()
+        self.upstream_closure = self._closure(self._parents, order)
+        self.downstream_closure = self._closure(self._children, order[::-1])
+        self._cache: Dict[str, int] = {}
+
+    @classmethod
+    def from_configs(cls, configs: Iterable[Mapping]) -> "SelectionIndex":
+        return cls(asset for config in configs for asset in (config.get("assets") or []))
+
+    def _topological_order(self) -> List[int]:
+        """Parents before children (Kahn); raises on a cycle."""
+        indegree = [len(p) for p in self._parents]
+        order = [i for i, d in enumerate(indegree) if d == 0]
+        for i in order:
+            for c in self._children[i]:
+                indegree[c] -= 1
+                if indegree[c] == 0:
+                    order.append(c)
+        if len(order) != len(self.keys):
+            stuck = [self.keys[i] for i, d in enumerate(indegree) if d]
+            raise ValueError(f"Cycle detected among assets: {', '.join(sorted(stuck)[:5])}")
+        return order
+
+    @staticmethod
+    def _closure(edges: List[List[int]], order: List[int]) -> List[int]:
+        """closure[i] = bit(i) | closure of each neighbour; `order` visits neighbours first."""
+        closure = [0] * len(edges)
+        for i in order:
+            mask = 1 << i
+            for j in edges[i]:
+                mask |= closure[j]
+            closure[i] = mask
+        return closure
+
+    # -- resolution ----------------------------------------------------------
+
+    def _position(self, name: str) -> int:
+        try:
+            return self.position[name]
+        except KeyError:
+            raise ValueError(f"Selection references unknown asset '{name}'") from None
+
+    def _item(self, item: str) -> int:
+        item = item.strip()
+        if item == "*":
+            return self.all
+        downstream = item.endswith("*") or item.endswith("+")
+        upstream = item.startswith("*")
+        core = item.strip("*+")
+        kind, sep, value = core.partition(":")
+        if not sep:
+            kind, value = "key", core
+        if kind == "key":
+            i = self._position(value)
+            mask = 1 << i
+            if downstream:
+                mask |= self.downstream_closure[i]
+            if upstream:
+                mask |= self.upstream_closure[i]
+            return mask
+        if kind == "group":
+            mask = self.groups.get(value, 0)
+        elif kind == "tag":
+            mask = self.tags.get(value, 0)
+        else:
+            raise ValueError(f"Unsupported selection '{item}'")
+        if downstream or upstream:
+            mask = self._expand(mask, downstream, upstream)
+        return mask
+
+    def _expand(self, mask: int, downstream: bool, upstream: bool) -> int:
+        result = mask
+        for i in _bits(mask):
+            if downstream:
+                result |= self.downstream_closure[i]
+            if upstream:
+                result |= self.upstream_closure[i]
+        return result
+
+    def _items(self, selection: Selection) -> List[str]:
+        if isinstance(selection, str):
+            return [selection]
+        if isinstance(selection, Mapping):
+            if "key" in selection:
+                return [str(selection["key"])]
+            return [f"{kind}:{value}" for kind, value in selection.items()]
+        items = []
+        for entry in selection:
+            items.extend(self._items(entry))
+        return items
+
+    def mask(self, selection: Selection) -> int:
+        """Bitset of the selected keys; each distinct item is resolved once per index."""
+        result = 0
+        for item in self._items(selection):
+            bits = self._cache.get(item)
+            if bits is None:
+                bits = self._cache[item] = self._item(item)
+            result |= bits
+        return result
+
+    def resolve(self, selection: Selection) -> List[str]:
+        """Selected asset keys in declaration order."""
+        keys = self.keys
+        return [keys[i] for i in _bits(self.mask(selection))]
+
+    def resolve_jobs(self, configs: Iterable[Mapping]) -> Dict[str, List[str]]:
+        """
+        job name -> selected keys, for every job across the configs. Sensors
+        and schedules target jobs by name, so they reuse these results.
+        """
+        return {
+            job["name"]: self.resolve(job.get("selection") or [])
+            for config in configs
+            for job in (config.get("jobs") or [])
+        }
+
+    def to_asset_selection(self, selection: Selection):
+        """Dagster AssetSelection over the resolved keys, so Dagster need not traverse the graph."""
+        from dagster import AssetSelection
+
+        return AssetSelection.assets(*self.resolve(selection))
@@ -0,0 +1,256 @@
+"""
+Snapshot-based SFTP sensor state.
+
+`sftp_watcher` (incremental_sftp_test.yaml, `check_is_modifying: true`) lists
+the directory and then re-stats candidates after a pause to see whether they
+are still growing: one round trip per file per tick, plus the sleep.
+
+Here each tick makes one listing (paramiko's listdir_iter pipelines the
+READDIR pages; listdir_attr is the fallback) and diffs it against the
+snapshot carried in the sensor cursor from the previous tick:
+
+  - a file is *stable* once its (size, mtime) is unchanged across
+    `stable_ticks` successive snapshots, so the sensor interval replaces the
+    sleep-and-restat;
+  - a stable file is *ready* (yields a RunRequest) once per (size, mtime);
+    a rewrite with a new size or mtime makes it ready again;
+  - at most `max_ready_per_tick` files are released per tick and the rest
+    carry over, so a 100k-file backlog drains in pages.
+
+The snapshot lives in the Dagster cursor (gzip'd, base64'd JSON), so it is
+stored by the instance and survives daemon restarts and new containers.
+tick() returns the new cursor next to the ready files; the sensor returns
+both in one SensorResult, so the cursor only advances together with the
+RunRequests. If a tick fails, the next one starts from the old cursor and
+re-emits the same files, and run_key() makes Dagster skip the ones already
+launched.
+
+    def sftp_sensor(context):
+        result, cursor = tick(sftp, path, pattern, predicate, cursor=context.cursor)
+        return sensor_result(result, "sftp_multi_pattern_job", cursor)
+"""
+import base64
+import gzip
+import json
+import operator
+import os
+import re
+import stat
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_READ_AHEADS = 50
+CURSOR_VERSION = "snap1:"
+
+# name -> [size, mtime, unchanged_ticks, emitted_size, emitted_mtime]
+_SIZE, _MTIME, _UNCHANGED, _EMITTED_SIZE, _EMITTED_MTIME = range(5)
+
+
+def list_entries(sftp, path: str, pattern: Optional[str] = None,
+                 read_aheads: int = DEFAULT_READ_AHEADS) -> Iterator[Tuple[str, int, int]]:
+    """Yields (name, size, mtime) for regular files in one directory listing."""
+    regex = re.compile(pattern) if pattern else None
+    if hasattr(sftp, "listdir_iter"):
+        attrs = sftp.listdir_iter(path, read_aheads=read_aheads)
+    else:
+        attrs = sftp.listdir_attr(path)
+    for a in attrs:
+        if a.st_mode is not None and not stat.S_ISREG(a.st_mode):
+            continue
+        if regex and not regex.match(a.filename):
+            continue
+        yield a.filename, a.st_size or 0, int(a.st_mtime or 0)
+
+
+class LocalListing:
+    """listdir_attr stand-in over a local directory (os.scandir), for tests and benchmarks."""
+
+    class _Attr:
+        __slots__ = ("filename", "st_size", "st_mtime", "st_mode")
+
+        def __init__(self, entry):
+            st = entry.stat()
+            self.filename, self.st_size, self.st_mtime, self.st_mode = entry.name, st.st_size, st.st_mtime, st.st_mode
+
+    def listdir_attr(self, path: str):
+        with os.scandir(path) as it:
+            return [self._Attr(e) for e in it]
+
+
+@dataclass
+class TickResult:
+    tick: int
+    ready: List[Tuple[str, int, int]] = field(default_factory=list)
+    pending: int = 0          # seen but still changing (or not yet observed twice)
+    backlog: int = 0          # stable and ready but held back by max_ready_per_tick
+    added: int = 0
+    changed: int = 0
+    removed: int = 0
+    seconds: float = 0.0
+
+
+class SnapshotSensorState:
+    def __init__(self, cursor: Optional[str] = None, stable_ticks: int = 1,
+                 check_is_modifying: bool = True, max_ready_per_tick: Optional[int] = None):
+        self.stable_ticks = stable_ticks if check_is_modifying else 0
+        self.max_ready_per_tick = max_ready_per_tick
+        self.tick = 0
+        self.files: Dict[str, list] = {}
+        if cursor:
+            self._load(cursor)
+
+    def _load(self, cursor: str) -> None:
+        if not cursor.startswith(CURSOR_VERSION):
+            # A cursor from another sensor implementation: start over (run_key still dedups)
+            return
+        data = json.loads(gzip.decompress(base64.b64decode(cursor[len(CURSOR_VERSION):])))
+        self.tick = data.get("tick", 0)
+        self.files = data.get("files", {})
+
+    def to_cursor(self) -> str:
+        raw = json.dumps({"tick": self.tick, "files": self.files}, separators=(",", ":")).encode()
+        return CURSOR_VERSION + base64.b64encode(gzip.compress(raw, compresslevel=6)).decode("ascii")
+
+    def observe(self, entries: Iterable[Tuple[str, int, int]],
+                predicate: Callable[[str, int, int], bool] = None) -> TickResult:
+        """Diffs one listing against the snapshot and returns the files ready to process."""
+        self.tick += 1
+        result = TickResult(self.tick)
+        previous = self.files
+        current: Dict[str, list] = {}
+        ready = []
+
+        for name, size, mtime in entries:
+            old = previous.get(name)
+            if old is None:
+                result.added += 1
+                rec = [size, mtime, 0, None, None]
+            elif old[_SIZE] == size and old[_MTIME] == mtime:
+                rec = [size, mtime, old[_UNCHANGED] + 1, old[_EMITTED_SIZE], old[_EMITTED_MTIME]]
+            else:
+                result.changed += 1
+                rec = [size, mtime, 0, old[_EMITTED_SIZE], old[_EMITTED_MTIME]]
+            current[name] = rec
+
+            if rec[_UNCHANGED] < self.stable_ticks:
+                result.pending += 1
+                continue
+            if rec[_EMITTED_SIZE] == size and rec[_EMITTED_MTIME] == mtime:
+                continue
+            if predicate is not None and not predicate(name, size, mtime):
+                continue
+            ready.append((name, size, mtime))
+
+        result.removed = sum(1 for name in previous if name not in current)
+        ready.sort(key=lambda e: (e[2], e[0]))  # oldest first
+        if self.max_ready_per_tick is not None and len(ready) > self.max_ready_per_tick:
+            result.backlog = len(ready) - self.max_ready_per_tick
+            ready = ready[: self.max_ready_per_tick]
+        for name, size, mtime in ready:
+            current[name][_EMITTED_SIZE] = size
+            current[name][_EMITTED_MTIME] = mtime
+
+        self.files = current
+        result.ready = ready
+        return result
+
+
+_FIELDS = {
+    "file_name": 0, "file_size": 1, "file_mtime": 2,
+    "source.item.file_name": 0, "source.item.size": 1, "source.item.mtime": 2,
+}
+_OPS = {"==": operator.eq, "!=": operator.ne, ">=": operator.ge, "<=": operator.le,
+        ">": operator.gt, "<": operator.lt}
+_TOKEN = re.compile(r"""\s*(?:(?P<num>-?\d+(?:\.\d+)?)|(?P<str>'[^']*'|"[^"]*")|(?P<op>==|!=|>=|<=|>|<)"""
+                    r"""|(?P<word>[A-Za-z_][A-Za-z0-9_.]*))""")
+
+
+def _tokens(expression: str) -> List[Tuple[str, str]]:
+    tokens, pos = [], 0
+    expression = expression.strip()
+    while pos < len(expression):
+        m = _TOKEN.match(expression, pos)
+        if not m or m.end() == pos:
+            raise ValueError(f"Unsupported predicate syntax at '{expression[pos:]}' in '{expression}'")
+        tokens.append((m.lastgroup, m.group(m.lastgroup)))
+        pos = m.end()
+    return tokens
+
+
+def size_predicate(expression: str) -> Callable[[str, int, int], bool]:
+    """
+    Parses the YAML `predicate:` into comparisons of file_name / file_size /
+    file_mtime (or source.item.file_name / size / mtime) with literals,
+    joined by `and` / `or` ("file_size > 1048576", "source.item.size > 1024
+    and file_name != 'empty.csv'"). Nothing is evaluated as Python.
+    """
+    tokens = _tokens(expression)
+    clauses: List[List[Tuple[int, Callable, object]]] = [[]]   # or-of-ands
+    i = 0
+    while i < len(tokens):
+        if len(tokens) < i + 3:
+            raise ValueError(f"Incomplete comparison in predicate '{expression}'")
+        (k1, field_name), (k2, op), (k3, literal) = tokens[i:i + 3]
+        if k1 != "word" or field_name not in _FIELDS:
+            raise ValueError(f"Unknown field '{field_name}' in predicate '{expression}' (have: {', '.join(_FIELDS)})")
+        if k2 != "op":
+            raise ValueError(f"Expected a comparison after '{field_name}' in predicate '{expression}'")
+        if k3 == "num":
+            value = float(literal)
+        elif k3 == "str":
+            value = literal[1:-1]
+        else:
+            raise ValueError(f"Expected a number or quoted string, got '{literal}' in predicate '{expression}'")
+        clauses[-1].append((_FIELDS[field_name], _OPS[op], value))
+        i += 3
+        if i < len(tokens):
+            joiner = tokens[i][1].lower()
+            if tokens[i][0] != "word" or joiner not in ("and", "or"):
+                raise ValueError(f"Expected 'and'/'or', got '{tokens[i][1]}' in predicate '{expression}'")
+            if joiner == "or":
+                clauses.append([])
+            i += 1
+            if i == len(tokens):
+                raise ValueError(f"Predicate '{expression}' ends with '{joiner}'")
+
+    def check(name, size, mtime):
+        item = (name, size, mtime)
+        return any(all(op(item[idx], value) for idx, op, value in clause) for clause in clauses)
+
+    return check
+
+
+def run_key(name: str, size: int, mtime: int) -> str:
+    """Dedup key for one version of a file; a re-emitted file gets the same key and is skipped."""
+    return f"{name}:{size}:{mtime}"
+
+
+def tick(sftp, path: str, pattern: Optional[str] = None, predicate: Optional[str] = None,
+         cursor: Optional[str] = None, check_is_modifying: bool = True,
+         max_ready_per_tick: Optional[int] = None) -> Tuple[TickResult, str]:
+    """
+    One sensor evaluation: list once, diff against the cursor's snapshot.
+    Returns the ready files and the cursor to commit with their RunRequests.
+    """
+    started = time.perf_counter()
+    state = SnapshotSensorState(cursor, check_is_modifying=check_is_modifying,
+                                max_ready_per_tick=max_ready_per_tick)
+    result = state.observe(list_entries(sftp, path, pattern), size_predicate(predicate) if predicate else None)
+    new_cursor = state.to_cursor()
+    result.seconds = time.perf_counter() - started
+    return result, new_cursor
+
+
+def sensor_result(result: TickResult, job_name: str, cursor: str, tags: Optional[Dict[str, str]] = None):
+    """SensorResult with one RunRequest per ready file and the new cursor, committed together."""
+    from dagster import RunRequest, SensorResult
+
+    return SensorResult(
+        run_requests=[
+            RunRequest(run_key=run_key(name, size, mtime), job_name=job_name,
+                       tags={**(tags or {}), "nexus/file_name": name})
+            for name, size, mtime in result.ready
+        ],
+        cursor=cursor,
+    )
@@ -0,0 +1,271 @@
+"""
+Memory-mapped local staging for spills before upload.
+
+Compressing before a Snowflake PUT or converting before an S3 upload needs a
+local copy. Reading that copy back into Python bytes and slicing it into
+multipart bodies holds the whole object in memory and copies every byte
+twice. A StagingArea instead:
+
+  - streams encoder/decompressor output to disk through one reusable buffer
+    (copy_from() uses readinto, so the source fills the buffer directly);
+  - memory-maps the finished file and hands out memoryview slices as part
+    bodies, so part boundaries cost nothing and hashing (Content-MD5, ETag
+    checks) reads the page cache in place;
+  - keeps total staged bytes under a disk quota, evicting the least recently
+    used files that are not in use.
+
+Peak RSS is bounded by the copy buffer plus one part's mapped pages,
+independent of object size. Each StagedFile counts the bytes it copies
+in user space (`bytes_copied`) so copies per byte can be reported.
+"""
+import mmap
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+MB = 1024 * 1024
+DEFAULT_QUOTA_BYTES = 10 * 1024 * MB
+COPY_BUFFER_BYTES = 1 * MB
+
+
+class StagingQuotaError(RuntimeError):
+    pass
+
+
+class StagedFile:
+    def __init__(self, area: "StagingArea", name: str, path: Path):
+        self.area = area
+        self.name = name
+        self.path = path
+        self.size = path.stat().st_size if path.exists() else 0
+        self.pins = 0
+        self.bytes_copied = 0
+        self._fh = None
+        self._mm = None
+        self._views = []
+
+    # -- writing ------------------------------------------------------------
+
+    def write(self, chunk) -> int:
+        """Appends encoder output (bytes or memoryview) without re-buffering it."""
+        if self._fh is None:
+            self._fh = open(self.path, "ab")
+        n = len(chunk)
+        self.area._reserve(self, n)
+        self._fh.write(chunk)
+        self.size += n
+        return n
+
+    def copy_from(self, stream, buffer_bytes: int = COPY_BUFFER_BYTES) -> int:
+        """Streams a file-like (e.g. gzip.GzipFile) in through one reusable buffer."""
+        buf = bytearray(buffer_bytes)
+        view = memoryview(buf)
+        total = 0
+        readinto = getattr(stream, "readinto", None)
+        while True:
+            if readinto is not None:
+                n = readinto(view)
+                chunk = view[:n]
+            else:
+                chunk = stream.read(buffer_bytes)
+                n = len(chunk)
+            if not n:
+                break
+            self.bytes_copied += n
+            self.write(chunk)
+            total += n
+        return total
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        self.area._unpin(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -- reading ------------------------------------------------------------
+
+    @contextmanager
+    def mapped(self) -> Iterator[memoryview]:
+        """
+        Read-only memoryview over the whole file; the file is pinned while mapped.
+
+        The view and every part from parts() are released when the block
+        exits, and using them afterwards raises ValueError: copy (bytes())
+        anything that must outlive the block. A buffer exported from a part
+        (e.g. memoryview(part), numpy.frombuffer) that is still alive keeps
+        the mapping open until it is garbage-collected.
+        """
+        self.area._pin(self)
+        try:
+            if self.size == 0:
+                yield memoryview(b"")
+                return
+            with open(self.path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mm = mm
+            view = memoryview(mm)
+            try:
+                yield view
+            finally:
+                self._mm = None
+                views, self._views = self._views + [view], []
+                for v in views:
+                    try:
+                        v.release()
+                    except BufferError:
+                        pass  # exported by the caller: freed with that export
+                try:
+                    mm.close()
+                except BufferError:
+                    pass  # the mmap closes itself once the last export is gone
+        finally:
+            self.area._unpin(self)
+
+    def parts(self, view: memoryview, part_bytes: int) -> Iterator[memoryview]:
+        """
+        Zero-copy multipart bodies over a mapped() view.
+
+        Once the caller asks for the next part, the previous part's pages are
+        dropped from this process (they stay in the page cache), so mapped
+        pages do not accumulate in RSS as the upload progresses.
+        """
+        can_drop = (
+            self._mm is not None
+            and hasattr(mmap, "MADV_DONTNEED")
+            and part_bytes % mmap.PAGESIZE == 0
+        )
+        for start in range(0, len(view), part_bytes):
+            part = view[start:start + part_bytes]
+            if self._mm is not None:
+                self._views.append(part)
+            yield part
+            if can_drop:
+                self._mm.madvise(mmap.MADV_DONTNEED, start, min(part_bytes, len(view) - start))
+
+    def body(self, part: memoryview) -> "ViewBody":
+        """File-like wrapper for clients that need .read(), e.g. boto3 upload_part."""
+        return ViewBody(part, self)
+
+
+class ViewBody:
+    """
+    Read-only file-like over a memoryview.
+
+    readinto() fills the caller's buffer directly; read() has to materialize
+    bytes and is counted against the staged file's bytes_copied.
+    """
+
+    def __init__(self, view: memoryview, owner: Optional[StagedFile] = None):
+        self.view = view
+        self.owner = owner
+        self.pos = 0
+
+    def __len__(self):
+        return len(self.view)
+
+    def readinto(self, buf) -> int:
+        n = min(len(buf), len(self.view) - self.pos)
+        buf[:n] = self.view[self.pos:self.pos + n]
+        self.pos += n
+        return n
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self.view) if size is None or size < 0 else min(len(self.view), self.pos + size)
+        data = bytes(self.view[self.pos:end])
+        self.pos = end
+        if self.owner is not None:
+            self.owner.bytes_copied += len(data)
+        return data
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        base = {0: 0, 1: self.pos, 2: len(self.view)}[whence]
+        self.pos = max(0, min(len(self.view), base + offset))
+        return self.pos
+
+    def tell(self) -> int:
+        return self.pos
+
+
+class StagingArea:
+    """A directory of staged files bounded by `quota_bytes`, evicted LRU-first."""
+
+    def __init__(self, root, quota_bytes: int = DEFAULT_QUOTA_BYTES):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.quota_bytes = quota_bytes
+        self._lock = threading.Lock()
+        self._files: "OrderedDict[str, StagedFile]" = OrderedDict()
+        # Files left by a previous process count against the quota, oldest first
+        for path in sorted(self.root.iterdir(), key=lambda p: p.stat().st_mtime):
+            if path.is_file():
+                self._files[path.name] = StagedFile(self, path.name, path)
+
+    @property
+    def used_bytes(self) -> int:
+        return sum(f.size for f in self._files.values())
+
+    def create(self, name: str) -> StagedFile:
+        """New staged file, pinned until close(); replaces any file with the same name."""
+        with self._lock:
+            old = self._files.pop(name, None)
+            if old is not None:
+                if old.pins:
+                    raise StagingQuotaError(f"Staged file '{name}' is in use")
+                old.path.unlink(missing_ok=True)
+            staged = StagedFile(self, name, self.root / name)
+            staged.path.write_bytes(b"")
+            staged.pins = 1
+            self._files[name] = staged
+            return staged
+
+    def get(self, name: str) -> Optional[StagedFile]:
+        with self._lock:
+            staged = self._files.get(name)
+            if staged is not None:
+                self._files.move_to_end(name)
+                os.utime(staged.path, (time.time(), time.time()))
+            return staged
+
+    def remove(self, name: str) -> None:
+        with self._lock:
+            staged = self._files.pop(name, None)
+            if staged is not None:
+                staged.path.unlink(missing_ok=True)
+
+    def _pin(self, staged: StagedFile) -> None:
+        with self._lock:
+            staged.pins += 1
+            self._files.move_to_end(staged.name)
+
+    def _unpin(self, staged: StagedFile) -> None:
+        with self._lock:
+            staged.pins = max(0, staged.pins - 1)
+
+    def _reserve(self, requester: StagedFile, n: int) -> None:
+        with self._lock:
+            used = sum(f.size for f in self._files.values())
+            if used + n <= self.quota_bytes:
+                return
+            for name in list(self._files):
+                staged = self._files[name]
+                if staged is requester or staged.pins:
+                    continue
+                del self._files[name]
+                staged.path.unlink(missing_ok=True)
+                used -= staged.size
+                if used + n <= self.quota_bytes:
+                    return
+            raise StagingQuotaError(
+                f"Staging quota of {self.quota_bytes / MB:.0f} MB exceeded writing '{requester.name}' "
+                f"({used / MB:.0f} MB held by files in use)"
+            )
@@ -0,0 +1,377 @@
+"""
+Inline data-quality checks computed while rows stream through a transfer.
+
+`observation_diff` checks compare counters after the fact; anything
+row-level would mean reading the data again. These check types are updated
+batch by batch on the rows the operator already has in hand and produce asset
+check results at the end, with no extra I/O:
+
+    checks:
+      - name: sales_row_count
+        type: row_count
+        min: 1
+      - name: customer_key_nulls
+        type: null_ratio
+        column: CustomerKey
+        threshold: 0.01                    # max allowed fraction of nulls
+      - name: unit_price_range
+        type: min_max
+        column: Unit Price
+        min: 0
+        max: 10000
+      - name: distinct_products
+        type: approx_distinct              # HyperLogLog, ~1.6% error at p=12
+        column: ProductKey
+        min: 100
+      - name: order_line_unique
+        type: unique_key
+        columns: [SalesOrderNumber, SalesOrderLineNumber]
+        method: bloom                      # or hll (cheaper, approximate)
+
+CsvTap is a file-like sink for raw CSV bytes (it can be one of the consumers
+of a handoff.TeeWriter); operators that already have parsed rows call
+StreamingChecks.observe() directly; None is counted as null and skipped by
+min_max, so rows straight from a DB-API cursor work as well.
+"""
+import abc
+import csv
+import hashlib
+import io
+import math
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+
+STREAMING_CHECK_TYPES = ("row_count", "null_ratio", "min_max", "approx_distinct", "unique_key")
+DEFAULT_NULL_VALUES = ("", "NULL", "null", "\\N")
+
+
+def _hash64(value) -> int:
+    # hash() is the identity for ints (and randomized for str across processes),
+    # which leaves HLL registers and Bloom probe steps degenerate
+    return int.from_bytes(hashlib.blake2b(repr(value).encode(), digest_size=8).digest(), "little")
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter over a 64-bit blake2b hash of repr(value)."""
+
+    def __init__(self, p: int = 12):
+        self.p = p
+        self.m = 1 << p
+        self.registers = bytearray(self.m)
+        self._shift = 64 - p
+        self._alpha = 0.7213 / (1 + 1.079 / self.m)
+
+    def add(self, value) -> None:
+        h = _hash64(value)
+        idx = h >> self._shift
+        rest = h & ((1 << self._shift) - 1)
+        rank = self._shift - rest.bit_length() + 1
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+
+    def count(self) -> int:
+        estimate = self._alpha * self.m * self.m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.m and zeros:
+            estimate = self.m * math.log(self.m / zeros)
+        return int(round(estimate))
+
+
+class ScalableBloomFilter:
+    """Bloom filter that adds a larger, tighter stage whenever the current one fills up."""
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 1e-6):
+        self.error_rate = error_rate
+        self.stages: List[List] = []  # [bits, m, k, capacity, count]
+        self._add_stage(capacity, error_rate / 2)
+
+    def _add_stage(self, capacity: int, error_rate: float) -> None:
+        m = max(64, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        k = max(1, int(round(m / capacity * math.log(2))))
+        self.stages.append([bytearray((m + 7) // 8), m, k, capacity, 0])
+
+    def add(self, value) -> bool:
+        """Adds `value`; returns True if it was (probably) already present."""
+        h = _hash64(value)
+        # An odd step never degenerates to 0
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        for bits, m, k, _, _ in self.stages:
+            # Enhanced double hashing (the step itself advances), so keys whose
+            # probe sequences are shifts of each other do not share k - 1 bits.
+            # Probes stop at the first clear bit, the common case for new keys.
+            p, step = h1 % m, h2 % m
+            for i in range(k):
+                if not bits[p >> 3] & (1 << (p & 7)):
+                    break
+                p = (p + step) % m
+                step = (step + i + 1) % m
+            else:
+                return True
+        stage = self.stages[-1]
+        if stage[4] >= stage[3]:
+            self._add_stage(stage[3] * 2, self.error_rate / (2 ** (len(self.stages) + 1)))
+            stage = self.stages[-1]
+        bits, m, k = stage[0], stage[1], stage[2]
+        p, step = h1 % m, h2 % m
+        for i in range(k):
+            bits[p >> 3] |= 1 << (p & 7)
+            p = (p + step) % m
+            step = (step + i + 1) % m
+        stage[4] += 1
+        return False
+
+
+class _Check(abc.ABC):
+    def __init__(self, config: Mapping, header: Sequence[str]):
+        self.name = config["name"]
+        self.config = config
+        self.severity = str(config.get("severity", "ERROR")).upper()
+
+    def _index(self, header, column):
+        try:
+            return list(header).index(column)
+        except ValueError:
+            raise ValueError(f"Check '{self.name}': column '{column}' not in header") from None
+
+    @abc.abstractmethod
+    def observe(self, rows: List[Sequence]) -> None:
+        ...
+
+    @abc.abstractmethod
+    def result(self) -> Dict:
+        ...
+
+
+class RowCountCheck(_Check):
+    def __init__(self, config, header):
+        super().__init__(config, header)
+        self.rows = 0
+
+    def observe(self, rows):
+        self.rows += len(rows)
+
+    def result(self):
+        lo, hi = self.config.get("min"), self.config.get("max")
+        passed = (lo is None or self.rows >= lo) and (hi is None or self.rows <= hi)
+        return {"passed": passed, "metadata": {"row_count": self.rows}}
+
+
+class NullRatioCheck(_Check):
+    def __init__(self, config, header):
+        super().__init__(config, header)
+        self.index = self._index(header, config["column"])
+        self.null_values = frozenset(config.get("null_values", DEFAULT_NULL_VALUES)) | {None}
+        self.rows = 0
+        self.nulls = 0
+
+    def observe(self, rows):
+        i, nulls = self.index, self.null_values
+        self.rows += len(rows)
+        self.nulls += sum(1 for r in rows if r[i] in nulls)
+
+    def result(self):
+        ratio = self.nulls / self.rows if self.rows else 0.0
+        return {
+            "passed": ratio <= float(self.config.get("threshold", 0.0)),
+            "metadata": {"null_count": self.nulls, "null_ratio": round(ratio, 6)},
+        }
+
+
+class MinMaxCheck(_Check):
+    def __init__(self, config, header):
+        super().__init__(config, header)
+        self.index = self._index(header, config["column"])
+        self.numeric = True
+        self.min = None
+        self.max = None
+
+    def observe(self, rows):
+        i = self.index
+        values = [r[i] for r in rows if r[i] is not None and r[i] != ""]
+        if not values:
+            return
+        if self.numeric:
+            try:
+                values = [float(v) for v in values]
+            except (TypeError, ValueError):
+                # Fall back to lexical comparison for non-numeric columns
+                self.numeric = False
+                self.min = None if self.min is None else str(self.min)
+                self.max = None if self.max is None else str(self.max)
+        if not self.numeric:
+            values = [str(v) for v in values]
+        lo, hi = min(values), max(values)
+        self.min = lo if self.min is None else min(self.min, lo)
+        self.max = hi if self.max is None else max(self.max, hi)
+
+    def result(self):
+        lo, hi = self.config.get("min"), self.config.get("max")
+        cast = float if self.numeric else str
+        passed = self.min is not None and (lo is None or self.min >= cast(lo)) and (hi is None or self.max <= cast(hi))
+        return {"passed": bool(passed), "metadata": {"min": self.min, "max": self.max}}
+
+
+class ApproxDistinctCheck(_Check):
+    def __init__(self, config, header):
+        super().__init__(config, header)
+        self.index = self._index(header, config["column"])
+        self.hll = HyperLogLog(int(config.get("precision", 12)))
+
+    def observe(self, rows):
+        i, add = self.index, self.hll.add
+        for r in rows:
+            add(r[i])
+
+    def result(self):
+        estimate = self.hll.count()
+        lo, hi = self.config.get("min"), self.config.get("max")
+        passed = (lo is None or estimate >= lo) and (hi is None or estimate <= hi)
+        return {"passed": passed, "metadata": {"approx_distinct": estimate}}
+
+
+class UniqueKeyCheck(_Check):
+    def __init__(self, config, header):
+        super().__init__(config, header)
+        columns = config.get("columns") or [config["column"]]
+        self.indexes = [self._index(header, c) for c in columns]
+        self.method = config.get("method", "bloom")
+        self.rows = 0
+        self.duplicates = 0
+        if self.method == "bloom":
+            self.bloom = ScalableBloomFilter(int(config.get("expected_rows", 1_000_000)))
+        elif self.method == "hll":
+            self.hll = HyperLogLog(int(config.get("precision", 14)))
+        else:
+            raise ValueError(f"Check '{self.name}': unknown unique_key method '{self.method}'")
+
+    def _keys(self, rows):
+        if len(self.indexes) == 1:
+            i = self.indexes[0]
+            return (r[i] for r in rows)
+        idx = self.indexes
+        return (tuple(r[i] for i in idx) for r in rows)
+
+    def observe(self, rows):
+        self.rows += len(rows)
+        if self.method == "bloom":
+            add = self.bloom.add
+            self.duplicates += sum(1 for key in self._keys(rows) if add(key))
+        else:
+            add = self.hll.add
+            for key in self._keys(rows):
+                add(key)
+
+    def result(self):
+        if self.method == "bloom":
+            return {
+                "passed": self.duplicates <= int(self.config.get("threshold", 0)),
+                "metadata": {"rows": self.rows, "possible_duplicates": self.duplicates},
+            }
+        distinct = self.hll.count()
+        # HLL cannot prove uniqueness; fail only beyond its standard error (3 sigma)
+        tolerance = 3 * 1.04 / math.sqrt(self.hll.m)
+        dup_ratio = max(0.0, 1 - distinct / self.rows) if self.rows else 0.0
+        return {
+            "passed": dup_ratio <= tolerance + float(self.config.get("threshold", 0.0)),
+            "metadata": {"rows": self.rows, "approx_distinct": distinct, "approx_duplicate_ratio": round(dup_ratio, 6)},
+        }
+
+
+_CHECKS = {
+    "row_count": RowCountCheck,
+    "null_ratio": NullRatioCheck,
+    "min_max": MinMaxCheck,
+    "approx_distinct": ApproxDistinctCheck,
+    "unique_key": UniqueKeyCheck,
+}
+
+
+class StreamingChecks:
+    def __init__(self, checks: List[_Check]):
+        self.checks = checks
+
+    @classmethod
+    def from_configs(cls, configs: Iterable[Mapping], header: Sequence[str]) -> "StreamingChecks":
+        """Builds the streaming checks from an asset's `checks:`; other types are left alone."""
+        header = [h.lstrip("\ufeff").strip() for h in header]
+        return cls([_CHECKS[c["type"]](c, header) for c in configs if c.get("type") in _CHECKS])
+
+    def observe(self, rows: List[Sequence[str]]) -> None:
+        for check in self.checks:
+            check.observe(rows)
+
+    def results(self) -> Dict[str, Dict]:
+        return {check.name: dict(check.result(), severity=check.severity) for check in self.checks}
+
+    def to_dagster_results(self, asset_key=None) -> List:
+        """AssetCheckResult objects to yield alongside the materialization."""
+        from dagster import AssetCheckResult, AssetCheckSeverity, MetadataValue
+
+        out = []
+        for name, result in self.results().items():
+            metadata = {k: MetadataValue.text(str(v)) if v is not None and not isinstance(v, (int, float)) else v
+                        for k, v in result["metadata"].items()}
+            out.append(AssetCheckResult(
+                check_name=name,
+                asset_key=asset_key,
+                passed=result["passed"],
+                metadata={k: v for k, v in metadata.items() if v is not None},
+                severity=getattr(AssetCheckSeverity, result["severity"], AssetCheckSeverity.ERROR),
+            ))
+        return out
+
+
+class CsvTap:
+    """
+    File-like sink for raw CSV bytes that feeds StreamingChecks.
+
+    Only complete records are parsed: a chunk is cut at the last newline
+    outside quotes and the remainder waits for the next write().
+    """
+
+    def __init__(self, configs: Iterable[Mapping], delimiter: str = ",", has_headers: bool = True,
+                 header: Optional[Sequence[str]] = None, encoding: str = "utf-8"):
+        self.configs = list(configs)
+        self.delimiter = delimiter
+        self.encoding = encoding
+        self.checks: Optional[StreamingChecks] = None
+        self._need_header = has_headers
+        self._header = header
+        self._carry = b""
+        self._carry_quotes = 0
+        if header is not None and not has_headers:
+            self.checks = StreamingChecks.from_configs(self.configs, header)
+
+    def _parse(self, data: bytes) -> None:
+        rows = list(csv.reader(io.StringIO(data.decode(self.encoding), newline=""), delimiter=self.delimiter))
+        if self._need_header and rows:
+            self._need_header = False
+            header = rows.pop(0)
+            self.checks = StreamingChecks.from_configs(self.configs, self._header or header)
+        if rows and self.checks is not None:
+            self.checks.observe([r for r in rows if r])
+
+    def write(self, chunk) -> int:
+        chunk = bytes(chunk)
+        quotes = self._carry_quotes + chunk.count(b'"')
+        cut = len(chunk)
+        # Walk back to the last newline with an even number of quotes before it
+        while True:
+            nl = chunk.rfind(b"\n", 0, cut)
+            if nl < 0:
+                self._carry += chunk
+                self._carry_quotes = quotes
+                return len(chunk)
+            quotes -= chunk.count(b'"', nl + 1, cut)
+            cut = nl
+            if quotes % 2 == 0:
+                break
+        self._parse(self._carry + chunk[:cut + 1])
+        self._carry = chunk[cut + 1:]
+        self._carry_quotes = self._carry.count(b'"')
+        return len(chunk)
+
+    def close(self) -> Dict[str, Dict]:
+        if self._carry.strip():
+            self._parse(self._carry)
+        self._carry = b""
+        return self.checks.results() if self.checks else {}
@@ -0,0 +1,61 @@
+"""
+Tests for adaptive batch sizing (pipelines/autotune.py)
+"""
+from pipelines.autotune import AIMDTuner, BatchSizing, TuningStore
+
+
+def _drive(tuner, seconds_for, batches=30):
+    for _ in range(batches):
+        tuner.record(tuner.value, seconds_for(tuner.value))
+    return tuner
+
+
+def test_tuner_grows_to_the_throughput_knee_and_settles():
+    # 5 ms per round trip plus 1 us per row, and per-row cost doubling past 80k rows
+    # (e.g. memory pressure): the best batch is around 80k
+    def seconds_for(n):
+        return 0.005 + n * (1e-6 if n <= 80_000 else 2e-6)
+
+    tuner = _drive(AIMDTuner("rows_chunk", start=10_000, minimum=1_000, maximum=500_000), seconds_for)
+    assert 40_000 <= tuner.best_value <= 80_000
+    assert tuner.backoffs >= 1
+    assert tuner.value <= 100_000
+
+
+def test_memory_budget_caps_batch_size():
+    tuner = AIMDTuner("rows_chunk", start=10_000, minimum=1_000, maximum=500_000, memory_budget=4_000_000)
+    for _ in range(20):
+        # 1 KB rows and per-batch latency that always rewards bigger batches
+        tuner.record(tuner.value, 0.01 + tuner.value * 1e-7, nbytes=tuner.value * 1000)
+    assert tuner.value <= 4_000
+    assert tuner.best_value <= 4_000
+
+
+def test_short_tail_batch_is_ignored():
+    tuner = AIMDTuner("rows_chunk", start=10_000, minimum=1_000, maximum=500_000)
+    tuner.record(10_000, 0.1)
+    value = tuner.value
+    assert tuner.record(37, 1.0) == value
+    assert tuner.samples == 1
+
+
+def test_converged_values_seed_the_next_run(tmp_path):
+    asset = {
+        "name": "sqlserver_to_snowflake_simple",
+        "source": {"configs": {"rows_chunk": "auto"}},
+        "target": {"configs": {"batch_size": 5000}},
+        "autotune": {"rows_chunk": {"min": 2000, "max": 200_000}},
+    }
+    store = TuningStore(tmp_path / "autotune.json")
+    sizing = BatchSizing.from_asset(asset, store)
+    assert sizing.get("batch_size") == 5000
+    assert sizing.get("part_size") == 8 * 1024 * 1024
+
+    _drive(sizing.tuners["rows_chunk"], lambda n: 0.005 + n * 1e-6 * (1 if n <= 40_000 else 3))
+    best = sizing.tuners["rows_chunk"].best_value
+    sizing.save()
+
+    warm = BatchSizing.from_asset(asset, TuningStore(tmp_path / "autotune.json"))
+    assert warm.get("rows_chunk") == best
+    assert not warm.tuners["rows_chunk"].slow_start
+    assert "batch_size" not in warm.tuners
@@ -0,0 +1,79 @@
+"""
+Tests for compiled blueprint expansion (pipelines/blueprint_engine.py)
+"""
+from pathlib import Path
+
+import pytest
+
+from pipelines.blueprint_engine import BlueprintError, CompiledBlueprint, apply_overrides
+
+BLUEPRINT = Path(__file__).resolve().parent.parent / "blueprints" / "cross_ref_assets.yaml"
+
+VALUES = {
+    "ASSET_NAME_1": "a1",
+    "ASSET_NAME_2": "a2",
+    "ASSET_NAME_3": "a3",
+    "SOURCE_CONN": "sftp_prod",
+    "TARGET_CONN": "s3_prod",
+}
+
+
+def test_cross_ref_blueprint_instantiates():
+    bp = CompiledBlueprint.from_file(BLUEPRINT)
+    assert bp.variables == sorted(VALUES)
+
+    inst = bp.instantiate(VALUES)
+    names = [a["name"] for a in inst["assets"]]
+    assert names == ["a1", "a2", "a3"]
+    assert inst["assets"][2]["deps"] == ["a1", "a2"]
+    assert inst["assets"][0]["source"]["connection"] == "sftp_prod"
+    # Runtime templating is left alone for the asset factory
+    assert inst["assets"][0]["source"]["configs"]["path"] == "{{ params.source_path }}"
+    assert "blueprint" not in inst
+
+
+def test_instances_are_independent_unless_shared():
+    bp = CompiledBlueprint.from_file(BLUEPRINT)
+    first = bp.instantiate(VALUES)
+    first["params_schema"]["injected"] = "string"
+    first["assets"][0]["partitions_def"]["start"] = "1999-01-01"
+    second = bp.instantiate(dict(VALUES, ASSET_NAME_1="b1"))
+    assert "injected" not in second["params_schema"]
+    assert second["assets"][0]["partitions_def"] != first["assets"][0]["partitions_def"]
+
+    first, second = bp.instantiate_many([VALUES, dict(VALUES, ASSET_NAME_1="b1")], shared=True)
+    assert first["assets"][0]["partitions_def"] is second["assets"][0]["partitions_def"]
+    assert first["params_schema"] is second["params_schema"]
+    assert first["assets"][0] is not second["assets"][0]
+
+
+def test_whole_value_placeholder_keeps_type_and_missing_values_fail():
+    bp = CompiledBlueprint({"assets": [{"name": "x", "deps": "$[DEPS]"}]})
+    deps = ["a", "b"]
+    inst = bp.instantiate({"DEPS": deps})
+    assert inst["assets"][0]["deps"] == ["a", "b"] and inst["assets"][0]["deps"] is not deps
+    with pytest.raises(BlueprintError, match="DEPS"):
+        bp.instantiate({})
+
+
+def test_apply_overrides_copies_only_written_path():
+    bp = CompiledBlueprint.from_file(BLUEPRINT)
+    instances = bp.instantiate_many([VALUES, dict(VALUES, ASSET_NAME_1="b1")])
+    out = apply_overrides(instances, {("assets", 0, "group"): "team_x"})
+
+    assert [i["assets"][0]["group"] for i in out] == ["team_x", "team_x"]
+    assert instances[0]["assets"][0]["group"] == "testing"
+    assert out[0]["assets"][1] is instances[0]["assets"][1]
+
+
+def test_apply_overrides_creates_missing_mappings_and_rejects_bad_paths():
+    bp = CompiledBlueprint.from_file(BLUEPRINT)
+    instances = bp.instantiate_many([VALUES], shared=True)
+    out = apply_overrides(instances, {("tags", "team"): "marketplace", ("assets", 0, "retry", "max"): 3})
+    assert out[0]["tags"] == {"team": "marketplace"} and out[0]["assets"][0]["retry"] == {"max": 3}
+    assert "tags" not in instances[0]
+
+    with pytest.raises(BlueprintError, match="no list item 9"):
+        apply_overrides(instances, {("assets", 9, "group"): "x"})
+    with pytest.raises(BlueprintError, match="inside a str"):
+        apply_overrides(instances, {("assets", 0, "name", "x"): "y"})
@@ -0,0 +1,164 @@
+"""
+Tests for the bulk SQL extract path (pipelines/bulk_extract.py)
+"""
+import csv
+import io
+import sqlite3
+from pathlib import Path
+
+import pytest
+import yaml
+
+from pipelines import bulk_extract
+from pipelines.bulk_extract import extract_to_csv, is_bulk, with_packet_size
+from pipelines.instrumentation import Instrumentation
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+SQLSERVER_S3 = BASE_DIR / "pipelines" / "sqlserver" / "sqlserver-s3.yaml"
+
+
+def _stand_in(tmp_path, rows=2500):
+    # SQLite stand-in for DG_PLAY.dbo.test_customers, reached through the same DB-API interface
+    path = tmp_path / "dg_play.db"
+    conn = sqlite3.connect(str(path))
+    conn.execute("CREATE TABLE test_customers (id INTEGER, name TEXT, email TEXT, age INTEGER)")
+    conn.executemany(
+        "INSERT INTO test_customers VALUES (?, ?, ?, ?)",
+        [(i, f"name, {i}" if i % 7 == 0 else f"name {i}", f"c{i}@example.com", None if i % 5 == 0 else 20 + i % 50)
+         for i in range(rows)],
+    )
+    conn.commit()
+    conn.close()
+    return lambda: sqlite3.connect(str(path), check_same_thread=False)
+
+
+def _configs(**extra):
+    asset = yaml.safe_load(SQLSERVER_S3.read_text())["assets"][0]
+    # The YAML's T-SQL TOP/brackets are not SQLite; the rest of the source config is kept
+    return {**asset["source"]["configs"], "sql": "SELECT id, name, email, age FROM test_customers ORDER BY id",
+            **extra}
+
+
+def test_rows_path_streams_every_row_through_the_queue(tmp_path):
+    connect = _stand_in(tmp_path)
+    sink = io.BytesIO()
+    inst = Instrumentation()
+    result = extract_to_csv(_configs(rows_chunk=100, queue_batches=2), sink, dbapi_connect=connect, inst=inst)
+
+    assert (result["path"], result["rows"], result["fallback_reason"]) == ("dbapi", 2500, None)
+    rows = list(csv.reader(io.StringIO(sink.getvalue().decode())))
+    assert rows[0] == ["id", "name", "email", "age"] and len(rows) == 2501
+    assert rows[8] == ["7", "name, 7", "c7@example.com", "27"] and rows[1][3] == ""
+    summary = inst.summary()
+    assert summary["extract"]["calls"] == 26 and summary["serialize"]["rows"] == 2500
+
+
+def test_bulk_falls_back_to_rows_path_with_identical_output(tmp_path, monkeypatch):
+    connect = _stand_in(tmp_path)
+    expected = io.BytesIO()
+    extract_to_csv(_configs(rows_chunk=512), expected, dbapi_connect=connect)
+
+    # arrow-odbc missing
+    monkeypatch.setattr(bulk_extract, "_arrow_available", lambda: "arrow_odbc is not installed")
+    sink = io.BytesIO()
+    result = extract_to_csv(_configs(extract="bulk", rows_chunk=512), sink, "Driver=x", dbapi_connect=connect)
+    assert result["path"] == "dbapi" and result["fallback_reason"] == "arrow_odbc is not installed"
+    assert sink.getvalue() == expected.getvalue()
+
+    # Bulk reader fails before producing anything
+    def broken(self):
+        raise RuntimeError("[ODBC Driver 18] login timeout")
+        yield
+
+    monkeypatch.setattr(bulk_extract, "_arrow_available", lambda: None)
+    monkeypatch.setattr(bulk_extract.ArrowOdbcReader, "__iter__", broken)
+    sink = io.BytesIO()
+    result = extract_to_csv(_configs(extract="bulk", rows_chunk=512), sink, "Driver=x", dbapi_connect=connect)
+    assert result["fallback_reason"].startswith("bulk reader failed: RuntimeError")
+    assert sink.getvalue() == expected.getvalue()
+
+    with pytest.raises(ValueError, match="fall back"):
+        extract_to_csv(_configs(extract="bulk"), io.BytesIO(), "Driver=x")
+
+
+def test_fetch_errors_and_empty_results(tmp_path):
+    connect = _stand_in(tmp_path, rows=0)
+    sink = io.BytesIO()
+    assert extract_to_csv(_configs(), sink, dbapi_connect=connect)["rows"] == 0
+    assert sink.getvalue() == b"id,name,email,age\n"
+
+    with pytest.raises(sqlite3.OperationalError):
+        extract_to_csv({"sql": "SELECT * FROM missing_table"}, io.BytesIO(), dbapi_connect=connect)
+
+
+def test_empty_result_closes_the_cursor(tmp_path):
+    connect = _stand_in(tmp_path, rows=0)
+    closed = []
+
+    class Cursor:
+        def __init__(self, cursor):
+            self._cursor = cursor
+
+        def __getattr__(self, name):
+            return getattr(self._cursor, name)
+
+        def __setattr__(self, name, value):
+            if name == "_cursor":
+                object.__setattr__(self, name, value)
+            else:
+                setattr(self._cursor, name, value)
+
+        def close(self):
+            closed.append(True)
+            self._cursor.close()
+
+    class Connection:
+        def __init__(self):
+            self._conn = connect()
+
+        def cursor(self):
+            return Cursor(self._conn.cursor())
+
+    class Sink:
+        # Closed before the header is written, not whenever the iterator is collected
+        def write(self, chunk):
+            assert closed == [True]
+
+    extract_to_csv(_configs(), Sink(), dbapi_connect=Connection)
+    assert closed == [True]
+
+
+def test_packet_size_and_opt_in():
+    assert with_packet_size("Driver={ODBC Driver 18 for SQL Server};Server=db;") == \
+        "Driver={ODBC Driver 18 for SQL Server};Server=db;Packet Size=32767"
+    assert with_packet_size("Server=db;Packet Size=8192", 32767) == "Server=db;Packet Size=8192"
+    assert is_bulk({"configs": {"extract": "BULK"}})
+    assert not is_bulk(yaml.safe_load(SQLSERVER_S3.read_text())["assets"][0]["source"])
+
+
+def test_consumer_stopping_early_closes_the_cursor():
+    closed = []
+
+    def batches():
+        try:
+            for i in range(100):
+                yield [(i,)]
+        finally:
+            closed.append(True)
+
+    fetched = bulk_extract._fetch_ahead(batches(), 2, Instrumentation(enabled=False), first=[(-1,)])
+    assert next(fetched) == [(-1,)] and next(fetched) == [(0,)]
+    fetched.close()
+    assert closed == [True]
+
+
+def test_arrow_batches_encode_like_rows():
+    pa = pytest.importorskip("pyarrow")
+    import datetime
+    from decimal import Decimal
+
+    rows = [(1, "plain", True, datetime.datetime(2024, 6, 1, 12, 30), Decimal("1.50")),
+            (2, 'a, "quoted"\nline', False, None, None)]
+    columns = ["id", "name", "active", "updated_at", "amount"]
+    batch = pa.RecordBatch.from_pylist([dict(zip(columns, r)) for r in rows])
+    assert bulk_extract._encode_arrow(batch, columns) == bulk_extract._encode_rows(rows, columns)
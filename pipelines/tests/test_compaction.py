@@ -0,0 +1,49 @@
+"""
+Tests for small-file compaction (pipelines/compaction.py)
+"""
+import gzip
+
+from pipelines.compaction import LocalStorage, compact_prefix, lineage, load_keys, members_to_replay
+
+
+def _write(root, key, text):
+    path = root / key
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def test_small_files_are_bundled_with_single_header(tmp_path):
+    for i in range(5):
+        _write(tmp_path, f"in/f{i}.csv", f"id,name\n{i},row{i}\n")
+
+    manifest = compact_prefix(LocalStorage(tmp_path), "in/", "out/")
+
+    assert len(manifest["bundles"]) == 1
+    bundle = manifest["bundles"][0]
+    lines = gzip.decompress((tmp_path / bundle["key"]).read_bytes()).decode().splitlines()
+    assert lines[0] == "id,name"
+    assert lines.count("id,name") == 1
+    assert len(lines) == 6
+    assert sorted(lineage(manifest)) == [f"in/f{i}.csv" for i in range(5)]
+
+
+def test_header_change_starts_new_bundle(tmp_path):
+    _write(tmp_path, "in/a.csv", "id,name\n1,a\n")
+    _write(tmp_path, "in/b.csv", "id,email\n2,b@x\n")
+
+    manifest = compact_prefix(LocalStorage(tmp_path), "in/", "out/")
+
+    assert [b["members"] for b in manifest["bundles"]] == [["in/a.csv"], ["in/b.csv"]]
+
+
+def test_large_files_pass_through_and_rejected_bundles_replay_members(tmp_path):
+    _write(tmp_path, "in/big.csv", "id\n" + "1\n" * 100)
+    _write(tmp_path, "in/small1.csv", "id\n1\n")
+    _write(tmp_path, "in/small2.csv", "id\n2\n")
+
+    manifest = compact_prefix(LocalStorage(tmp_path), "in/", "out/", small_file_bytes=50)
+
+    assert manifest["passthrough"] == ["in/big.csv"]
+    assert "in/big.csv" in load_keys(manifest)
+    bundle_key = manifest["bundles"][0]["key"]
+    assert members_to_replay(manifest, [bundle_key]) == ["in/small1.csv", "in/small2.csv"]
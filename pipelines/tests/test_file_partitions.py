@@ -0,0 +1,78 @@
+"""
+Tests for per-file dynamic partitions (pipelines/file_partitions.py)
+"""
+from pathlib import Path
+
+import pytest
+import yaml
+
+from pipelines.file_partitions import (
+    FileItem, PerFileSpec, file_name_from_key, items_from_entries, partition_key, render_item, run_per_file,
+    summarize,
+)
+from pipelines.sftp_snapshot import LocalListing, list_entries
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+CROSS_REF = BASE_DIR / "pipelines" / "sftp" / "cross_ref_test.yaml"
+
+
+def _cross_ref_asset(name="cross_ref_test_asset"):
+    return next(a for a in yaml.safe_load(CROSS_REF.read_text())["assets"] if a["name"] == name)
+
+
+def test_partition_keys_round_trip_awkward_file_names():
+    for name in ["orders_2024.csv", "a,b|c[1]*.csv", "x...y.csv", "100%.csv", "tab\there.csv"]:
+        key = partition_key(name)
+        assert not any(c in key for c in ",|[]*\t") and "..." not in key
+        assert file_name_from_key(key) == name
+    assert partition_key("orders_2024.csv") == "orders_2024.csv"
+
+
+def test_source_item_templates_render_per_file():
+    asset = _cross_ref_asset()
+    item = FileItem("orders_1.csv", "/upload", 2048, 1700000000)
+    target = render_item(asset["target"]["configs"], item)
+    # Only source.item is bound; params and source.path are left to the factory
+    assert target["key"] == "backups{{ source.path }}/orders_1.csv"
+    assert target["bucket_name"] == "{{ params.target_bucket }}"
+
+    downstream = render_item(_cross_ref_asset("cross_ref_test_asset_2")["target"]["configs"], item)
+    assert downstream["key"] == "backups/upload/orders_1.csv"
+
+    restored = FileItem.from_tags(item.key, item.to_tags())
+    assert restored == item
+    assert FileItem.from_tags("a%2Cb.csv", {}, "/upload").full_path == "/upload/a,b.csv"
+    with pytest.raises(ValueError):
+        render_item("{{ source.item.owner }}", item)
+
+
+def test_spec_from_asset_requires_file_source():
+    asset = {**_cross_ref_asset(), "per_file": {"retries": 4}}
+    spec = PerFileSpec.from_asset(asset)
+    assert (spec.partitions_name, spec.retries, spec.time_partitioned) == ("cross_ref_test_asset_files", 4, True)
+    with pytest.raises(ValueError):
+        PerFileSpec.from_asset({"name": "x", "per_file": True, "source": {"type": "SQLSERVER"}})
+
+
+def test_one_bad_file_does_not_fail_the_others(tmp_path):
+    for i in range(20):
+        (tmp_path / f"orders_{i}.csv").write_text("id\n1\n")
+    items = items_from_entries(list_entries(LocalListing(), str(tmp_path), r"orders_.*\.csv"), str(tmp_path))
+    calls = {}
+
+    def copy(item):
+        calls[item.file_name] = calls.get(item.file_name, 0) + 1
+        if item.file_name == "orders_3.csv":
+            raise IOError("corrupt")
+        if item.file_name == "orders_7.csv" and calls[item.file_name] == 1:
+            raise TimeoutError("transient")
+        return {"target/key": f"raw/{item.file_name}"}
+
+    runs = run_per_file(items, copy, max_workers=4, retries=2)
+    summary = summarize(runs)
+    assert summary["succeeded"] == 19 and summary["failed"] == ["orders_3.csv"]
+    assert calls["orders_3.csv"] == 3 and calls["orders_7.csv"] == 2
+    ok = next(r for r in runs if r.item.file_name == "orders_7.csv")
+    assert ok.status == "SUCCESS" and ok.error is None
+    assert ok.metadata == {"source/path": f"{tmp_path}/orders_7.csv", "source/partition_key": "orders_7.csv",
+                           "target/key": "raw/orders_7.csv"}
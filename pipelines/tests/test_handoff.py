@@ -0,0 +1,121 @@
+"""
+Tests for streaming handoff between chained assets (pipelines/handoff.py)
+"""
+import io
+import threading
+
+import pytest
+import yaml
+
+from pipelines.handoff import run_pipelined, streamed_edges
+
+# sql_s3_sftp_chain.yaml with the downstream asset opted in
+CHAIN = """
+assets:
+  - name: sql_to_s3_landing
+    source:
+      type: SQLSERVER
+      connection: sqlserver_prod
+      configs:
+        sql: "SELECT * FROM DG_PLAY.dbo.SALES_EXTRACT"
+    target:
+      type: S3
+      connection: s3_prod
+      configs:
+        bucket_name: "my-dagster-poc"
+        prefix: "landing/sales/"
+
+  - name: s3_to_sftp_outbound
+    deps: [sql_to_s3_landing]
+    handoff: stream
+    source:
+      type: S3
+      connection: s3_prod
+      configs:
+        bucket_name: "my-dagster-poc"
+        prefix: "landing/sales/"
+    target:
+      type: SFTP
+      connection: sftp_prod
+      configs:
+        path: /inbound/sales_feed/
+"""
+
+
+def test_chain_yaml_opts_in():
+    assert streamed_edges([yaml.safe_load(CHAIN)]) == [("sql_to_s3_landing", "s3_to_sftp_outbound")]
+
+
+def test_prefix_mismatch_is_not_streamed():
+    config = {
+        "assets": [
+            {"name": "up", "target": {"connection": "s3", "configs": {"prefix": "a/"}}},
+            {"name": "down", "deps": ["up"], "handoff": "stream",
+             "source": {"connection": "s3", "configs": {"prefix": "b/"}}},
+        ]
+    }
+    assert streamed_edges([config]) == []
+
+
+def test_consumer_reads_while_producer_writes_and_landing_is_kept():
+    landing = io.BytesIO()
+    first_chunk_seen = threading.Event()
+
+    def produce(writer):
+        writer.write(b"id,name\n")
+        # Would deadlock if the consumer only started after the producer finished
+        assert first_chunk_seen.wait(5)
+        for i in range(100):
+            writer.write(f"{i},row{i}\n".encode())
+
+    def consume(chunks):
+        out = bytearray()
+        for chunk in chunks:
+            out += chunk
+            first_chunk_seen.set()
+        return bytes(out)
+
+    result = run_pipelined(produce, {"sftp": consume}, landing, max_chunks=2)
+
+    assert result["results"]["sftp"] == landing.getvalue()
+    assert result["bytes_written"] == len(landing.getvalue())
+
+
+def test_failed_consumer_does_not_block_landing():
+    landing = io.BytesIO()
+
+    def consume(chunks):
+        next(iter(chunks))
+        raise IOError("sftp down")
+
+    result = run_pipelined(lambda w: [w.write(b"x" * 10) for _ in range(1000)], {"sftp": consume}, landing, max_chunks=1)
+
+    assert len(landing.getvalue()) == 10000
+    assert isinstance(result["errors"]["sftp"], IOError)
+
+
+def test_consumer_returning_early_does_not_block_producer():
+    landing = io.BytesIO()
+    result = run_pipelined(lambda w: [w.write(b"x" * 10) for _ in range(100)],
+                           {"head": lambda chunks: next(iter(chunks))}, landing, max_chunks=2)
+
+    assert result["results"]["head"] == b"x" * 10 and not result["errors"]
+    assert len(landing.getvalue()) == 1000
+
+
+def test_producer_failure_reaches_consumer():
+    seen = {}
+
+    def produce(writer):
+        writer.write(b"a")
+        raise ValueError("query failed")
+
+    def consume(chunks):
+        try:
+            list(chunks)
+        except RuntimeError as e:
+            seen["cause"] = e.__cause__
+
+    with pytest.raises(ValueError):
+        run_pipelined(produce, {"sftp": consume}, io.BytesIO())
+    assert isinstance(seen["cause"], ValueError)
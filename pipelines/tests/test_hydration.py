@@ -0,0 +1,96 @@
+"""
+Tests for compiled params_schema hydration (pipelines/hydration.py)
+"""
+from pathlib import Path
+
+import pytest
+import yaml
+
+from pipelines.hydration import Hydrator, ParamsSchema, ParamsValidationError, hydrate_requests
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+TESTS_DIR = BASE_DIR / "pipelines" / "tests"
+
+
+def _hydrator(path, job=None, **kwargs):
+    hydrators = Hydrator.from_configs([yaml.safe_load(Path(path).read_text())], **kwargs)
+    return hydrators[job] if job else next(iter(hydrators.values()))
+
+
+def test_schema_shorthand_is_typed():
+    schema = ParamsSchema({
+        "source_path": "string!|/upload",
+        "source_columns": "list!|[]",
+        "head_line_number": "int",
+        "profile": "string|false",
+        "delete_source": "bool|true",
+        "sales_asset.source_bucket": "string!",
+    })
+    assert schema.defaults_for(None) == {"source_path": "/upload", "source_columns": [], "profile": "false",
+                                         "delete_source": True}
+    assert schema.validate({"head_line_number": "5", "source_columns": "a, b"}, check_required=False) == {
+        "head_line_number": 5, "source_columns": ["a", "b"]}
+    assert "source_bucket" in schema.fields_for("sales_asset") and "source_bucket" not in schema.fields_for(None)
+    with pytest.raises(ParamsValidationError, match="expects int"):
+        schema.validate({"head_line_number": "five"}, check_required=False)
+    with pytest.raises(ParamsValidationError, match="Unknown type"):
+        ParamsSchema({"x": "uuid!"})
+
+
+def test_layers_overrides_registry_and_ops_config():
+    hydrator = _hydrator(TESTS_DIR / "phase2_test_cross_ref_static.yaml")
+    registry = {"source_pattern": "orders_.*\\.csv",
+                "_ops_config": {"phase2_cross_ref_asset_2": {"target_bucket": "from-registry"}}}
+
+    first = hydrator.hydrate(registry=registry, registry_version=1, asset="phase2_cross_ref_asset_1")
+    # YAML ops_config beats job_overrides; the registry (edited in the UI) beats both
+    assert first["source_path"] == "/data/sales/input" and first["source_pattern"] == "orders_.*\\.csv"
+    second = hydrator.hydrate(registry=registry, registry_version=1, asset="phase2_cross_ref_asset_2")
+    assert second["source_path"] == "/upload" and second["source_pattern"] == "orders_.*\\.csv"
+    assert second["target_bucket"] == "from-registry"
+
+    tagged = hydrator.hydrate(tags={"param/source_path": "/adhoc"}, registry=registry, registry_version=1)
+    assert tagged["source_path"] == "/adhoc"
+
+    strict = _hydrator(TESTS_DIR / "phase2_test_runtime_validation.yaml")
+    with pytest.raises(ParamsValidationError, match="new_required_param"):
+        strict.hydrate(registry={}, registry_version=1)
+    with pytest.raises(ParamsValidationError, match="is_strict"):
+        strict.hydrate(registry={"new_required_param": "x", "typo_param": "y"}, registry_version=2)
+    assert strict.hydrate(registry={"new_required_param": "x"}, registry_version=3)["new_required_param"] == "x"
+
+
+def test_memoized_per_registry_version_and_trigger_rebound():
+    hydrator = _hydrator(BASE_DIR / "pipelines" / "sftp" / "cross_ref_test.yaml")
+    fetches = []
+
+    def registry():
+        fetches.append(1)
+        return {"uma_new_parameter": "a", "uma_new_parameter_2": "b", "target_bucket": f"bucket-v{len(fetches)}"}
+
+    tags = {"job_nm": "cross_ref_test_job", "dagster/sensor_name": "s"}
+    triggers = [{"source_path": f"/upload/{i}"} for i in range(200)]
+    params = hydrate_requests(hydrator, triggers, tags=tags, registry=registry, registry_version="2024-06-01")
+    assert len(fetches) == 1 and hydrator.stats()["hits"] == 199
+    assert [p["source_path"] for p in params[:2]] == ["/upload/0", "/upload/1"]
+    assert {p["target_bucket"] for p in params} == {"bucket-v1"}
+    # The cached value is not affected by a request's trigger
+    assert hydrator.hydrate(tags=tags, registry=registry, registry_version="2024-06-01")["source_path"] == "/upload"
+
+    # New registry version -> re-fetched
+    assert hydrator.hydrate(tags=tags, registry=registry, registry_version="2024-06-02")["target_bucket"] == "bucket-v2"
+    with pytest.raises(ParamsValidationError, match="is_strict"):
+        hydrator.hydrate(tags=tags, registry=registry, registry_version="2024-06-02", trigger={"file_name": "x"})
+
+
+def test_unversioned_registry_is_not_cached_and_values_are_copies():
+    hydrator = Hydrator({"name": "j", "params_schema": {"buckets": "list|[\"a\"]", "opts": "dict|{}"}})
+    rows = [{"buckets": ["b1"]}, {"buckets": ["b2"]}]
+    assert hydrator.hydrate(registry=lambda: rows[0])["buckets"] == ["b1"]
+    assert hydrator.hydrate(registry=lambda: rows[1])["buckets"] == ["b2"]
+    assert hydrator.stats()["size"] == 0
+
+    first = hydrator.hydrate(registry={}, registry_version=1)
+    first["buckets"].append("mutated")
+    first["opts"]["k"] = "v"
+    assert hydrator.hydrate(registry={}, registry_version=1) == {"buckets": ["a"], "opts": {}}
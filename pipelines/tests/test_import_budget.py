@@ -0,0 +1,104 @@
+"""
+Import budget for the code location.
+
+definitions.py is loaded by the code server and the sensor daemon, which never
+execute transfers, so it must not pull in connector stacks eagerly. Its own
+pipelines/ imports (custom_assets, ...) are checked here; the factory
+(nexus_foundry) only when it is installed. The helper modules are imported
+from asset code and defer connector stacks (boto3, pyarrow, ...) to the
+functions that use them. Budget can be tuned with NEXUS_IMPORT_BUDGET_MS.
+"""
+import ast
+import importlib.util
+import os
+
+import pytest
+
+from benchmarks.bench_startup import BASE_DIR, CONNECTOR_PACKAGES, import_profile
+
+IMPORT_BUDGET_MS = float(os.environ.get("NEXUS_IMPORT_BUDGET_MS", "3000"))
+PIPELINES_BUDGET_MS = float(os.environ.get("NEXUS_PIPELINES_IMPORT_BUDGET_MS", "50"))
+
+HELPER_MODULES = [
+    "pipelines.compaction",
+    "pipelines.schema_cache",
+    "pipelines.instrumentation",
+    "pipelines.profiling",
+    "pipelines.blueprint_engine",
+    "pipelines.handoff",
+    "pipelines.transfer",
+    "pipelines.parallel_csv",
+    "pipelines.staging",
+    "pipelines.codecs",
+    "pipelines.sftp_snapshot",
+    "pipelines.streaming_checks",
+    "pipelines.autotune",
+    "pipelines.selection_index",
+    "pipelines.run_queue",
+    "pipelines.run_history",
+    "pipelines.file_partitions",
+    "pipelines.hydration",
+    "pipelines.bulk_extract",
+    "pipelines.json_store",
+    "pipelines.scheduler",
+    "pipelines.validation",
+]
+
+
+@pytest.mark.parametrize("module", HELPER_MODULES)
+def test_helper_modules_do_not_import_connectors(module):
+    report = import_profile(module)
+    assert report["eager_connector_packages"] == []
+
+
+def _imports(path) -> list:
+    """Module-level imports of a file (not those inside functions)."""
+    names = []
+    for node in ast.parse(path.read_text()).body:
+        if isinstance(node, ast.Import):
+            names += [a.name for a in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            names.append(node.module)
+    return names
+
+
+DEFINITIONS_MODULES = sorted(
+    m for m in _imports(BASE_DIR / "definitions.py") if m.split(".")[0] == "pipelines"
+)
+
+
+def _module_path(module: str):
+    return BASE_DIR.joinpath(*module.split(".")).with_suffix(".py")
+
+
+def _parents(module: str) -> list:
+    parts = module.split(".")
+    return [".".join(parts[:i]) for i in range(1, len(parts) + 1)]
+
+
+@pytest.mark.parametrize("module", DEFINITIONS_MODULES)
+def test_definitions_modules_defer_helpers_and_connectors(module):
+    # Static, so it runs without dagster: helper modules and connector stacks
+    # belong inside the asset bodies that use them
+    eager = [m for m in _imports(_module_path(module))
+             if m.split(".")[0] == "pipelines" or m.split(".")[0] in CONNECTOR_PACKAGES]
+    assert eager == []
+
+
+@pytest.mark.skipif(importlib.util.find_spec("dagster") is None, reason="dagster not installed")
+@pytest.mark.parametrize("module", DEFINITIONS_MODULES)
+def test_definitions_modules_import_budget(module):
+    report = import_profile(module)
+    assert report["eager_connector_packages"] == [], report["slowest_packages_ms"]
+    assert report["pipelines_modules"] == sorted({"pipelines", *_parents(module)})
+    assert report["pipelines_ms"] <= PIPELINES_BUDGET_MS
+
+
+@pytest.mark.skipif(
+    importlib.util.find_spec("dagster") is None or importlib.util.find_spec("nexus_foundry") is None,
+    reason="dagster / nexus_foundry not installed",
+)
+def test_definitions_import_budget():
+    report = import_profile("definitions")
+    assert report["eager_connector_packages"] == [], report["slowest_packages_ms"]
+    assert report["total_ms"] <= IMPORT_BUDGET_MS, report["slowest_packages_ms"]
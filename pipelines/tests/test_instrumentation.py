@@ -0,0 +1,37 @@
+"""
+Tests for per-phase instrumentation (pipelines/instrumentation.py)
+"""
+import time
+
+from pipelines.instrumentation import INSTRUMENTATION_TAG, Instrumentation
+
+
+def test_disabled_by_default_from_tags():
+    inst = Instrumentation.from_tags({"team": "Marketplace"})
+    with inst.phase("extract") as phase:
+        phase.add(rows=10)
+    assert not inst.enabled
+    assert inst.phases == {}
+    assert inst.to_metadata() == {}
+
+
+def test_phase_rows_bytes_and_wait_are_recorded():
+    inst = Instrumentation.from_tags({INSTRUMENTATION_TAG: "true"})
+    for _ in range(3):
+        with inst.wait("upload"):
+            time.sleep(0.001)
+        with inst.phase("upload") as phase:
+            phase.add(rows=5, bytes=100)
+
+    upload = inst.summary()["upload"]
+    assert upload["calls"] == 3
+    assert upload["rows"] == 15
+    assert upload["bytes"] == 300
+    assert upload["wait_seconds"] > 0
+    assert inst.to_metadata()["perf/bottleneck"] == "upload"
+
+
+def test_otel_tag_sets_endpoint():
+    inst = Instrumentation.from_tags({INSTRUMENTATION_TAG: "otel"})
+    assert inst.enabled
+    assert inst.otel_endpoint.startswith("http://localhost")
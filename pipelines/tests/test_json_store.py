@@ -0,0 +1,36 @@
+"""
+Tests for the shared JSON file store (pipelines/json_store.py)
+"""
+import threading
+
+from pipelines.json_store import JsonFileStore
+
+
+def test_concurrent_writers_merge_instead_of_overwriting(tmp_path):
+    path = tmp_path / "cache" / "store.json"
+    # One store per writer: separate runs share only the file
+    stores = [JsonFileStore(path) for _ in range(8)]
+    for store in stores:
+        assert store.read() == {}
+
+    def write(n, store):
+        for i in range(20):
+            store.update(lambda entries: entries.__setitem__(f"{n}:{i}", i))
+
+    threads = [threading.Thread(target=write, args=(n, s)) for n, s in enumerate(stores)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(JsonFileStore(path).read()) == 160
+    assert not list(path.parent.glob("*.tmp"))
+
+
+def test_corrupt_file_is_empty_and_update_returns_result(tmp_path):
+    path = tmp_path / "store.json"
+    path.write_text("{not json")
+    store = JsonFileStore(path)
+    assert store.read() == {}
+    assert store.update(lambda entries: entries.setdefault("a", 1) + 1) == 2
+    assert store.read() == {"a": 1} and JsonFileStore(path).read() == {"a": 1}
@@ -0,0 +1,107 @@
+"""
+Tests for multi-process CSV conversion (pipelines/parallel_csv.py)
+"""
+import csv
+import json
+
+import pytest
+
+from pipelines.parallel_csv import convert_csv, find_boundaries, multipart_bodies, split_ranges
+
+
+def _write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "note", "amount"])
+        for i in range(rows):
+            # Every 7th note has an embedded newline and quotes
+            note = f'line one\nsaid "hi" {i}' if i % 7 == 0 else f"plain {i}"
+            writer.writerow([i, note, f"{i * 1.5:.2f}"])
+
+
+def test_boundaries_skip_newlines_inside_quotes(tmp_path):
+    path = tmp_path / "q.csv"
+    path.write_bytes(b'a,b\n1,"x\ny"\n2,z\n')
+    with open(path, "rb") as f:
+        # Target lands inside the quoted field: boundary must be after `y"\n`
+        assert find_boundaries(f, 4, [7], block=3) == [12]
+
+
+def test_ranges_cover_every_record_once(tmp_path):
+    path = tmp_path / "in.csv"
+    _write_csv(path, 2000)
+    header, ranges = split_ranges(path, 8, min_range_bytes=1)
+
+    assert header.startswith(b"id,note,amount")
+    assert len(ranges) == 8
+    body = b"".join(path.read_bytes()[a:b] for a, b in ranges)
+    assert header + body == path.read_bytes()
+    for a, b in ranges:
+        rows = list(csv.reader(path.read_bytes()[a:b].decode().splitlines(True)))
+        assert all(len(r) == 3 for r in rows)
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_json_matches_single_threaded_reader(tmp_path, workers):
+    path = tmp_path / "in.csv"
+    _write_csv(path, 1500)
+    out = tmp_path / "out.json"
+
+    result = convert_csv(path, out, "JSON", workers=workers, min_range_bytes=1024)
+
+    with open(path, newline="", encoding="utf-8") as f:
+        expected = list(csv.DictReader(f))
+    assert result["rows"] == 1500
+    assert json.loads(out.read_text()) == expected
+
+
+def test_multipart_bodies_respect_minimum_part_size(tmp_path):
+    parts = []
+    for i in range(5):
+        p = tmp_path / f"part_{i}.json"
+        p.write_text(",".join(json.dumps({"i": n}) for n in range(i * 10, i * 10 + 10)))
+        parts.append(str(p))
+    bodies = list(multipart_bodies(parts, min_part_bytes=200))
+
+    assert all(len(b) >= 200 for b in bodies[:-1])
+    assert json.loads(b"".join(bodies)) == [{"i": n} for n in range(50)]
+
+
+def test_parquet_has_one_row_group_per_range(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "in.csv"
+    _write_csv(path, 3000)
+    out = tmp_path / "out.parquet"
+
+    result = convert_csv(path, out, "PARQUET", workers=2, min_range_bytes=4096)
+
+    parquet = pq.ParquetFile(out)
+    assert parquet.metadata.num_rows == 3000
+    assert parquet.metadata.num_row_groups == result["ranges"]
+
+
+def _write_amounts(path, amounts):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "amount"])
+        writer.writerows(enumerate(amounts))
+
+
+def test_parquet_types_agree_across_ranges(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    import pyarrow as pa
+
+    # Integers in the first range, a decimal in the last one (4 ranges, all sampled)
+    path, out = tmp_path / "in.csv", tmp_path / "out.parquet"
+    _write_amounts(path, [str(i) for i in range(2999)] + ["7.5"])
+    result = convert_csv(path, out, "PARQUET", workers=1, min_range_bytes=4096)
+    assert result["ranges"] == 4 and result["widened_to_string"] == []
+    assert pq.read_schema(out).field("amount").type == pa.float64()
+
+    # A value no sampled head shows (12 ranges, 8 sampled) widens its column to string
+    _write_amounts(path, [str(i) for i in range(5999)] + ["abc"])
+    result = convert_csv(path, out, "PARQUET", workers=3, min_range_bytes=4096)
+    assert result["ranges"] == 12 and result["widened_to_string"] == ["amount"]
+    table = pq.read_table(out)
+    assert table.schema.field("amount").type == pa.string() and table.num_rows == 6000
+    assert table.column("amount")[-1].as_py() == "abc"
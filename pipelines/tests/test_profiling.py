@@ -0,0 +1,80 @@
+"""
+Tests for the per-run sampling profiler (pipelines/profiling.py)
+"""
+import os
+import time
+
+import pytest
+
+from pipelines import profiling
+from pipelines.profiling import PROFILE_TAG, RunProfiler, profile_mode
+
+
+def _busy_loop(seconds):
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += sum(range(100))
+    return total
+
+
+def test_profile_mode_from_tags_and_params():
+    assert profile_mode({}, {}) is None
+    assert profile_mode({PROFILE_TAG: "true"}) == "sampler"
+    assert profile_mode({}, {"profile": "true"}) == "sampler"
+    assert profile_mode({PROFILE_TAG: "py-spy"}) == "py-spy"
+    assert profile_mode({}, {"profile": "false"}) is None
+
+
+def test_sampler_writes_folded_stacks_and_tracemalloc(tmp_path, monkeypatch):
+    monkeypatch.setenv("DAGSTER_HOME", str(tmp_path))
+    with RunProfiler("run-1", "cross_ref_test_asset", "sampler", memory_top_n=5, interval=0.001) as prof:
+        _busy_loop(0.1)
+        data = [bytes(1024) for _ in range(100)]
+
+    folded = (tmp_path / "storage" / "run-1" / "profiles" / "cross_ref_test_asset.folded").read_text()
+    assert "_busy_loop" in folded
+    assert len(open(prof.artifacts["tracemalloc"]).read().splitlines()) == 5
+    assert data
+
+
+def test_disabled_profiler_produces_nothing(tmp_path, monkeypatch):
+    monkeypatch.setenv("DAGSTER_HOME", str(tmp_path))
+    with RunProfiler("run-2", "asset", None) as prof:
+        pass
+    assert prof.artifacts == {}
+    assert not (tmp_path / "storage").exists()
+
+
+FAKE_PYSPY = {
+    # attaches, writes --output on SIGINT
+    "ok": 'while [ $# -gt 0 ]; do [ "$1" = "--output" ] && out="$2"; shift; done\n'
+          'trap \'echo "{}" > "$out"; exit 0\' INT\nwhile :; do sleep 0.02; done',
+    # no ptrace permission
+    "fails": "exit 1",
+    # never writes its output
+    "hangs": "trap '' INT\nwhile :; do sleep 0.02; done",
+}
+
+
+@pytest.mark.parametrize("behaviour", sorted(FAKE_PYSPY))
+def test_pyspy_result_is_checked(tmp_path, monkeypatch, behaviour):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "py-spy"
+    script.write_text("#!/bin/sh\n" + FAKE_PYSPY[behaviour] + "\n")
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("DAGSTER_HOME", str(tmp_path))
+    monkeypatch.setattr(profiling, "PYSPY_STOP_TIMEOUT", 0.5)
+
+    with RunProfiler("run-3", "asset", "py-spy", interval=0.001) as prof:
+        _busy_loop(0.05)
+
+    if behaviour == "ok":
+        assert prof.artifacts["flamegraph"].endswith("asset.speedscope.json") and "profile_error" not in prof.artifacts
+    elif behaviour == "fails":
+        # Fell back to the built-in sampler
+        assert prof.artifacts["flamegraph"].endswith("asset.folded") and "on start" in prof.artifacts["profile_error"]
+    else:
+        assert "flamegraph" not in prof.artifacts and "killed" in prof.artifacts["profile_error"]
@@ -0,0 +1,79 @@
+"""
+Tests for the run-duration history store (pipelines/run_history.py)
+"""
+from pathlib import Path
+
+import pytest
+import yaml
+
+from pipelines.run_history import RunHistory, job_eta, pack_partitions, sla_start_cron
+from pipelines.scheduler import build_steps
+
+SHOWCASE = Path(__file__).resolve().parent.parent / "combinations" / "master_showcase.yaml"
+
+
+def test_percentiles_per_partition_and_pruning(tmp_path):
+    history = RunHistory(tmp_path / "history.db", keep=20)
+    for i in range(30):
+        history.record("regional_sales_to_s3", 10.0 + i, partition="2024-01-01|US", started_at=i)
+        history.record("regional_sales_to_s3", 100.0, partition="2024-01-01|EU", started_at=i)
+    history.record("regional_sales_to_s3", 999.0, partition="2024-01-01|US", started_at=99, status="FAILURE")
+
+    # Only the newest 20 rows per partition are kept; for US that is the failure
+    # plus successes 21..39, and failures are excluded from estimates
+    assert history.percentile("regional_sales_to_s3", 50, partition="2024-01-01|US") == pytest.approx(30.0)
+    assert history.percentile("regional_sales_to_s3", 100, partition="2024-01-01|EU") == 100.0
+    # Partitions without enough history fall back to the whole asset
+    assert history.percentile("regional_sales_to_s3", 100, partition="2024-01-02|US") == 100.0
+    assert history.percentile("csv_to_parquet_asset") is None
+    assert history.summary("regional_sales_to_s3", "2024-01-01|US")["runs"] == 19
+
+
+def test_percentile_is_in_percent(tmp_path):
+    history = RunHistory(tmp_path / "history.db")
+    for i in range(101):
+        history.record("csv_to_parquet_asset", float(i), started_at=i)
+    # 1 is p1, not p100
+    assert history.percentile("csv_to_parquet_asset", 1, window=101) == pytest.approx(1.0)
+    assert [d for d, _ in history.samples("csv_to_parquet_asset", window=2)] == [100.0, 99.0]
+    for q in (-1, 150):
+        with pytest.raises(ValueError, match="percent"):
+            history.percentile("csv_to_parquet_asset", q)
+
+
+def test_estimate_scales_with_input_bytes(tmp_path):
+    history = RunHistory(tmp_path / "history.db")
+    for i, mb in enumerate([10, 20, 40, 80, 160, 320]):
+        # 2 s overhead + 0.5 s per MB, with +/- 1 s noise
+        history.record("csv_to_parquet_asset", 2 + 0.5 * mb + (1 if i % 2 else -1), bytes=mb << 20, started_at=i)
+    assert history.estimate("csv_to_parquet_asset", 50, input_bytes=640 << 20) == pytest.approx(322, abs=3)
+    assert history.estimate("csv_to_parquet_asset", 50) == pytest.approx(32.0)
+
+
+def test_sla_moves_schedule_earlier(tmp_path):
+    history = RunHistory(tmp_path / "history.db")
+    for i in range(5):
+        history.record("ingestion_sftp_inventory", 1800, started_at=i)
+        history.record("warehouse_load_inventory", 1200, started_at=i)
+    steps = build_steps([yaml.safe_load(SHOWCASE.read_text())])
+    eta = job_eta(history, steps, default=60)
+    # iam_doint_crazy (60) -> ingestion_sftp_inventory (1800) -> warehouse_load_inventory (1200)
+    assert eta == 3060
+
+    assert sla_start_cron("0 6 * * *", "08:00", eta) == "0 6 * * *"
+    # 07:00 - 51 min ETA - 10 min margin -> 05:59
+    assert sla_start_cron("0 6 * * *", "07:00", eta) == "59 5 * * *"
+    assert sla_start_cron("0 6 * * 1-5", {"deadline": "06:30", "margin_minutes": 0}, eta) == "39 5 * * 1-5"
+    with pytest.raises(ValueError, match="fixed minute and hour"):
+        sla_start_cron("*/15 * * * *", "07:00", eta)
+
+
+def test_pack_partitions_by_expected_cost(tmp_path):
+    history = RunHistory(tmp_path / "history.db")
+    costs = {"US": 50, "EU": 30, "APAC": 20, "LATAM": 45, "MEA": 5}
+    for region, cost in costs.items():
+        history.record("regional_sales_to_s3", cost, partition=region)
+    runs = pack_partitions(history, "regional_sales_to_s3", list(costs) + ["NEW"], max_run_seconds=60, q=50)
+    assert all(sum(costs.get(k, 30) for k in run) <= 60 for run in runs)
+    assert sorted(k for run in runs for k in run) == sorted(list(costs) + ["NEW"])
+    assert len(runs) == 4
@@ -0,0 +1,71 @@
+"""
+Tests for critical-path step scheduling (pipelines/scheduler.py)
+"""
+from pathlib import Path
+
+import pytest
+import yaml
+
+from pipelines.scheduler import CriticalPathScheduler, Step, build_steps, critical_path_ranks, dagster_op_tags
+
+SHOWCASE = Path(__file__).resolve().parent.parent / "combinations" / "master_showcase.yaml"
+
+
+def _showcase_steps():
+    with open(SHOWCASE) as f:
+        return build_steps([yaml.safe_load(f)])
+
+
+def test_showcase_graph_from_ins():
+    steps = _showcase_steps()
+    assert steps["warehouse_load_inventory"].upstream == {"ingestion_sftp_inventory", "ingestion_sql_customers"}
+    assert steps["ingestion_sftp_inventory"].upstream == {"iam_doint_crazy"}
+    assert "conn:snowflake_conn" in steps["warehouse_load_customers"].pools
+
+
+def test_ranks_prefer_longest_remaining_path():
+    steps = {"a": Step("a"), "b": Step("b"), "c": Step("c", {"a"})}
+    ranks = critical_path_ranks(steps, {"a": 1, "b": 2, "c": 5})
+    assert ranks == {"a": 6, "b": 2, "c": 5}
+    tags = dagster_op_tags(steps, {"a": 1, "b": 2, "c": 5})
+    assert int(tags["a"]["dagster/priority"]) > int(tags["b"]["dagster/priority"])
+
+
+def test_critical_path_beats_fifo_when_workers_are_scarce():
+    # "b1"/"b2" are declared first but "a" heads the long chain
+    steps = {"b1": Step("b1"), "b2": Step("b2"), "a": Step("a"), "c": Step("c", {"a"})}
+    durations = {"b1": 3, "b2": 3, "a": 1, "c": 5}
+    fifo = CriticalPathScheduler(steps, durations, max_concurrent=2, mode="fifo").simulate()
+    cp = CriticalPathScheduler(steps, durations, max_concurrent=2).simulate()
+    assert fifo["starts"]["a"] == 3 and cp["starts"]["a"] == 0
+    # fifo: b1,b2 | a | c = 9; critical path: a,b1 | c,b2 = 6
+    assert cp["makespan"] < fifo["makespan"]
+    assert (cp["makespan"], fifo["makespan"]) == (6, 9)
+
+
+def test_pool_limits_and_failure_skips_downstream():
+    steps = {
+        "a": Step("a", pools=["pool:s3_connection_pool"]),
+        "b": Step("b", pools=["pool:s3_connection_pool"]),
+        "c": Step("c", {"a"}),
+    }
+    sched = CriticalPathScheduler(steps, limits={"pool:s3_connection_pool": 1}, max_concurrent=4)
+    assert sched.simulate()["makespan"] == 2
+
+    def execute(name):
+        if name == "a":
+            raise RuntimeError("boom")
+        return name
+
+    result = sched.run(execute)
+    assert set(result["errors"]) == {"a"}
+    assert "c" in result["skipped"]
+
+
+def test_run_and_simulate_both_report_pool_deadlock():
+    steps = {"a": Step("a", pools=["pool:closed"]), "b": Step("b")}
+    sched = CriticalPathScheduler(steps, limits={"pool:closed": 0})
+    with pytest.raises(RuntimeError, match="Deadlock"):
+        sched.simulate()
+    with pytest.raises(RuntimeError, match="Deadlock"):
+        sched.run(lambda name: name)
@@ -0,0 +1,113 @@
+"""
+Tests for the schema inference cache (pipelines/schema_cache.py)
+"""
+from pipelines.schema_cache import (
+    SchemaCache,
+    TARGET_COLUMN_ORDER,
+    build_column_mapping,
+    csv_fingerprint,
+    ddl_version,
+)
+
+
+def _resolver(calls):
+    def resolve():
+        calls.append(1)
+        return {
+            "source_schema": [{"name": "ID", "type": "NUMBER"}],
+            "target_ddl": "CREATE TABLE TEST_SCHEMA_EVOLVE (ID NUMBER)",
+            "column_mapping": {"id": "ID"},
+        }
+    return resolve
+
+
+def test_unchanged_runs_skip_resolution(tmp_path):
+    calls = []
+    fp = csv_fingerprint(b"id,name\n")
+
+    SchemaCache(tmp_path / "c.json").get_or_resolve(fp, "TEST_SCHEMA_EVOLVE", "v1", _resolver(calls))
+    # A fresh instance simulates the next run reading the persisted cache
+    cache = SchemaCache(tmp_path / "c.json")
+    entry = cache.get_or_resolve(fp, "test_schema_evolve", "v1", _resolver(calls))
+
+    assert len(calls) == 1
+    assert cache.hits == 1
+    assert entry["column_mapping"] == {"id": "ID"}
+
+
+def test_header_or_ddl_change_invalidates(tmp_path):
+    calls = []
+    cache = SchemaCache(tmp_path / "c.json")
+    fp = csv_fingerprint("id,name")
+
+    cache.get_or_resolve(fp, "T", "v1", _resolver(calls))
+    cache.get_or_resolve(csv_fingerprint("id,name,email"), "T", "v1", _resolver(calls))
+    cache.get_or_resolve(fp, "T", "v2", _resolver(calls))
+
+    assert len(calls) == 3
+
+
+def test_fingerprint_ignores_bom_and_whitespace():
+    assert csv_fingerprint("\ufeffid, name\r\n") == csv_fingerprint(b"id,name\n")
+
+
+def test_column_mapping_modes():
+    assert build_column_mapping(["id", "Name"], ["ID", "NAME"]) == {"id": "ID", "Name": "NAME"}
+    assert build_column_mapping(["a", "b", "c"], ["X", "Y"], TARGET_COLUMN_ORDER) == {
+        "a": "X",
+        "b": "Y",
+        "c": None,
+    }
+
+
+def test_key_includes_database_schema_and_match_mode(tmp_path):
+    calls = []
+    cache = SchemaCache(tmp_path / "c.json")
+    fp = csv_fingerprint("id,name")
+
+    cache.get_or_resolve(fp, "T", "v1", _resolver(calls), database="DG_PLAY", schema="RAW")
+    cache.get_or_resolve(fp, "T", "v1", _resolver(calls), database="DG_PLAY", schema="CURATED")
+    cache.get_or_resolve(fp, "T", "v1", _resolver(calls), database="DG_PLAY", schema="RAW",
+                         column_match=TARGET_COLUMN_ORDER)
+    cache.get_or_resolve(fp, "t", "v1", _resolver(calls), database="dg_play", schema="raw")
+    assert len(calls) == 3
+
+    assert cache.invalidate_table("T", "DG_PLAY", "RAW") == 2
+    assert cache.get(fp, "T", "v1", "DG_PLAY", "CURATED") is not None
+
+
+def test_concurrent_writers_keep_each_others_entries(tmp_path):
+    first, second = SchemaCache(tmp_path / "c.json"), SchemaCache(tmp_path / "c.json")
+    first.get(csv_fingerprint("a"), "T", "v1")
+    second.get(csv_fingerprint("a"), "T", "v1")  # both have read the (empty) file
+
+    first.get_or_resolve(csv_fingerprint("a"), "A", "v1", _resolver([]))
+    second.get_or_resolve(csv_fingerprint("b"), "B", "v1", _resolver([]))
+
+    fresh = SchemaCache(tmp_path / "c.json")
+    assert fresh.get(csv_fingerprint("a"), "A", "v1") and fresh.get(csv_fingerprint("b"), "B", "v1")
+
+
+class _Cursor:
+    def __init__(self, row):
+        self.row = row
+        self.executed = []
+
+    def execute(self, sql, params):
+        self.executed.append((sql, params))
+
+    def fetchone(self):
+        return self.row
+
+
+def test_ddl_version_query_matches_snowflake_identifiers():
+    cursor = _Cursor(("2024-06-01 10:00:00.000 -0700",))
+    assert ddl_version(cursor, "test_schema_evolve", "dg_play", "raw") == "2024-06-01 10:00:00.000 -0700"
+    sql, params = cursor.executed[0]
+    assert 'FROM "DG_PLAY".INFORMATION_SCHEMA.TABLES' in sql
+    assert "TABLE_NAME = UPPER(%s)" in sql and "TABLE_SCHEMA = COALESCE(UPPER(%s)" in sql
+    assert params == ("raw", "test_schema_evolve")
+
+    cursor = _Cursor(None)
+    assert ddl_version(cursor, "T") == ""
+    assert "FROM INFORMATION_SCHEMA.TABLES" in cursor.executed[0][0]
@@ -0,0 +1,58 @@
+"""
+Tests for the precomputed asset-selection index (pipelines/selection_index.py)
+"""
+from pathlib import Path
+
+import pytest
+import yaml
+
+from pipelines.selection_index import SelectionIndex
+
+SHOWCASE = Path(__file__).resolve().parent.parent / "combinations" / "master_showcase.yaml"
+
+MULTI_ASSET = [
+    {"name": "sales_ingestion_asset", "group": "sales_pipeline", "tags": {"domain": "sales"}},
+    {"name": "sales_transformed_asset", "group": "sales_pipeline", "deps": ["sales_ingestion_asset"]},
+    {"name": "marketing_ingestion_asset", "group": "marketing_pipeline", "tags": {"domain": "marketing"}},
+    {"name": "marketing_analytics_asset", "group": "marketing_pipeline",
+     "ins": {"raw": {"key": "marketing_ingestion_asset"}}},
+]
+
+
+def test_multi_asset_jobs_yaml_selections():
+    index = SelectionIndex(MULTI_ASSET)
+    with open(Path(__file__).resolve().parent / "test_multi_asset_jobs.yaml") as f:
+        resolved = index.resolve_jobs([yaml.safe_load(f)])
+
+    assert resolved["test_multi_asset_explicit_yaml"] == ["sales_ingestion_asset", "marketing_ingestion_asset"]
+    assert resolved["test_multi_asset_downstream_yaml"] == [a["name"] for a in MULTI_ASSET]
+    assert resolved["test_multi_asset_groups_yaml"] == [a["name"] for a in MULTI_ASSET]
+    assert resolved["test_multi_asset_mixed_yaml"] == [
+        "sales_ingestion_asset", "marketing_ingestion_asset", "marketing_analytics_asset"
+    ]
+
+
+def test_showcase_group_and_closures():
+    with open(SHOWCASE) as f:
+        configs = [yaml.safe_load(f)]
+    index = SelectionIndex.from_configs(configs)
+    assert len(index.resolve_jobs(configs)["master_showcase_job"]) == 5
+    assert index.resolve("ingestion_sql_customers+") == [
+        "ingestion_sql_customers", "warehouse_load_inventory", "warehouse_load_customers"
+    ]
+    assert index.resolve("*warehouse_load_inventory") == [
+        "iam_doint_crazy", "ingestion_sftp_inventory", "ingestion_sql_customers", "warehouse_load_inventory"
+    ]
+    assert index.resolve("*") == index.resolve("group:big_showcase")
+
+
+def test_tags_and_errors():
+    index = SelectionIndex(MULTI_ASSET)
+    assert index.resolve([{"tag": "domain=sales"}]) == ["sales_ingestion_asset"]
+    assert index.resolve("tag:domain*") == [
+        "sales_ingestion_asset", "sales_transformed_asset", "marketing_ingestion_asset", "marketing_analytics_asset"
+    ]
+    with pytest.raises(ValueError, match="unknown asset 'missing'"):
+        index.resolve(["missing"])
+    with pytest.raises(ValueError, match="Cycle"):
+        SelectionIndex([{"name": "a", "deps": ["b"]}, {"name": "b", "deps": ["a"]}])
@@ -0,0 +1,80 @@
+"""
+Tests for snapshot-based SFTP sensor state (pipelines/sftp_snapshot.py)
+"""
+import os
+
+import pytest
+
+from pipelines.sftp_snapshot import LocalListing, SnapshotSensorState, run_key, size_predicate, tick
+
+
+def _write(path, size, mtime=1_700_000_000):
+    path.write_bytes(b"x" * size)
+    os.utime(path, (mtime, mtime))
+
+
+def test_file_is_ready_only_after_an_unchanged_snapshot(tmp_path):
+    _write(tmp_path / "a.csv", 10)
+
+    first, cursor = tick(LocalListing(), str(tmp_path), r".*\.csv")
+    assert first.ready == [] and first.pending == 1
+
+    # Still being written: size changed between ticks
+    _write(tmp_path / "a.csv", 20)
+    second, cursor = tick(LocalListing(), str(tmp_path), r".*\.csv", cursor=cursor)
+    assert second.ready == [] and second.changed == 1
+
+    third, cursor = tick(LocalListing(), str(tmp_path), r".*\.csv", cursor=cursor)
+    assert [name for name, _, _ in third.ready] == ["a.csv"]
+
+    # Already emitted and unchanged: not ready again
+    assert tick(LocalListing(), str(tmp_path), r".*\.csv", cursor=cursor)[0].ready == []
+
+
+def test_failed_tick_does_not_drop_files(tmp_path):
+    _write(tmp_path / "a.csv", 10)
+    _, cursor = tick(LocalListing(), str(tmp_path), r".*\.csv")
+    ready, _lost = tick(LocalListing(), str(tmp_path), r".*\.csv", cursor=cursor)
+    assert len(ready.ready) == 1
+
+    # The tick failed before its SensorResult was committed: the old cursor is reused
+    retried, _ = tick(LocalListing(), str(tmp_path), r".*\.csv", cursor=cursor)
+    assert retried.ready == ready.ready
+    name, size, mtime = retried.ready[0]
+    assert run_key(name, size, mtime) == f"a.csv:10:{mtime}"
+
+
+def test_predicate_pattern_and_removal(tmp_path):
+    _write(tmp_path / "big.csv", 2000)
+    _write(tmp_path / "small.csv", 10)
+    _write(tmp_path / "notes.txt", 5000)
+    args = dict(pattern=r".*\.csv", predicate="source.item.size > 1024")
+
+    _, cursor = tick(LocalListing(), str(tmp_path), **args)
+    result, cursor = tick(LocalListing(), str(tmp_path), cursor=cursor, **args)
+    assert [name for name, _, _ in result.ready] == ["big.csv"]
+
+    (tmp_path / "small.csv").unlink()
+    assert tick(LocalListing(), str(tmp_path), cursor=cursor, **args)[0].removed == 1
+
+
+def test_predicate_is_parsed_not_evaluated():
+    check = size_predicate("file_size > 1048576 and file_name != 'skip.csv' or file_mtime == 0")
+    assert check("a.csv", 2 << 20, 5) and not check("skip.csv", 2 << 20, 5) and check("skip.csv", 1, 0)
+    for bad in ["__import__('os').system('true')", "file_size >", "owner == 'x'", "file_size > 1 xor 2"]:
+        with pytest.raises(ValueError):
+            size_predicate(bad)
+
+
+def test_backlog_is_released_in_pages():
+    state = SnapshotSensorState(check_is_modifying=False, max_ready_per_tick=40)
+    entries = [(f"f{i:03d}.csv", 1, 1000 + i) for i in range(100)]
+
+    pages = []
+    for _ in range(3):
+        pages.append(state.observe(entries))
+        state = SnapshotSensorState(state.to_cursor(), check_is_modifying=False, max_ready_per_tick=40)
+
+    assert [len(p.ready) for p in pages] == [40, 40, 20]
+    assert pages[0].backlog == 60
+    assert pages[0].ready[0][0] == "f000.csv"  # oldest first
@@ -0,0 +1,80 @@
+"""
+Tests for memory-mapped local staging (pipelines/staging.py)
+"""
+import gzip
+import hashlib
+import io
+
+import pytest
+
+from pipelines.staging import StagingArea, StagingQuotaError
+
+
+def test_decompressed_spill_round_trips_through_part_views(tmp_path):
+    payload = bytes(range(256)) * 4000
+    area = StagingArea(tmp_path / "stage", quota_bytes=10 * len(payload))
+
+    with area.create("sales.csv") as staged:
+        staged.copy_from(gzip.GzipFile(fileobj=io.BytesIO(gzip.compress(payload))), buffer_bytes=4096)
+
+    md5 = hashlib.md5()
+    with staged.mapped() as view:
+        parts = list(staged.parts(view, 100_000))
+        for part in parts:
+            md5.update(part)
+        assert [len(p) for p in parts[:-1]] == [100_000] * (len(parts) - 1)
+        assert staged.body(parts[0]).read(10) == payload[:10]
+    assert md5.hexdigest() == hashlib.md5(payload).hexdigest()
+    # One user-space copy per byte (the readinto buffer) plus the 10 bytes read()
+    assert staged.bytes_copied == len(payload) + 10
+
+
+def test_quota_evicts_least_recently_used(tmp_path):
+    area = StagingArea(tmp_path, quota_bytes=300)
+    for name in ("a", "b", "c"):
+        with area.create(name) as staged:
+            staged.write(b"x" * 100)
+    area.get("a")  # "b" is now least recently used
+
+    with area.create("d") as staged:
+        staged.write(b"y" * 100)
+
+    assert area.get("b") is None
+    assert {"a", "c", "d"} <= {p.name for p in tmp_path.iterdir()}
+    assert area.used_bytes == 300
+
+
+def test_files_in_use_are_never_evicted(tmp_path):
+    area = StagingArea(tmp_path, quota_bytes=150)
+    with area.create("held") as staged:
+        staged.write(b"x" * 100)
+
+    with staged.mapped():
+        with pytest.raises(StagingQuotaError):
+            with area.create("new") as other:
+                other.write(b"y" * 100)
+    assert area.get("held") is not None
+
+
+def test_existing_files_count_against_quota(tmp_path):
+    (tmp_path / "leftover").write_bytes(b"z" * 100)
+    area = StagingArea(tmp_path, quota_bytes=120)
+    assert area.used_bytes == 100
+
+    with area.create("next") as staged:
+        staged.write(b"y" * 50)
+    assert not (tmp_path / "leftover").exists()
+
+
+def test_parts_held_past_the_mapping_are_released(tmp_path):
+    area = StagingArea(tmp_path)
+    with area.create("f") as staged:
+        staged.write(b"x" * (3 * 4096))
+
+    with staged.mapped() as view:
+        parts = list(staged.parts(view, 4096))
+        exported = memoryview(parts[1])  # an export the caller forgot about
+    with pytest.raises(ValueError):
+        bytes(parts[0])
+    assert bytes(exported) == b"x" * 4096  # still valid: the mapping closes once it is gone
+    assert staged.pins == 0
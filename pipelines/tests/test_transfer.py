@@ -0,0 +1,156 @@
+"""
+Tests for the async transfer core (pipelines/transfer.py)
+"""
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+
+from pipelines.transfer import (AsyncLocalStorage, AsyncSFTPStorage, RateLimiter, TransferCore, _dest_key,
+                                copy_prefix, run_sync)
+
+
+def test_copy_prefix_from_sync_code(tmp_path):
+    src = tmp_path / "src" / "landing" / "sales"
+    src.mkdir(parents=True)
+    for i in range(50):
+        (src / f"part_{i:03d}.csv").write_bytes(b"x" * i)
+    (src / "skip.txt").write_bytes(b"nope")
+
+    result = copy_prefix(
+        AsyncLocalStorage(tmp_path / "src"), AsyncLocalStorage(tmp_path / "dst"),
+        "landing/sales/", "outbound/", max_in_flight=8, pattern=r".*\.csv$",
+    )
+
+    assert result["objects"] == 50 and result["completed"] == 50
+    assert result["bytes"] == sum(range(50))
+    assert (tmp_path / "dst" / "outbound" / "part_049.csv").read_bytes() == b"x" * 49
+    assert not (tmp_path / "dst" / "outbound" / "skip.txt").exists()
+
+
+def test_in_flight_is_bounded_and_errors_are_per_operation():
+    state = {"now": 0, "peak": 0}
+
+    def operations():
+        for i in range(100):
+            async def op(i=i):
+                state["now"] += 1
+                state["peak"] = max(state["peak"], state["now"])
+                await asyncio.sleep(0.001)
+                state["now"] -= 1
+                if i == 7:
+                    raise IOError("throttled")
+                return i
+            yield "s3_prod", op
+
+    result = run_sync(TransferCore(max_in_flight=10).run(operations()))
+
+    assert state["peak"] == 10
+    assert result["completed"] == 99
+    assert [i for i, _ in result["errors"]] == [7]
+    assert result["results"][8] == 8
+
+
+def test_rate_limit_applies_per_endpoint():
+    async def noop():
+        return None
+
+    core = TransferCore()
+    core.limiters["sftp_prod"] = RateLimiter(100, burst=1)
+
+    started = time.perf_counter()
+    run_sync(core.run([("s3_prod", noop) for _ in range(30)]))
+    unlimited = time.perf_counter() - started
+
+    started = time.perf_counter()
+    run_sync(core.run([("sftp_prod", noop) for _ in range(30)]))
+    limited = time.perf_counter() - started
+
+    assert unlimited < 0.1
+    assert limited >= 0.25
+
+
+def test_copy_is_limited_by_the_destination_endpoint(tmp_path):
+    (tmp_path / "src").mkdir()
+    for i in range(60):
+        (tmp_path / "src" / f"{i}.csv").write_bytes(b"x")
+
+    started = time.perf_counter()
+    result = copy_prefix(
+        AsyncLocalStorage(tmp_path / "src", endpoint="s3_prod"),
+        AsyncLocalStorage(tmp_path / "dst", endpoint="sftp_partner"),
+        "", "out", rate_limits={"sftp_partner": 50},
+    )
+    # A burst of 50, then 10 more at 50/s
+    assert result["completed"] == 60
+    assert time.perf_counter() - started >= 0.15
+
+
+def test_dest_key_joins_prefixes_with_one_slash():
+    assert _dest_key("landing/sales/a.csv", "landing/sales/", "outbound") == "outbound/a.csv"
+    assert _dest_key("landing/sales/a.csv", "landing/sales", "outbound/") == "outbound/a.csv"
+    assert _dest_key("landing/sales/a.csv", "landing/sales", "outbound") == "outbound/a.csv"
+    assert _dest_key("landing/sales/a.csv", "landing/sales/", "") == "a.csv"
+    assert _dest_key("landing/part_001.csv", "landing/part_", "archive/copy_") == "archive/copy_001.csv"
+
+
+def test_sftp_put_creates_parent_directories(tmp_path):
+    class LocalSFTP:
+        # makedirs()/open() as asyncssh provides them, over a local directory
+        def __init__(self):
+            self.makedirs_calls = 0
+
+        async def makedirs(self, path, exist_ok=False):
+            self.makedirs_calls += 1
+            os.makedirs(path, exist_ok=exist_ok)
+
+        def open(self, path, mode):
+            class File:
+                async def __aenter__(self):
+                    self.f = open(path, mode)
+                    return self
+
+                async def __aexit__(self, *exc):
+                    self.f.close()
+
+                async def write(self, data):
+                    self.f.write(data)
+            return File()
+
+    storage = AsyncSFTPStorage("h", root=str(tmp_path))
+    storage._sftp = LocalSFTP()
+    run_sync(storage.put("outbound/2024/06/a.csv", b"a"))
+    run_sync(storage.put("outbound/2024/06/b.csv", b"b"))
+    assert (tmp_path / "outbound" / "2024" / "06" / "b.csv").read_bytes() == b"b"
+    assert storage._sftp.makedirs_calls == 1
+
+
+def test_run_sync_inside_running_loop():
+    async def outer():
+        async def inner():
+            return 42
+        return run_sync(inner())
+
+    assert asyncio.run(outer()) == 42
+
+
+def test_sftp_list_is_recursive_and_verifies_host_keys(tmp_path):
+    for rel in ("landing/a.csv", "landing/2024/06/b.csv", "landing/2024/skip.txt"):
+        (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel).write_bytes(b"xy")
+
+    class LocalSFTP:
+        # readdir() as asyncssh returns it, over a local directory
+        async def readdir(self, path):
+            names = [".", ".."] + os.listdir(path)
+            return [SimpleNamespace(filename=n, attrs=SimpleNamespace(
+                permissions=os.lstat(os.path.join(path, n)).st_mode, size=2)) for n in names]
+
+    storage = AsyncSFTPStorage.from_connection({"host": "sftp.example.com", "username": "u"}, root=str(tmp_path))
+    storage._sftp = LocalSFTP()
+    assert run_sync(storage.list("landing/", r".*\.csv$")) == [("landing/2024/06/b.csv", 2), ("landing/a.csv", 2)]
+
+    # No known_hosts=None: asyncssh's default (~/.ssh/known_hosts) verification applies
+    assert "known_hosts" not in storage.connect_kwargs
+    pinned = AsyncSFTPStorage.from_connection({"host": "h", "port": "2222", "known_hosts": "/etc/ssh/known_hosts"})
+    assert pinned.connect_kwargs["known_hosts"] == "/etc/ssh/known_hosts" and pinned.connect_kwargs["port"] == 2222
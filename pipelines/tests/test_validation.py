@@ -0,0 +1,62 @@
+"""
+Tests for compiled, cached pipeline validation (pipelines/validation.py)
+"""
+import pytest
+
+pytest.importorskip("jsonschema")
+
+from pipelines.validation import validate_files
+
+VALID = """
+assets:
+  - name: ok_asset
+    source:
+      type: S3
+      connection: s3_prod
+"""
+
+INVALID = """
+assets:
+  - name: broken_asset
+"""
+
+
+def test_errors_are_reported_per_file(tmp_path):
+    good = tmp_path / "good.yaml"
+    bad = tmp_path / "bad.yaml"
+    good.write_text(VALID)
+    bad.write_text(INVALID)
+
+    result = validate_files([good, bad], cache_path=None, workers=2)
+
+    assert list(result["errors"]) == [str(bad)]
+    assert "'source' is a required property" in result["errors"][str(bad)][0]
+
+
+def test_unchanged_valid_files_are_skipped(tmp_path):
+    cache = tmp_path / "cache.json"
+    good = tmp_path / "good.yaml"
+    bad = tmp_path / "bad.yaml"
+    good.write_text(VALID)
+    bad.write_text(INVALID)
+
+    validate_files([good, bad], cache_path=cache, workers=1)
+    second = validate_files([good, bad], cache_path=cache, workers=1)
+    assert (second["validated"], second["skipped"]) == (1, 1)
+
+    good.write_text(VALID.replace("ok_asset", "renamed_asset"))
+    third = validate_files([good, bad], cache_path=cache, workers=1)
+    assert third["validated"] == 2
+
+
+def test_runs_on_different_files_keep_each_others_entries(tmp_path):
+    cache = tmp_path / "cache.json"
+    first, second = tmp_path / "first.yaml", tmp_path / "second.yaml"
+    first.write_text(VALID)
+    second.write_text(VALID.replace("ok_asset", "other_asset"))
+
+    validate_files([first], cache_path=cache, workers=1)
+    validate_files([second], cache_path=cache, workers=1)
+    both = validate_files([first, second], cache_path=cache, workers=1)
+    assert (both["validated"], both["skipped"]) == (0, 2)
+    assert not list(tmp_path.glob("*.tmp"))
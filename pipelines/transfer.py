@@ -0,0 +1,364 @@
+"""
+Async transfer core for many-small-object workloads.
+
+Prefix copies, s3_object_observation and sftp_multi_pattern_extraction spend
+almost all of their time waiting on per-object round trips. A thread pool
+keeps at most `max_workers` requests in flight; an event loop can keep
+thousands in flight from one process.
+
+TransferCore runs async operations with:
+  - backpressure: at most `max_in_flight` operations exist at once, and the
+    input iterable is consumed lazily, so 100k keys never become 100k pending
+    coroutines;
+  - per-endpoint rate limits: a token bucket per endpoint name (usually the
+    connection name, e.g. "s3_prod"), in operations per second. A copy names
+    both of its endpoints and takes a token from each.
+
+Async clients:
+  - AsyncLocalStorage: directory-backed stand-in (same layout as
+    compaction.LocalStorage);
+  - AsyncS3Storage: aiobotocore, imported only when constructed;
+  - AsyncSFTPStorage: asyncssh, imported only when connected.
+
+Synchronous operator code uses copy_prefix() / run_sync(), which run the loop
+to completion (on a helper thread if a loop is already running).
+"""
+import asyncio
+import contextlib
+import posixpath
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+DEFAULT_MAX_IN_FLIGHT = 512
+
+
+class RateLimiter:
+    """Async token bucket: `rate` operations per second with bursts up to `burst`."""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1, int(rate)))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = None
+
+    async def acquire(self) -> None:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+# (endpoint or endpoints, factory)
+Operation = Tuple[Union[str, Tuple[str, ...]], Callable[[], Awaitable]]
+
+
+class TransferCore:
+    def __init__(self, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT, rate_limits: Dict[str, float] = None):
+        self.max_in_flight = max_in_flight
+        self.limiters = {name: RateLimiter(rate) for name, rate in (rate_limits or {}).items()}
+
+    async def _run_one(self, endpoint, factory):
+        endpoints = (endpoint,) if isinstance(endpoint, str) else endpoint
+        for name in sorted(set(endpoints)):
+            limiter = self.limiters.get(name)
+            if limiter is not None:
+                await limiter.acquire()
+        return await factory()
+
+    async def run(self, operations: Iterable[Operation]) -> Dict:
+        """
+        Runs `(endpoint, factory)` operations; `factory()` returns an awaitable.
+        `endpoint` may be a tuple: the operation then waits for every limiter.
+
+        Returns {"completed": n, "errors": [(index, exc)], "results": [...], "seconds": s}.
+        Results are in input order; failed operations hold None.
+        """
+        started = time.perf_counter()
+        results: List = []
+        errors: List[Tuple[int, BaseException]] = []
+        pending = set()
+        index_of = {}
+
+        def record(task):
+            index = index_of.pop(task)
+            exc = task.exception()
+            if exc is not None:
+                errors.append((index, exc))
+            else:
+                results[index] = task.result()
+
+        for index, (endpoint, factory) in enumerate(operations):
+            results.append(None)
+            if len(pending) >= self.max_in_flight:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    record(task)
+            task = asyncio.ensure_future(self._run_one(endpoint, factory))
+            index_of[task] = index
+            pending.add(task)
+        if pending:
+            done, _ = await asyncio.wait(pending)
+            for task in done:
+                record(task)
+
+        return {
+            "completed": len(results) - len(errors),
+            "errors": sorted(errors, key=lambda e: e[0]),
+            "results": results,
+            "seconds": time.perf_counter() - started,
+        }
+
+
+def run_sync(coro):
+    """Runs `coro` to completion from synchronous code, even inside a running loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    box = {}
+
+    def target():
+        try:
+            box["result"] = asyncio.run(coro)
+        except BaseException as e:
+            box["error"] = e
+
+    thread = threading.Thread(target=target, name="transfer-core")
+    thread.start()
+    thread.join()
+    if "error" in box:
+        raise box["error"]
+    return box["result"]
+
+
+class AsyncLocalStorage:
+    """
+    Directory-backed stand-in for S3/SFTP.
+
+    Objects up to `inline_bytes` are read and written on the loop thread: for
+    small local files an executor hop costs more than the I/O itself. Larger
+    objects go to the default executor.
+    """
+
+    def __init__(self, root, endpoint: str = "local", inline_bytes: int = 64 * 1024):
+        self.root = Path(root)
+        self.endpoint = endpoint
+        self.inline_bytes = inline_bytes
+
+    async def list(self, prefix: str, pattern: Optional[str] = None) -> List[Tuple[str, int]]:
+        def scan():
+            regex = re.compile(pattern) if pattern else None
+            return [
+                (p.relative_to(self.root).as_posix(), p.stat().st_size)
+                for p in sorted((self.root / prefix).rglob("*"))
+                if p.is_file() and (regex is None or regex.match(p.name))
+            ]
+        return await asyncio.get_running_loop().run_in_executor(None, scan)
+
+    async def get(self, key: str) -> bytes:
+        path = self.root / key
+        with open(path, "rb") as f:
+            data = f.read(self.inline_bytes + 1)
+            if len(data) <= self.inline_bytes:
+                return data
+        return await asyncio.get_running_loop().run_in_executor(None, path.read_bytes)
+
+    async def put(self, key: str, data: bytes) -> None:
+        path = self.root / key
+
+        def write():
+            try:
+                path.write_bytes(data)
+            except FileNotFoundError:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_bytes(data)
+
+        if len(data) <= self.inline_bytes:
+            write()
+        else:
+            await asyncio.get_running_loop().run_in_executor(None, write)
+
+
+class AsyncS3Storage:
+    """aiobotocore client with the AsyncLocalStorage interface; use `async with`."""
+
+    def __init__(self, bucket_name: str, endpoint: str = "s3", **client_kwargs):
+        from aiobotocore.session import get_session
+
+        self.bucket_name = bucket_name
+        self.endpoint = endpoint
+        self._context = get_session().create_client("s3", **client_kwargs)
+        self._client = None
+
+    async def __aenter__(self):
+        self._client = await self._context.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._context.__aexit__(*exc)
+
+    async def list(self, prefix: str, pattern: Optional[str] = None) -> List[Tuple[str, int]]:
+        regex = re.compile(pattern) if pattern else None
+        found = []
+        paginator = self._client.get_paginator("list_objects_v2")
+        async for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                if regex is None or regex.match(obj["Key"].rsplit("/", 1)[-1]):
+                    found.append((obj["Key"], obj["Size"]))
+        return found
+
+    async def get(self, key: str) -> bytes:
+        response = await self._client.get_object(Bucket=self.bucket_name, Key=key)
+        async with response["Body"] as body:
+            return await body.read()
+
+    async def put(self, key: str, data: bytes) -> None:
+        await self._client.put_object(Bucket=self.bucket_name, Key=key, Body=data)
+
+
+class AsyncSFTPStorage:
+    """
+    asyncssh SFTP client with the AsyncLocalStorage interface; use `async with`.
+
+    Host keys are verified: against `known_hosts` (a path or list of paths)
+    when given, otherwise against asyncssh's default ~/.ssh/known_hosts.
+    """
+
+    def __init__(self, host: str, port: int = 22, username: str = None, password: str = None,
+                 root: str = "/", endpoint: str = "sftp", known_hosts=None):
+        self.connect_kwargs = {"host": host, "port": port, "username": username, "password": password}
+        if known_hosts is not None:
+            self.connect_kwargs["known_hosts"] = known_hosts
+        self.root = root.rstrip("/")
+        self.endpoint = endpoint
+        self._conn = None
+        self._sftp = None
+        self._dirs = set()
+
+    @classmethod
+    def from_connection(cls, config: Mapping, root: str = "/", endpoint: str = "sftp") -> "AsyncSFTPStorage":
+        """
+        From a resolved SFTP connection config (host, port, username,
+        password). SFTPResource has no known_hosts field, so pass one in the
+        dict yourself when asyncssh's default ~/.ssh/known_hosts will not do:
+
+            AsyncSFTPStorage.from_connection({**config, "known_hosts": "/etc/ssh/ssh_known_hosts"})
+        """
+        return cls(config["host"], int(config.get("port", 22)), config.get("username"), config.get("password"),
+                   root=root, endpoint=endpoint, known_hosts=config.get("known_hosts"))
+
+    async def __aenter__(self):
+        import asyncssh
+
+        self._conn = await asyncssh.connect(**self.connect_kwargs)
+        self._sftp = await self._conn.start_sftp_client()
+        return self
+
+    async def __aexit__(self, *exc):
+        self._sftp.exit()
+        self._conn.close()
+        await self._conn.wait_closed()
+
+    def _path(self, key: str) -> str:
+        return f"{self.root}/{key.lstrip('/')}"
+
+    async def list(self, prefix: str, pattern: Optional[str] = None) -> List[Tuple[str, int]]:
+        """Every file under `prefix`, recursively (like AsyncLocalStorage.list); symlinks are not followed."""
+        import stat
+
+        regex = re.compile(pattern) if pattern else None
+        found = []
+        pending = [prefix.rstrip("/")]
+        while pending:
+            base = pending.pop()
+            for entry in await self._sftp.readdir(self._path(base)):
+                if entry.filename in (".", ".."):
+                    continue
+                mode = entry.attrs.permissions or 0
+                if stat.S_ISDIR(mode):
+                    pending.append(f"{base}/{entry.filename}")
+                elif stat.S_ISREG(mode) and (regex is None or regex.match(entry.filename)):
+                    found.append((f"{base}/{entry.filename}", entry.attrs.size))
+        return sorted(found)
+
+    async def get(self, key: str) -> bytes:
+        async with self._sftp.open(self._path(key), "rb") as f:
+            return await f.read()
+
+    async def put(self, key: str, data: bytes) -> None:
+        """Writes `key`, creating missing parent directories (like AsyncLocalStorage.put)."""
+        path = self._path(key)
+        parent = posixpath.dirname(path)
+        if parent and parent not in self._dirs:
+            await self._sftp.makedirs(parent, exist_ok=True)
+            self._dirs.add(parent)
+        async with self._sftp.open(path, "wb") as f:
+            await f.write(data)
+
+
+def _dest_key(key: str, prefix: str, dest_prefix: str) -> str:
+    """
+    Where `key` (listed under `prefix`) goes under `dest_prefix`. Folder-style
+    prefixes join with one "/" whether or not either ends with one; a partial
+    name ("part_" -> "copy_") replaces just that part.
+    """
+    rest = key[len(prefix):]
+    if not dest_prefix:
+        return rest.lstrip("/")
+    if not prefix or prefix.endswith("/") or rest.startswith("/") or dest_prefix.endswith("/"):
+        return f"{dest_prefix.rstrip('/')}/{rest.lstrip('/')}"
+    return dest_prefix + rest
+
+
+async def copy_prefix_async(src, dst, prefix: str, dest_prefix: str, core: TransferCore,
+                            pattern: Optional[str] = None) -> Dict:
+    keys = [key for key, _ in await src.list(prefix, pattern)]
+
+    def operations():
+        for key in keys:
+            dest_key = _dest_key(key, prefix, dest_prefix)
+
+            async def copy(key=key, dest_key=dest_key):
+                data = await src.get(key)
+                await dst.put(dest_key, data)
+                return len(data)
+
+            # Each copy counts against both the source and destination limits
+            yield (src.endpoint, dst.endpoint), copy
+
+    result = await core.run(operations())
+    result["bytes"] = sum(r for r in result["results"] if r)
+    result["objects"] = len(keys)
+    del result["results"]
+    return result
+
+
+def copy_prefix(src, dst, prefix: str, dest_prefix: str, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                rate_limits: Dict[str, float] = None, pattern: Optional[str] = None) -> Dict:
+    """
+    Synchronous entry point for operators: copies every object under `prefix`.
+
+    S3/SFTP clients are opened and closed inside the loop that uses them.
+    """
+    core = TransferCore(max_in_flight=max_in_flight, rate_limits=rate_limits)
+
+    async def main():
+        async with contextlib.AsyncExitStack() as stack:
+            for storage in (src, dst):
+                if hasattr(storage, "__aenter__"):
+                    await stack.enter_async_context(storage)
+            return await copy_prefix_async(src, dst, prefix, dest_prefix, core, pattern)
+
+    return run_sync(main())
@@ -0,0 +1,213 @@
+"""
+Fast validation of pipeline YAMLs against schemas/nexus-schema.json.
+
+- The schema is compiled once per process (fastjsonschema when installed,
+  otherwise a pre-built jsonschema validator) instead of per file.
+- Files are validated in parallel across a process pool; each worker compiles
+  the schema once in its initializer.
+- Files whose content hash (plus the schema hash) matches a previous
+  successful validation are skipped.
+
+Also a standalone CLI, suitable for pre-commit:
+
+    python -m pipelines.validation                    # all pipelines/**/*.yaml
+    python -m pipelines.validation pipelines/s3/*.yaml --no-cache
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import yaml
+
+from pipelines.json_store import JsonFileStore
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+SCHEMA_PATH = BASE_DIR / "schemas" / "nexus-schema.json"
+PIPELINES_DIR = BASE_DIR / "pipelines"
+CACHE_PATH = BASE_DIR / ".nexus_cache" / "validation_cache.json"
+
+# Process-wide compiled validator: (schema_path, validate_fn)
+_VALIDATOR: Optional[Tuple[str, object]] = None
+
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def _compile(schema: Dict):
+    """Returns a callable(instance) -> list of error strings."""
+    try:
+        import fastjsonschema
+    except ImportError:
+        fastjsonschema = None
+
+    if fastjsonschema is not None:
+        compiled = fastjsonschema.compile(schema)
+
+        def validate(instance):
+            try:
+                compiled(instance)
+                return []
+            except fastjsonschema.JsonSchemaValueException as e:
+                return [e.message]
+
+        return validate
+
+    from jsonschema.validators import validator_for
+
+    cls = validator_for(schema)
+    cls.check_schema(schema)
+    validator = cls(schema)
+
+    def validate(instance):
+        messages = []
+        for err in validator.iter_errors(instance):
+            # anyOf failures: report the deepest branch error, not the whole subtree
+            while err.context:
+                err = max(err.context, key=lambda e: len(e.absolute_path))
+            where = "/".join(str(p) for p in err.absolute_path) or "<root>"
+            messages.append(f"{where}: {err.message[:200]}")
+        return messages
+
+    return validate
+
+
+def get_validator(schema_path: Path = SCHEMA_PATH):
+    global _VALIDATOR
+    if _VALIDATOR is None or _VALIDATOR[0] != str(schema_path):
+        with open(schema_path) as f:
+            _VALIDATOR = (str(schema_path), _compile(json.load(f)))
+    return _VALIDATOR[1]
+
+
+def _init_worker(schema_path: str) -> None:
+    get_validator(Path(schema_path))
+
+
+def validate_file(path: str, schema_path: str = str(SCHEMA_PATH)) -> Tuple[str, List[str]]:
+    validate = get_validator(Path(schema_path))
+    try:
+        with open(path) as f:
+            document = yaml.load(f, Loader=_Loader)
+    except yaml.YAMLError as e:
+        return path, [f"YAML parse error: {e}"]
+    if document is None:
+        return path, []
+    if not isinstance(document, dict):
+        return path, ["<root>: pipeline file must be a mapping"]
+    return path, validate(document)
+
+
+def _file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def discover(paths: Iterable[str] = ()) -> List[Path]:
+    paths = list(paths)
+    if not paths:
+        return sorted(PIPELINES_DIR.rglob("*.yaml")) + sorted(PIPELINES_DIR.rglob("*.yml"))
+    found = []
+    for p in map(Path, paths):
+        if p.is_dir():
+            found.extend(sorted(p.rglob("*.yaml")) + sorted(p.rglob("*.yml")))
+        else:
+            found.append(p)
+    return found
+
+
+def validate_files(
+    files: List[Path],
+    schema_path: Path = SCHEMA_PATH,
+    cache_path: Optional[Path] = CACHE_PATH,
+    workers: Optional[int] = None,
+) -> Dict:
+    """
+    Validates `files`, skipping unchanged files that passed last time.
+
+    Returns {"errors": {path: [messages]}, "validated": n, "skipped": n, "seconds": s}.
+    """
+    started = time.perf_counter()
+    schema_hash = _file_hash(schema_path)
+    store = JsonFileStore(cache_path) if cache_path else None
+    cache = store.read() if store else {}
+
+    hashes = {}
+    todo = []
+    skipped = 0
+    for f in files:
+        key = str(f.resolve())
+        digest = f"{schema_hash}:{_file_hash(f)}"
+        hashes[key] = digest
+        if cache.get(key) == digest:
+            skipped += 1
+        else:
+            todo.append(str(f))
+
+    workers = workers or min(len(todo), os.cpu_count() or 1)
+    if workers > 1 and len(todo) > 1:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(str(schema_path),)
+        ) as pool:
+            chunksize = max(1, len(todo) // (workers * 4))
+            results = list(pool.map(validate_file, todo, [str(schema_path)] * len(todo), chunksize=chunksize))
+    else:
+        results = [validate_file(p, str(schema_path)) for p in todo]
+
+    errors = {path: errs for path, errs in results if errs}
+    if store is not None:
+        # Merged into what is on disk now and replaced atomically, so
+        # concurrent runs (or a crash mid-write) never leave a truncated file
+        def record(entries: Dict[str, str]) -> None:
+            for path, errs in results:
+                key = str(Path(path).resolve())
+                if errs:
+                    entries.pop(key, None)
+                else:
+                    entries[key] = hashes[key]
+
+        store.update(record)
+
+    return {
+        "errors": errors,
+        "validated": len(todo),
+        "skipped": skipped,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Validate pipeline YAMLs against the Nexus schema.")
+    parser.add_argument("paths", nargs="*", help="Files or directories (default: pipelines/)")
+    parser.add_argument("--schema", default=str(SCHEMA_PATH))
+    parser.add_argument("--no-cache", action="store_true", help="Re-validate every file")
+    parser.add_argument("--workers", type=int, help="Process pool size (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    files = discover(args.paths)
+    result = validate_files(
+        files,
+        schema_path=Path(args.schema),
+        cache_path=None if args.no_cache else CACHE_PATH,
+        workers=args.workers,
+    )
+    for path, errs in sorted(result["errors"].items()):
+        print(f"❌ {path}")
+        for err in errs:
+            print(f"   {err}")
+
+    seconds = result["seconds"]
+    rate = len(files) / seconds if seconds else 0.0
+    print(
+        f"{'✅' if not result['errors'] else '⚠️ '} {len(files)} files "
+        f"({result['validated']} validated, {result['skipped']} unchanged) "
+        f"in {seconds:.2f}s — {rate:,.0f} files/s"
+    )
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())